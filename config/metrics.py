@@ -0,0 +1,265 @@
+"""
+Per-request instrumentation and a Prometheus text-format metrics endpoint.
+
+RequestMetricsMiddleware records, for each resolved URL name, the request
+latency, the number of SQL queries and the time spent in them, the time
+spent in serializers and the response size. Each response carries the
+figures in a ``Server-Timing`` header, and ``/metrics`` exposes them as
+histograms.
+
+Queries are counted by a database execute wrapper that is installed once
+per connection and looks up the current request through a context
+variable, so the cost per query is a context lookup and two clock reads.
+Metrics are kept per process; scrape every worker, or aggregate them with
+the usual Prometheus tooling.
+"""
+
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from .pool import pool_metrics
+
+_current = ContextVar("request_metrics", default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labelnames=("view", "method")):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            snapshot = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in sorted(self._series.items())
+            ]
+        for labels, counts, total, count in snapshot:
+            label_text = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.labelnames, labels)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{_format(bound)}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{{{label_text}}} {_format(total)}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency.", LATENCY_BUCKETS
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL queries run per request.", QUERY_BUCKETS
+)
+DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per request.", FAST_BUCKETS
+)
+SERIALIZER_DURATION = Histogram(
+    "http_request_serializer_duration_seconds",
+    "Time spent producing serializer data per request.",
+    FAST_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size.", SIZE_BUCKETS
+)
+HISTOGRAMS = [
+    REQUEST_DURATION,
+    DB_QUERIES,
+    DB_DURATION,
+    SERIALIZER_DURATION,
+    RESPONSE_SIZE,
+]
+
+# Callables returning extra exposition lines, e.g. cache statistics.
+_collectors = []
+
+
+def register_collector(collector):
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def reset():
+    """Forget all observations (for tests)."""
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "phases")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.phases = {}
+
+    def add_time(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to the current request's ``phase``."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(phase, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting queries for the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "METRICS_SERVER_TIMING", True)
+        connection_created.connect(
+            install_query_recorder, dispatch_uid="config.metrics.query_recorder"
+        )
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(None, connection)
+        register_collector(pool_metrics)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        elapsed = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        labels = (match.url_name if match and match.url_name else "unresolved",)
+        labels += (request.method,)
+        serializer_time = metrics.phases.get("serializer", 0.0)
+
+        REQUEST_DURATION.observe(labels, elapsed)
+        DB_QUERIES.observe(labels, metrics.queries)
+        DB_DURATION.observe(labels, metrics.db_time)
+        SERIALIZER_DURATION.observe(labels, serializer_time)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+
+        if self.server_timing:
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+                    f"serializer;dur={serializer_time * 1000:.2f}",
+                    f"total;dur={elapsed * 1000:.2f}",
+                ]
+            )
+        return response
+
+
+def metrics_view(request):
+    """
+    Text exposition of the request histograms. Scrapers must send
+    ``METRICS_TOKEN`` as ``Authorization: Bearer <token>``; without a token
+    configured the endpoint doesn't exist.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        raise Http404
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        return HttpResponseForbidden()
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    for collector in _collectors:
+        lines.extend(collector())
+    return HttpResponse(
+        "\n".join(lines) + "\n", content_type="text/plain; version=0.0.4"
+    )
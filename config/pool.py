@@ -0,0 +1,58 @@
+"""
+Database connection pool support.
+
+``DATABASES["default"]["OPTIONS"]["pool"]``, which config.settings sets when
+``DB_POOL=1``, enables Django's psycopg 3 connection pool: each worker
+process keeps between ``min_size`` and ``max_size`` open connections,
+requests borrow one for their duration and wait up to ``timeout`` seconds
+when all are in use. With
+``CONN_HEALTH_CHECKS`` the pool tests each connection before handing it
+out, so a connection dropped by the server or a proxy is replaced instead
+of failing a request.
+
+``pool_metrics`` reports each pool's counters on ``/metrics``.
+"""
+
+from django.db import connections
+
+# (metric name, type, psycopg_pool statistic, scale)
+POOL_METRICS = [
+    ("db_pool_checkouts_total", "counter", "requests_num", 1),
+    ("db_pool_waits_total", "counter", "requests_queued", 1),
+    ("db_pool_wait_seconds_total", "counter", "requests_wait_ms", 0.001),
+    ("db_pool_timeouts_total", "counter", "requests_errors", 1),
+    ("db_pool_connections_opened_total", "counter", "connections_num", 1),
+    ("db_pool_connection_errors_total", "counter", "connections_errors", 1),
+    ("db_pool_connections_lost_total", "counter", "connections_lost", 1),
+    ("db_pool_bad_returns_total", "counter", "returns_bad", 1),
+    ("db_pool_size", "gauge", "pool_size", 1),
+    ("db_pool_available", "gauge", "pool_available", 1),
+    ("db_pool_waiting", "gauge", "requests_waiting", 1),
+    ("db_pool_max_size", "gauge", "pool_max", 1),
+]
+
+
+def pool_stats():
+    """
+    Return ``{alias: stats}`` for the connection pools this process has
+    opened. Pools are created on first use; unused aliases are left out.
+    """
+    stats = {}
+    for alias in connections:
+        wrapper_class = type(connections[alias])
+        pool = getattr(wrapper_class, "_connection_pools", {}).get(alias)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def pool_metrics():
+    """Exposition lines for ``config.metrics`` describing the pools."""
+    stats = pool_stats()
+    lines = []
+    for name, kind, key, scale in POOL_METRICS:
+        lines.append(f"# TYPE {name} {kind}")
+        for alias, values in sorted(stats.items()):
+            value = values.get(key, 0) * scale
+            lines.append(f'{name}{{database="{alias}"}} {value:g}')
+    return lines
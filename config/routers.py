@@ -0,0 +1,226 @@
+"""
+Read-replica routing.
+
+Reads made while serving a safe (GET, HEAD, OPTIONS) request go to one of
+the ``DATABASE_REPLICAS`` aliases; writes, reads of unsafe requests and
+all queries outside a request (management commands, shells, the bodies of
+streaming responses) use ``default``.
+
+Replication lags, so a client that has just written must not read from a
+replica. ReplicaRoutingMiddleware pins a user to the primary for
+``REPLICA_STICKY_SECONDS`` after any unsafe request they make, and a safe
+request that writes keeps its own later reads on the primary. Pins are kept
+in the ``REPLICA_PIN_CACHE`` cache, which must be shared between processes
+(Redis, Memcached, the database cache) for stickiness to hold across workers.
+
+Replicas are checked at most every ``REPLICA_HEALTH_CHECK_SECONDS`` per
+process. A replica that can't be reached, or that is more than
+``REPLICA_MAX_LAG_SECONDS`` behind on PostgreSQL, is skipped until its next
+check; with no healthy replica, reads go to the primary.
+"""
+
+import base64
+import json
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.connection import ConnectionDoesNotExist
+from django.utils.functional import LazyObject, empty
+
+_current = ContextVar("replica_routing", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_KEY_PREFIX = "replica-pin:"
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 10)
+
+
+def pin_cache():
+    return caches[getattr(settings, "REPLICA_PIN_CACHE", "default")]
+
+
+def pin_user(user_id):
+    """Send ``user_id``'s reads to the primary for the sticky window."""
+    seconds = sticky_seconds()
+    if user_id is not None and seconds > 0:
+        pin_cache().set(f"{PIN_KEY_PREFIX}{user_id}", True, seconds)
+
+
+def is_pinned(user_id):
+    return pin_cache().get(f"{PIN_KEY_PREFIX}{user_id}", False)
+
+
+class ReplicaHealth:
+    """Per-process record of which replicas passed their last check."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = {}
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, "REPLICA_HEALTH_CHECK_SECONDS", 30)
+        now = time.monotonic()
+        with self.lock:
+            checked_at, healthy = self.checked.get(alias, (None, False))
+            if checked_at is not None and now - checked_at < interval:
+                return healthy
+            # Other threads keep the previous verdict (optimistically
+            # healthy the first time) while this one runs the check.
+            self.checked[alias] = (now, healthy if checked_at is not None else True)
+        healthy = self.check(alias)
+        with self.lock:
+            self.checked[alias] = (time.monotonic(), healthy)
+        return healthy
+
+    def check(self, alias):
+        try:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute(
+                        "SELECT CASE WHEN pg_is_in_recovery() THEN EXTRACT(EPOCH "
+                        "FROM now() - pg_last_xact_replay_timestamp()) END"
+                    )
+                    lag = cursor.fetchone()[0]
+                    max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 30)
+                    return lag is None or lag <= max_lag
+                cursor.execute("SELECT 1")
+            return True
+        except (DatabaseError, ConnectionDoesNotExist):
+            return False
+
+    def reset(self):
+        with self.lock:
+            self.checked.clear()
+
+
+health = ReplicaHealth()
+
+
+def token_user_id(request):
+    """
+    The user id claim of a bearer JWT as a string, read without verifying
+    the token. Only used to choose a database: a forged claim can do no more
+    than send the request's reads to the primary.
+    """
+    header = request.headers.get("Authorization", "")
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != "Bearer":
+        return None
+    try:
+        payload = parts[1].split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        claim = getattr(settings, "SIMPLE_JWT", {}).get("USER_ID_CLAIM", "user_id")
+        user_id = claims.get(claim)
+    except (IndexError, ValueError, AttributeError):
+        return None
+    return None if user_id is None else str(user_id)
+
+
+class RoutingState:
+    """Routing decisions for the request being served."""
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = request.method not in SAFE_METHODS
+        self.wrote = False
+        self.replica = None
+        self.checked_users = set()
+
+    def user_id(self):
+        # DRF stores the authenticated user on the request. Before that,
+        # AuthenticationMiddleware's lazy user is only used if something
+        # else has loaded it: loading it here would itself run queries.
+        user = self.request.__dict__.get("user")
+        if isinstance(user, LazyObject) and user._wrapped is empty:
+            user = None
+        if user is not None and user.is_authenticated:
+            return str(user.pk)
+        return token_user_id(self.request)
+
+    def db_for_read(self):
+        if self.pinned or not replica_aliases():
+            return DEFAULT_DB_ALIAS
+        user_id = self.user_id()
+        if user_id is not None and user_id not in self.checked_users:
+            self.checked_users.add(user_id)
+            if is_pinned(user_id):
+                self.pinned = True
+                return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            healthy = [alias for alias in replica_aliases() if health.is_healthy(alias)]
+            # Stay on one replica for the whole request.
+            self.replica = random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+        return self.replica
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None:
+            return DEFAULT_DB_ALIAS
+        return state.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            # Later reads of this request, and of the user's next requests,
+            # must see the write.
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = RoutingState(request)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(state)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState(request)
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(state)
+        return response
+
+    def finish(self, state):
+        if not replica_aliases():
+            return
+        if state.wrote or state.request.method not in SAFE_METHODS:
+            pin_user(state.user_id())
@@ -1,6 +1,8 @@
 from datetime import timedelta
 from pathlib import Path
 
+from decouple import config
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
@@ -31,6 +33,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.metrics.RequestMetricsMiddleware",
+    "config.routers.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -71,9 +75,42 @@ DATABASES = {
         "PASSWORD": "mypassword",
         "PORT": "5432",
         "HOST": "localhost",
+        # Test pooled connections before handing them out (config.pool).
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Per-process connection pool (config.pool), enabled with DB_POOL=1; it needs
+# psycopg 3 and psycopg-pool. Size it so that workers x DB_POOL_MAX_SIZE
+# stays below the server's max_connections.
+if config("DB_POOL", default=False, cast=bool):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+            # Seconds a request waits for a free connection before failing.
+            "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+            # Close connections idle for longer than this, down to min_size.
+            "max_idle": config("DB_POOL_MAX_IDLE", default=300, cast=float),
+            # Replace connections after this long, to rebalance after
+            # failovers and free server-side memory.
+            "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=3600, cast=float),
+        },
+    }
+
+# Read replicas of "default" (config.routers). Add each replica to DATABASES
+# and list its alias here, e.g.
+#     DATABASES["replica"] = {**DATABASES["default"], "HOST": "replica-host"}
+#     DATABASE_REPLICAS = ["replica"]
+# Point REPLICA_PIN_CACHE at a cache shared by all workers (the default
+# local-memory cache is per process) so read-your-writes holds everywhere.
+DATABASE_ROUTERS = ["config.routers.ReplicaRouter"]
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 10
+REPLICA_PIN_CACHE = "default"
+REPLICA_HEALTH_CHECK_SECONDS = 30
+REPLICA_MAX_LAG_SECONDS = 30
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -118,7 +155,7 @@ AUTH_USER_MODEL = "users.CustomUser"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -138,3 +175,36 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
 }
+
+# Per-process cache of verified access tokens and their users. An entry is
+# dropped when its user is saved; other processes keep theirs for up to TTL
+# seconds (never past the token's expiry).
+AUTH_TOKEN_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 60,
+}
+
+# Request metrics (config.metrics). /metrics answers 404 until METRICS_TOKEN
+# is set, and then requires "Authorization: Bearer <token>".
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = config("METRICS_TOKEN", default=None)
+
+# Delta sync (tasks.sync). Changes become visible to sync this many seconds
+# after they are written; tombstones of deleted rows are kept this many days.
+SYNC_SETTLE_SECONDS = 5
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Autocomplete (tasks.autocomplete) gives up on queries after this long.
+AUTOCOMPLETE_TIME_BUDGET_MS = 150
+
+# Archival (tasks.archive): archive_tasks moves DONE tasks not updated for
+# this many days to the archive table.
+TASK_ARCHIVE_AFTER_DAYS = 90
+
+# Background deletes (tasks.deletion): process_deletions detaches or deletes
+# the rows of deleted categories and users this many at a time, pausing
+# between batches, and takes over jobs whose worker has been silent for
+# DELETION_LEASE_SECONDS.
+DELETION_BATCH_SIZE = 500
+DELETION_BATCH_PAUSE_SECONDS = 0.1
+DELETION_LEASE_SECONDS = 300
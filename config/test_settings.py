@@ -0,0 +1,16 @@
+"""
+Settings for ``manage.py test``, which uses them unless DJANGO_SETTINGS_MODULE
+says otherwise (see manage.py).
+
+Adds a "replica" alias with its own test database, so that the read replica
+routing tests (config.routers) run against two local databases. It is only
+routed to where a test lists it in DATABASE_REPLICAS.
+"""
+
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DATABASES["replica"] = deepcopy(DATABASES["default"])
+DATABASES["replica"]["TEST"] = {"NAME": f"test_{DATABASES['default']['NAME']}_replica"}
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Task
+from .models import ArchivedTask, Category, DeletionJob, Task, TaskStatistics
 
 
 @admin.register(Task)
@@ -22,7 +22,49 @@ class TaskAdmin(admin.ModelAdmin):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ["name", "user", "color"]
-    list_filter = ["user"]
+    list_display = ["name", "user", "color", "pending_deletion"]
+    list_filter = ["user", "pending_deletion"]
     search_fields = ["name"]
     fieldsets = ((None, {"fields": ("name", "user", "color")}),)
+
+
+@admin.register(TaskStatistics)
+class TaskStatisticsAdmin(admin.ModelAdmin):
+    list_display = [
+        "user",
+        "total_tasks",
+        "todo_count",
+        "in_progress_count",
+        "done_count",
+        "high_priority_count",
+    ]
+    search_fields = ["user__email"]
+    # Counters are maintained by the task write paths; use the
+    # rebuild_task_statistics command to repair them.
+    readonly_fields = ["user", *TaskStatistics.COUNTERS]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ["title", "user", "status", "priority", "archived_at"]
+    list_filter = ["archived_at"]
+    search_fields = ["title", "description", "user__email"]
+    # Rows are moved here by archive_tasks and back by the restore endpoint.
+    readonly_fields = [field.name for field in ArchivedTask._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ["kind", "object_id", "status", "stage", "processed", "total"]
+    list_filter = ["kind", "status"]
+    # Jobs are created by the delete endpoints and run by process_deletions.
+    readonly_fields = [field.name for field in DeletionJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
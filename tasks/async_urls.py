@@ -0,0 +1,31 @@
+from django.urls import path
+
+from .async_views import (
+    AsyncCategoryDetailView,
+    AsyncCategoryListCreateView,
+    AsyncOverdueTasksView,
+    AsyncTaskDetailView,
+    AsyncTaskListCreateView,
+    AsyncTaskStatisticsView,
+)
+
+urlpatterns = [
+    path("tasks/", AsyncTaskListCreateView.as_view(), name="async-task-list-create"),
+    path("tasks/<int:pk>/", AsyncTaskDetailView.as_view(), name="async-task-detail"),
+    path(
+        "tasks/statistics/",
+        AsyncTaskStatisticsView.as_view(),
+        name="async-task-statistics",
+    ),
+    path("tasks/overdue/", AsyncOverdueTasksView.as_view(), name="async-overdue-tasks"),
+    path(
+        "categories/",
+        AsyncCategoryListCreateView.as_view(),
+        name="async-category-list-create",
+    ),
+    path(
+        "categories/<int:pk>/",
+        AsyncCategoryDetailView.as_view(),
+        name="async-category-detail",
+    ),
+]
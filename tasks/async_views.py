@@ -0,0 +1,152 @@
+"""
+Async versions of the task and category endpoints, served under
+``/api/async/`` (see ``tasks/async_urls.py``).
+
+Each view subclasses its sync counterpart, so filtering, ordering,
+pagination, serializers and permissions are shared. Reads run on the event
+loop with the async ORM. Writes depend on transactions and the counter
+bookkeeping in ``tasks.models``, which have no async API, so they run the
+sync implementation in a worker thread.
+"""
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+from .conditional import conditional_on_user_data
+from .pagination import apaginate_queryset
+from .services import TaskService
+from .views import (
+    CategoryDetailView,
+    CategoryListCreateView,
+    OverdueTasksView,
+    TaskDetailView,
+    TaskListCreateView,
+    TaskStatisticsView,
+)
+
+
+class AsyncAPIViewMixin:
+    """
+    Dispatch DRF requests on the event loop.
+
+    Authentication, permission and throttle checks may query the database,
+    so ``initial()`` runs in a thread, as do handlers that are not
+    coroutines (such as DRF's ``options``).
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            handler = self.http_method_not_allowed
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Views with a TaskRowsMixin row plan render values() rows with it.
+        plan = None
+        if getattr(self, "row_plan", None) is not None:
+            plan = self.get_row_plan()
+            queryset = plan.values(queryset)
+        page = await apaginate_queryset(self.paginator, queryset, request, self)
+        if page is None:
+            rows = [row async for row in queryset.aiterator()]
+            return Response(self.render_rows(rows, plan))
+        return self.get_paginated_response(self.render_rows(page, plan))
+
+    def render_rows(self, rows, plan):
+        if plan is not None:
+            return plan.render(rows)
+        return self.get_serializer(rows, many=True).data
+
+    async def aretrieve(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.aget(**lookup)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(request, instance)
+        return Response(self.get_serializer(instance).data)
+
+
+@conditional_on_user_data()
+class AsyncTaskListCreateView(AsyncAPIViewMixin, TaskListCreateView):
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request)
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+
+@conditional_on_user_data()
+class AsyncTaskDetailView(AsyncAPIViewMixin, TaskDetailView):
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request)
+
+    async def put(self, request, *args, **kwargs):
+        return await sync_to_async(super().put)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await sync_to_async(super().patch)(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        return await sync_to_async(super().delete)(request, *args, **kwargs)
+
+
+@conditional_on_user_data(date_dependent=True)
+class AsyncTaskStatisticsView(AsyncAPIViewMixin, TaskStatisticsView):
+    async def get(self, request):
+        stats = await TaskService.aget_user_task_statistics(request.user)
+        return Response(stats)
+
+
+@conditional_on_user_data(date_dependent=True)
+class AsyncOverdueTasksView(AsyncAPIViewMixin, OverdueTasksView):
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request)
+
+
+@conditional_on_user_data(date_dependent=True)
+class AsyncCategoryListCreateView(AsyncAPIViewMixin, CategoryListCreateView):
+    async def get(self, request, *args, **kwargs):
+        if self.counts_requested(request):
+            self.task_counts = await TaskService.aget_category_task_counts(request.user)
+        return self.add_uncategorized(await self.alist(request))
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+
+@conditional_on_user_data()
+class AsyncCategoryDetailView(AsyncAPIViewMixin, CategoryDetailView):
+    async def get(self, request, *args, **kwargs):
+        return await self.aretrieve(request)
+
+    async def put(self, request, *args, **kwargs):
+        return await sync_to_async(super().put)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await sync_to_async(super().patch)(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        return await sync_to_async(super().delete)(request, *args, **kwargs)
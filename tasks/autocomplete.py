@@ -0,0 +1,71 @@
+"""
+Title autocomplete: the user's task titles and category names containing a
+typed prefix, found through the trigram indexes.
+
+Clients call this on every keystroke, so the work per call is bounded: at
+most ``limit`` short rows per kind, and all queries must finish within
+``AUTOCOMPLETE_TIME_BUDGET_MS``. Whatever hasn't been found by then is left
+out and the response is marked ``timed_out`` instead of making the user wait.
+"""
+
+import time
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+
+from .models import Category, Task
+from .search import QueryTimeout, filter_substring, query_time_limit
+
+DEFAULT_TIME_BUDGET_MS = 150
+MIN_LENGTH = 2
+
+
+def time_budget_ms():
+    return getattr(settings, "AUTOCOMPLETE_TIME_BUDGET_MS", DEFAULT_TIME_BUDGET_MS)
+
+
+def matching(queryset, field, prefix):
+    """
+    Rows whose ``field`` contains ``prefix``: those starting with it first,
+    then shorter values first.
+    """
+    starts = Case(
+        When(**{f"{field}__istartswith": prefix}, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return (
+        filter_substring(queryset, field, prefix)
+        .annotate(starts=starts)
+        .order_by("starts", Length(field), field, "id")
+        .values("id", field)
+    )
+
+
+def suggest(user, prefix, limit=10):
+    """Return ``{"tasks", "categories", "timed_out"}`` for ``prefix``."""
+    result = {"tasks": [], "categories": [], "timed_out": False}
+    prefix = prefix.strip()
+    if len(prefix) < MIN_LENGTH:
+        return result
+
+    deadline = time.monotonic() + time_budget_ms() / 1000
+    sources = [
+        ("tasks", matching(Task.objects.filter(user=user), "title", prefix)),
+        (
+            "categories",
+            matching(Category.objects.visible().filter(user=user), "name", prefix),
+        ),
+    ]
+    for key, queryset in sources:
+        remaining = (deadline - time.monotonic()) * 1000
+        try:
+            if remaining <= 0:
+                raise QueryTimeout()
+            with query_time_limit(queryset.db, remaining):
+                result[key] = list(queryset[:limit])
+        except QueryTimeout:
+            result["timed_out"] = True
+            break
+    return result
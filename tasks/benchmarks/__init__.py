@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for the layers behind the task API.
+
+``data`` builds a deterministic dataset, ``cases`` defines what is timed and
+``runner`` times the cases and compares results with a saved baseline. The
+``benchmark`` management command ties them together.
+"""
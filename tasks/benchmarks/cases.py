@@ -0,0 +1,169 @@
+"""
+Benchmark cases.
+
+A case is a function that takes the benchmark user, does any preparation
+that should not be timed, and returns the zero-argument callable to time.
+"""
+
+from datetime import date, timedelta
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from tasks.models import Category, Task
+from tasks.serializers import TASK_ROWS, CategorySerializer, TaskSerializer
+from tasks.services import TaskService
+from tasks.views import TaskListCreateView
+
+CASES = {}
+
+
+def case(name):
+    def register(func):
+        CASES[name] = func
+        return func
+
+    return register
+
+
+def make_request(user, path="/api/tasks/", params=None):
+    # A host that ALLOWED_HOSTS accepts under DEBUG, for building page links.
+    request = APIRequestFactory(SERVER_NAME="localhost").get(path, params or {})
+    force_authenticate(request, user=user)
+    return request
+
+
+def list_view(user, params):
+    """A TaskListCreateView set up for a GET with ``params``."""
+    request = make_request(user, params=params)
+    view = TaskListCreateView()
+    view.setup(request)
+    view.request = view.initialize_request(request)
+    view.format_kwarg = None
+    return view
+
+
+_today = date.today()
+
+# Task list query strings, from the plain default to full-text search.
+LIST_QUERIES = {
+    "default": {},
+    "status_priority": {"status": "TODO", "ordering": "-priority"},
+    "due_range": {
+        "due_date_from": str(_today - timedelta(days=30)),
+        "due_date_to": str(_today + timedelta(days=30)),
+        "ordering": "due_date",
+    },
+    "title": {"title": "report"},
+    "search": {"search": "budget review"},
+    "search_ranked": {"search": "report", "rank": "true"},
+}
+
+
+def _filter_case(params, execute):
+    def setup(user):
+        view = list_view(user, params)
+
+        def run():
+            queryset = view.filter_queryset(view.get_queryset())
+            if execute:
+                # What the list endpoint runs: a count and the first page.
+                queryset.count()
+                list(queryset[:10])
+            else:
+                queryset.query.sql_with_params()
+
+        return run
+
+    return setup
+
+
+for _name, _params in LIST_QUERIES.items():
+    case(f"filter.{_name}.build")(_filter_case(_params, execute=False))
+    case(f"filter.{_name}.execute")(_filter_case(_params, execute=True))
+
+
+def _serializer_case(size):
+    def setup(user):
+        tasks = list(Task.objects.filter(user=user).with_owner()[:size])
+        context = {"request": list_view(user, {}).request}
+
+        def run():
+            TaskSerializer(tasks, many=True, context=context).data
+
+        return run
+
+    return setup
+
+
+case("serializer.task_page_10")(_serializer_case(10))
+case("serializer.task_page_100")(_serializer_case(100))
+
+
+def _row_plan_case(size):
+    def setup(user):
+        rows = list(TASK_ROWS.values(Task.objects.filter(user=user))[:size])
+
+        def run():
+            TASK_ROWS.render(rows)
+
+        return run
+
+    return setup
+
+
+case("serializer.task_rows_10")(_row_plan_case(10))
+case("serializer.task_rows_100")(_row_plan_case(100))
+
+
+def _list_response_case(row_plan):
+    def setup(user):
+        view = TaskListCreateView.as_view(row_plan=row_plan)
+
+        def run():
+            # Query, render and JSON-encode a full page.
+            view(make_request(user, params={"page_size": 100})).render()
+
+        return run
+
+    return setup
+
+
+case("response.task_page_100")(_list_response_case(TASK_ROWS))
+case("response.task_page_100_serializer")(_list_response_case(None))
+
+
+@case("service.statistics")
+def statistics(user):
+    return lambda: TaskService.get_user_task_statistics(user)
+
+
+@case("service.overdue")
+def overdue(user):
+    def run():
+        queryset = TaskService.get_overdue_tasks(user).with_owner()
+        queryset.count()
+        list(queryset[:10])
+
+    return run
+
+
+def _category_validation_case(existing):
+    def setup(user):
+        request = list_view(user, {}).request
+        category = Category.objects.filter(user=user).first()
+        if existing and category is not None:
+            name = category.name.upper()
+        else:
+            name = "A brand new category"
+        data = {"name": name, "color": "#123456"}
+
+        def run():
+            CategorySerializer(data=data, context={"request": request}).is_valid()
+
+        return run
+
+    return setup
+
+
+case("category_serializer.validate_new")(_category_validation_case(False))
+case("category_serializer.validate_duplicate")(_category_validation_case(True))
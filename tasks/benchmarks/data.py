@@ -0,0 +1,130 @@
+"""
+Deterministic benchmark dataset.
+
+The same seed and sizes always produce the same users, categories and tasks
+(due dates are relative to the day of generation). Benchmark users are
+recognised by their email domain, so the data can live next to real data
+and be removed again.
+"""
+
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from tasks.models import Category, Task
+
+EMAIL_DOMAIN = "benchmark.invalid"
+
+STATUS_WEIGHTS = {"TODO": 45, "IN_PROGRESS": 20, "DONE": 35}
+PRIORITY_WEIGHTS = {"LOW": 30, "MEDIUM": 50, "HIGH": 20}
+CATEGORY_NAMES = [
+    "Work",
+    "Personal",
+    "Errands",
+    "Health",
+    "Finance",
+    "Learning",
+    "Home",
+    "Travel",
+]
+COLORS = ["#FF5733", "#33C1FF", "#8E44AD", "#2ECC71", "#F1C40F", ""]
+VERBS = ["Review", "Write", "Plan", "Fix", "Call", "Update", "Prepare", "Book"]
+NOUNS = [
+    "quarterly report",
+    "dentist appointment",
+    "project proposal",
+    "team meeting",
+    "budget",
+    "release notes",
+    "flight tickets",
+    "garden",
+    "invoice",
+    "presentation",
+]
+WORDS = (
+    "client deadline draft follow up notes agenda budget review schedule "
+    "research summary backlog estimate feedback"
+).split()
+
+
+def benchmark_users():
+    return get_user_model().objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+
+
+def clear():
+    """Delete all benchmark users together with their tasks and categories."""
+    benchmark_users().delete()
+
+
+def generate(users=100, tasks=100_000, seed=0, batch_size=5000, stdout=None):
+    """
+    Create ``users`` benchmark users owning ``tasks`` tasks in total.
+
+    Task ownership is skewed, as in real data: a few heavy users own a
+    large share of the tasks. Roughly 60% of tasks have a category, 70% a
+    due date (some of them in the past).
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    password = make_password(None)
+
+    clear()
+    User = get_user_model()
+    User.objects.bulk_create(
+        [
+            User(email=f"user{i:05d}@{EMAIL_DOMAIN}", password=password)
+            for i in range(users)
+        ]
+    )
+    # bulk_create() doesn't return primary keys on every backend.
+    owners = list(benchmark_users().order_by("email"))
+
+    categories = {}
+    for owner in owners:
+        names = rng.sample(CATEGORY_NAMES, rng.randint(0, len(CATEGORY_NAMES)))
+        categories[owner.pk] = [
+            Category(name=name, color=rng.choice(COLORS), user=owner) for name in names
+        ]
+    Category.objects.bulk_create(
+        [category for owned in categories.values() for category in owned]
+    )
+    categories = {owner.pk: [] for owner in owners}
+    for category in Category.objects.filter(user__in=owners).order_by("user", "name"):
+        categories[category.user_id].append(category)
+
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(len(owners))]
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+
+    for start in range(0, tasks, batch_size):
+        size = min(batch_size, tasks - start)
+        batch = []
+        for owner in rng.choices(owners, weights, k=size):
+            owned = categories[owner.pk]
+            due_date = None
+            if rng.random() < 0.7:
+                due_date = today + timedelta(days=rng.randint(-60, 90))
+            description = ""
+            if rng.random() < 0.5:
+                description = " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+            batch.append(
+                Task(
+                    title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+                    description=description,
+                    status=rng.choices(statuses, status_weights)[0],
+                    priority=rng.choices(priorities, priority_weights)[0],
+                    due_date=due_date,
+                    category=(
+                        rng.choice(owned) if owned and rng.random() < 0.6 else None
+                    ),
+                    user=owner,
+                )
+            )
+        with transaction.atomic():
+            Task.objects.bulk_create(batch)
+        if stdout is not None:
+            stdout.write(f"Created {start + size} of {tasks} tasks")
+    return owners
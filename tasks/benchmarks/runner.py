@@ -0,0 +1,81 @@
+import fnmatch
+import platform
+import statistics
+import time
+
+import django
+from django.db import connection
+
+from .cases import CASES
+
+
+def select_cases(patterns=None):
+    """Return case names matching any of the glob ``patterns`` (all if none)."""
+    if not patterns:
+        return list(CASES)
+    return [
+        name
+        for name in CASES
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def time_case(func, repeat, warmup=1):
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": timings[0],
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "mean_ms": statistics.fmean(timings),
+    }
+
+
+def run(user, names, repeat, dataset=None):
+    results = {}
+    for name in names:
+        results[name] = time_case(CASES[name](user), repeat)
+    return {
+        "meta": {
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "repeat": repeat,
+            "dataset": dataset or {},
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold=0.2, min_delta_ms=0.05):
+    """
+    Compare median timings with a baseline report.
+
+    A case regresses when its median grows by more than ``threshold`` (a
+    fraction) and by more than ``min_delta_ms``, so that noise on very fast
+    cases is not reported. Returns one row per case present in both reports.
+    """
+    rows = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        before, after = previous["median_ms"], result["median_ms"]
+        change = (after - before) / before if before else 0.0
+        rows.append(
+            {
+                "case": name,
+                "baseline_ms": before,
+                "current_ms": after,
+                "change": change,
+                "regression": change > threshold and after - before > min_delta_ms,
+            }
+        )
+    return rows
@@ -0,0 +1,239 @@
+"""
+Background deletion of users and categories.
+
+Deleting a category used to unset the category of all its tasks in one
+UPDATE, and deleting a user cascaded through all their rows in one
+transaction; both held locks long enough to stall other requests. Instead,
+``schedule_category_deletion`` and ``schedule_user_deletion`` hide the
+object from the API at once (a category is flagged ``pending_deletion``, a
+user is deactivated) and queue a DeletionJob.
+
+``process_deletions`` (the command of the same name) then works through the
+job's stages: each stage detaches or deletes the dependent rows of one model
+in keyset batches of ``DELETION_BATCH_SIZE``, one short transaction per
+batch, pausing ``DELETION_BATCH_PAUSE_SECONDS`` between batches. The job's
+stage, position and row count are saved with each batch, so progress can be
+reported and a job cut short by a crash resumes where it stopped once its
+lease expires. The category or user itself is deleted last.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedTask,
+    Category,
+    DeletionJob,
+    Task,
+    Tombstone,
+    UserDataVersion,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_BATCH_PAUSE_SECONDS = 0.1
+DEFAULT_LEASE_SECONDS = 300
+# A job that fails this many times is left FAILED for someone to look at.
+MAX_ATTEMPTS = 3
+
+# (stage, model, field pointing at the deleted object, action), in order.
+STAGES = {
+    "category": [
+        ("tasks", Task, "category_id", "detach"),
+        ("archived_tasks", ArchivedTask, "category_id", "detach"),
+    ],
+    "user": [
+        ("tasks", Task, "user_id", "delete"),
+        ("archived_tasks", ArchivedTask, "user_id", "delete"),
+        ("tombstones", Tombstone, "user_id", "delete"),
+        ("categories", Category, "user_id", "delete"),
+    ],
+}
+
+
+def batch_size():
+    return getattr(settings, "DELETION_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def batch_pause():
+    return getattr(
+        settings, "DELETION_BATCH_PAUSE_SECONDS", DEFAULT_BATCH_PAUSE_SECONDS
+    )
+
+
+def lease_seconds():
+    return getattr(settings, "DELETION_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)
+
+
+def count_dependents(kind, object_id):
+    """The number of rows the stages of a ``kind`` job will process."""
+    return sum(
+        model.objects.filter(**{field: object_id}).count()
+        for _, model, field, _ in STAGES[kind]
+    )
+
+
+def schedule_category_deletion(category):
+    """Hide ``category`` from the API and queue its deletion."""
+    with transaction.atomic():
+        models.QuerySet.update(
+            Category.objects.filter(pk=category.pk),
+            pending_deletion=True,
+            updated_at=timezone.now(),
+        )
+        UserDataVersion.bump({category.user_id})
+        # Sync clients drop the category now, and its tasks as they are
+        # detached.
+        Tombstone.record("category", [(category.pk, category.user_id)])
+        job = DeletionJob.objects.create(
+            kind="category",
+            object_id=category.pk,
+            owner_id=category.user_id,
+            total=count_dependents("category", category.pk),
+        )
+    category.pending_deletion = True
+    return job
+
+
+def schedule_user_deletion(user):
+    """
+    Deactivate ``user``, which locks them out of the API, and queue their
+    deletion. The email address is released straight away.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.email = f"deleted-{user.pk}@deleted.invalid"
+        user.set_unusable_password()
+        # save() rather than update(), so cached authentications are dropped.
+        user.save(update_fields=["is_active", "email", "password"])
+        job = DeletionJob.objects.create(
+            kind="user",
+            object_id=user.pk,
+            owner_id=user.pk,
+            total=count_dependents("user", user.pk),
+        )
+    return job
+
+
+def claim_job(now=None):
+    """
+    Mark the oldest runnable job RUNNING under a lease and return it, or
+    None. Jobs whose worker died are runnable again once their lease expires.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        job = (
+            DeletionJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING") | Q(status="RUNNING", lease_expires_at__lt=now))
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "RUNNING"
+        job.attempts += 1
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds())
+        job.save(update_fields=["status", "attempts", "lease_expires_at", "updated_at"])
+    return job
+
+
+def _apply(job, batch, action):
+    if action == "detach":
+        if batch.model is Task:
+            batch.clear_category()
+            UserDataVersion.bump({job.owner_id})
+        else:
+            batch.update(category=None)
+    else:
+        # A plain DELETE: counters, tombstones and data versions of a user
+        # being deleted need no upkeep.
+        models.QuerySet.delete(batch)
+
+
+def run_batch(job, model, field, action, size):
+    """Process the next batch of the job's stage; return False once done."""
+    rows = model.objects.filter(**{field: job.object_id}).order_by("pk")
+    if job.last_id is not None:
+        rows = rows.filter(pk__gt=job.last_id)
+    with transaction.atomic():
+        ids = list(rows.values_list("pk", flat=True)[:size])
+        if not ids:
+            return False
+        _apply(job, model.objects.filter(pk__in=ids), action)
+        # Saved with the batch, so a resumed job neither skips nor repeats it.
+        job.last_id = ids[-1]
+        job.processed += len(ids)
+        job.lease_expires_at = timezone.now() + timedelta(seconds=lease_seconds())
+        job.save(
+            update_fields=[
+                "stage",
+                "last_id",
+                "processed",
+                "lease_expires_at",
+                "updated_at",
+            ]
+        )
+    return True
+
+
+def _finish(job):
+    with transaction.atomic():
+        if job.kind == "category":
+            # Its tombstone was recorded when the deletion was scheduled.
+            models.QuerySet.delete(Category.objects.filter(pk=job.object_id))
+            UserDataVersion.bump({job.owner_id})
+        else:
+            get_user_model().objects.filter(pk=job.object_id).delete()
+        job.status = "DONE"
+        job.stage = ""
+        job.last_id = None
+        job.error = ""
+        job.lease_expires_at = None
+        job.finished_at = timezone.now()
+        job.save()
+
+
+def run_job(job, size=None, pause=None, sleep=time.sleep):
+    """Run ``job`` to completion, resuming from its saved stage and position."""
+    size = batch_size() if size is None else size
+    pause = batch_pause() if pause is None else pause
+    stages = STAGES[job.kind]
+    names = [name for name, *_ in stages]
+    start = names.index(job.stage) if job.stage in names else 0
+    for name, model, field, action in stages[start:]:
+        if job.stage != name:
+            job.stage, job.last_id = name, None
+        while run_batch(job, model, field, action, size):
+            if pause:
+                sleep(pause)
+    _finish(job)
+    return job
+
+
+def process_deletions(size=None, pause=None, max_jobs=None, sleep=time.sleep):
+    """Run runnable jobs until there are none left; return the jobs run."""
+    jobs = []
+    while max_jobs is None or len(jobs) < max_jobs:
+        job = claim_job()
+        if job is None:
+            break
+        jobs.append(job)
+        try:
+            run_job(job, size=size, pause=pause, sleep=sleep)
+        except Exception as exc:
+            logger.exception("Deletion job %s failed", job.pk)
+            job.status = "FAILED" if job.attempts >= MAX_ATTEMPTS else "PENDING"
+            job.error = repr(exc)
+            job.lease_expires_at = None
+            job.save(
+                update_fields=["status", "error", "lease_expires_at", "updated_at"]
+            )
+    return jobs
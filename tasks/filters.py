@@ -1,13 +1,92 @@
+import operator
+from functools import reduce
+
+from django.db.models import Exists, Q
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter, SearchFilter
 
 from .models import Task
+from .search import filter_substring, get_search_backend
 
 
 class TaskFilter(filters.FilterSet):
-    title = filters.CharFilter(lookup_expr="icontains")
+    # Case-insensitive substring match, served by the trigram index.
+    title = filters.CharFilter(method="filter_title")
     due_date_from = filters.DateFilter(field_name="due_date", lookup_expr="gte")
     due_date_to = filters.DateFilter(field_name="due_date", lookup_expr="lte")
 
     class Meta:
         model = Task
         fields = ["status", "priority", "title", "due_date"]
+
+    def filter_title(self, queryset, name, value):
+        return filter_substring(queryset, name, value)
+
+
+class TaskOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that sorts ``priority`` by the stored ``priority_rank``
+    (LOW < MEDIUM < HIGH) rather than alphabetically, so that the ordering
+    can be served by the ``(user, priority_rank, created_at)`` index.
+    """
+
+    field_aliases = {"priority": "priority_rank"}
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [self._resolve_alias(term) for term in ordering]
+
+    def _resolve_alias(self, term):
+        prefix = "-" if term.startswith("-") else ""
+        field = term.lstrip("-")
+        return prefix + self.field_aliases.get(field, field)
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    ``?search=`` served by the database's full-text index.
+
+    Every term must match the title or the description, as with DRF's
+    SearchFilter, but matching is done on stemmed words that start with the
+    term rather than with ``icontains``. When that finds nothing, the search
+    falls back to ``icontains``, so terms from the middle of a word still
+    match as they used to. ``?rank=true`` orders matches by relevance,
+    keeping the requested ordering as a tie-breaker; it is ignored in cursor
+    pagination mode, which always pages on its own key.
+    """
+
+    rank_param = "rank"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        backend = get_search_backend(queryset.db)
+        if not terms or backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        matches = backend.filter(queryset, terms)
+        # Decided in the same query, so that it stays lazy for async views.
+        queryset = queryset.filter(
+            Q(pk__in=matches.values("pk"))
+            | (~Exists(matches) & self.substring_match(view, request, terms))
+        )
+        if self.rank_requested(request):
+            queryset = backend.annotate_rank(queryset, terms)
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.order_by("-search_rank", *ordering)
+        return queryset
+
+    def substring_match(self, view, request, terms):
+        """Every term in one of the search fields, like DRF's SearchFilter."""
+        fields = self.get_search_fields(view, request)
+        match = Q()
+        for term in terms:
+            match &= reduce(
+                operator.or_, [Q(**{f"{field}__icontains": term}) for field in fields]
+            )
+        return match
+
+    def rank_requested(self, request):
+        value = request.query_params.get(self.rank_param, "")
+        return value.lower() in ("1", "true", "yes")
@@ -0,0 +1,221 @@
+"""
+Bulk import of tasks from NDJSON or CSV.
+
+Rows are parsed one at a time and processed in batches: each batch is
+validated with TaskSerializer's rules, its category ids and names are
+resolved (and missing categories created) with a couple of set-based
+queries, and its valid rows are inserted with one ``bulk_create``. Only the
+current batch and a capped error list are held in memory, whatever the size
+of the input.
+"""
+
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+
+from .models import Category, Task
+from .serializers import TaskSerializer
+
+FORMATS = ("ndjson", "csv")
+NAME_MAX_LENGTH = Category._meta.get_field("name").max_length
+NAME_TOO_LONG = f"Category names cannot exceed {NAME_MAX_LENGTH} characters."
+UNKNOWN_CATEGORY = "You have no category with this id or name."
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(content_type="", filename=""):
+    """Return "ndjson" or "csv" for an upload, or None if unknown."""
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv") or filename.endswith(".csv"):
+        return "csv"
+    if content_type in (
+        "application/x-ndjson",
+        "application/jsonl",
+        "application/json-lines",
+    ) or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def parse_ndjson(stream):
+    """
+    Yield ``(row_number, row)`` for each non-blank line of a binary stream;
+    ``row`` is an ImportFormatError for lines that aren't JSON objects.
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            row = ImportFormatError(f"Invalid JSON: {exc}")
+        else:
+            if not isinstance(row, dict):
+                row = ImportFormatError("Each line must be a JSON object.")
+        yield number, row
+
+
+def parse_csv(stream):
+    """
+    Yield ``(row_number, row)`` for each record of a binary CSV stream with a
+    header line. Empty cells are left out, so they take the field defaults.
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    for row in reader:
+        yield reader.line_num, {
+            key: value for key, value in row.items() if key and value != ""
+        }
+
+
+PARSERS = {"ndjson": parse_ndjson, "csv": parse_csv}
+
+
+class TaskImporter:
+    """
+    Import rows for ``user``.
+
+    ``category`` in a row is the id of one of the user's categories (a
+    number, or a string of digits as in CSV files) or a category *name*;
+    names are matched without regard to case and missing categories are
+    created. A string of digits that isn't one of the user's category ids is
+    matched as a name. Fields TaskSerializer treats as read-only (``id``,
+    ``user``, timestamps) are ignored, so files produced by the export
+    endpoint can be imported again.
+    """
+
+    batch_size = 1000
+    max_errors = 1000
+
+    def __init__(self, user, batch_size=None, max_errors=None):
+        self.user = user
+        self.batch_size = batch_size or self.batch_size
+        self.max_errors = max_errors if max_errors is not None else self.max_errors
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        """Import ``(row_number, row)`` pairs and return the report."""
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def import_batch(self, batch):
+        with transaction.atomic():
+            by_id, by_name = self.resolve_categories(
+                row for _, row in batch if not isinstance(row, Exception)
+            )
+            # One bound serializer validates the whole batch, the way
+            # ListSerializer validates each item with its child.
+            categories = {c.pk: c for c in [*by_id.values(), *by_name.values()]}
+            serializer = TaskSerializer(context={"categories": categories})
+            tasks = []
+            for number, row in batch:
+                if isinstance(row, Exception):
+                    self.add_error(number, {"non_field_errors": [str(row)]})
+                    continue
+                name = row.get("category")
+                category_id = self.category_id(name)
+                if category_id in by_id or (
+                    category_id is not None and not isinstance(name, str)
+                ):
+                    # Ids of other users' categories fail validation.
+                    row = {**row, "category": category_id}
+                elif isinstance(name, str):
+                    category = by_name.get(name.strip().lower())
+                    if category is None and name.strip():
+                        error = (
+                            NAME_TOO_LONG if category_id is None else UNKNOWN_CATEGORY
+                        )
+                        self.add_error(number, {"category": [error]})
+                        continue
+                    row = {**row, "category": category.pk if category else None}
+                try:
+                    validated = serializer.run_validation(row)
+                except ValidationError as exc:
+                    self.add_error(number, exc.detail)
+                else:
+                    tasks.append(Task(user=self.user, **validated))
+            Task.objects.bulk_create(tasks)
+            self.created += len(tasks)
+
+    @staticmethod
+    def category_id(value):
+        """The category id ``value`` holds, or None if it isn't one."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().isdigit():
+            return int(value)
+        return None
+
+    def resolve_categories(self, rows):
+        """
+        Return the user's categories with the ids used in ``rows`` by id,
+        and those with the names used by lower-cased name, creating missing
+        named ones. Runs at most four queries.
+
+        Strings of digits are looked up both ways: a category with that id
+        wins, then one with that name. Categories aren't created for them,
+        since they are usually ids from someone else's export.
+        """
+        ids, names = set(), {}
+        for row in rows:
+            name = row.get("category")
+            if self.category_id(name) is not None:
+                ids.add(self.category_id(name))
+            if isinstance(name, str) and 0 < len(name.strip()) <= NAME_MAX_LENGTH:
+                names.setdefault(name.strip().lower(), name.strip())
+
+        # Ids the user doesn't own stay unresolved.
+        by_id = {}
+        if ids:
+            by_id = {
+                category.pk: category
+                for category in Category.objects.visible().filter(
+                    user=self.user, pk__in=ids
+                )
+            }
+        if not names:
+            return by_id, {}
+
+        by_name = self._categories_named(names)
+        missing = [
+            Category(name=name, user=self.user)
+            for key, name in names.items()
+            if key not in by_name and self.category_id(key) is None
+        ]
+        if missing:
+            Category.objects.bulk_create(missing, ignore_conflicts=True)
+            by_name = self._categories_named(names)
+        return by_id, by_name
+
+    def _categories_named(self, names):
+        queryset = (
+            Category.objects.visible()
+            .filter(user=self.user)
+            .annotate(lower_name=Lower("name"))
+            .filter(lower_name__in=list(names))
+        )
+        return {category.lower_name: category for category in queryset}
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "errors": errors})
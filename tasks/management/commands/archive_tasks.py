@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_after_days, archive_done_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Move DONE tasks that haven't been updated for a while to the archive "
+        "table. Safe to run while the API is serving requests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive tasks older than this (default: TASK_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        days = archive_after_days() if options["days"] is None else options["days"]
+        archived = archive_done_tasks(days, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {archived} tasks done over {days} days ago.")
+        )
@@ -0,0 +1,116 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from tasks.benchmarks import data, runner
+from tasks.models import TaskStatistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the filter, serializer, service and validation layers on a "
+        "deterministic dataset and print the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        dataset = parser.add_argument_group("dataset")
+        dataset.add_argument(
+            "--generate",
+            action="store_true",
+            help="(Re)create the benchmark dataset before timing.",
+        )
+        dataset.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the benchmark dataset and exit.",
+        )
+        dataset.add_argument("--users", type=int, default=100)
+        dataset.add_argument("--tasks", type=int, default=100_000)
+        dataset.add_argument("--seed", type=int, default=0)
+
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--case",
+            dest="patterns",
+            action="append",
+            metavar="PATTERN",
+            help="Only run cases matching this glob, e.g. 'filter.*'. May be repeated.",
+        )
+        parser.add_argument("--list", action="store_true", help="List the cases.")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--baseline", help="Compare with a JSON report from an earlier run."
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Median slowdown, as a fraction, that counts as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        names = runner.select_cases(options["patterns"])
+        if options["list"]:
+            self.stdout.write("\n".join(names))
+            return
+        if options["clear"]:
+            data.clear()
+            self.stdout.write(self.style.SUCCESS("Benchmark dataset deleted."))
+            return
+        if not names:
+            raise CommandError("No benchmark cases match.")
+
+        if options["generate"]:
+            data.generate(
+                users=options["users"],
+                tasks=options["tasks"],
+                seed=options["seed"],
+                stdout=self.stderr,
+            )
+
+        # Per-user cases run as the heaviest user, where slow plans show.
+        counters = TaskStatistics.objects.filter(user__in=data.benchmark_users())
+        heaviest = counters.select_related("user").order_by("-total_tasks").first()
+        if heaviest is None:
+            raise CommandError("No benchmark dataset; run with --generate first.")
+        dataset = {
+            "users": data.benchmark_users().count(),
+            "tasks": counters.aggregate(total=Sum("total_tasks"))["total"],
+            "user_tasks": heaviest.total_tasks,
+        }
+
+        report = runner.run(heaviest.user, names, options["repeat"], dataset)
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["threshold"])
+
+    def compare(self, report, path, threshold):
+        try:
+            with open(path) as handle:
+                baseline = json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Can't read baseline {path}: {exc}")
+
+        rows = runner.compare(report, baseline, threshold)
+        for row in rows:
+            line = (
+                f"{row['case']:<45} {row['baseline_ms']:>9.3f} ms -> "
+                f"{row['current_ms']:>9.3f} ms ({row['change']:+.1%})"
+            )
+            if row["regression"]:
+                line = self.style.ERROR(line + "  REGRESSION")
+            self.stderr.write(line)
+
+        regressions = [row["case"] for row in rows if row["regression"]]
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} case(s) regressed by more than "
+                f"{threshold:.0%}: {', '.join(regressions)}"
+            )
@@ -0,0 +1,179 @@
+import asyncio
+import io
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of a task endpoint served by the sync "
+        "views over WSGI, the sync views over ASGI and the async views over ASGI."
+    )
+
+    scenarios = {
+        "wsgi": ("wsgi", "/api"),
+        "asgi-sync": ("asgi", "/api"),
+        "asgi-async": ("asgi", "/api/async"),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email", required=True, help="User whose token the requests carry."
+        )
+        parser.add_argument(
+            "--path",
+            default="/tasks/",
+            help="Endpoint below /api/, with any query string (default /tasks/).",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument(
+            "--host", default="localhost", help="Host header; must be allowed."
+        )
+        parser.add_argument(
+            "--scenario",
+            dest="scenarios",
+            action="append",
+            choices=sorted(self.scenarios),
+            help="Run only this scenario. May be repeated.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+        self.token = f"Bearer {AccessToken.for_user(user)}"
+        self.host = options["host"]
+
+        results = []
+        for name in options["scenarios"] or list(self.scenarios):
+            server, prefix = self.scenarios[name]
+            run = self.run_wsgi if server == "wsgi" else self.run_asgi
+            url = urlsplit(prefix + options["path"])
+            run(url, options["warmup"], options["concurrency"])
+            started = time.perf_counter()
+            latencies, errors = run(url, options["requests"], options["concurrency"])
+            elapsed = time.perf_counter() - started
+            results.append(
+                {
+                    "scenario": name,
+                    "requests": options["requests"],
+                    "concurrency": options["concurrency"],
+                    "errors": errors,
+                    "throughput": options["requests"] / elapsed,
+                    "p50_ms": percentile(latencies, 0.50) * 1000,
+                    "p99_ms": percentile(latencies, 0.99) * 1000,
+                }
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'scenario':<12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['scenario']:<12} {row['throughput']:>9.1f} "
+                f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['errors']:>7}"
+            )
+
+    def run_wsgi(self, url, count, concurrency):
+        application = get_wsgi_application()
+
+        def request(_):
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": url.path,
+                "QUERY_STRING": url.query,
+                "SERVER_NAME": self.host,
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": self.host,
+                "HTTP_AUTHORIZATION": self.token,
+                "wsgi.input": io.BytesIO(),
+                "wsgi.errors": sys.stderr,
+                "wsgi.url_scheme": "http",
+            }
+            statuses = []
+            started = time.perf_counter()
+            response = application(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            b"".join(response)
+            response.close()
+            return time.perf_counter() - started, statuses[0].startswith("200")
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(request, range(count)))
+        return self._summarize(outcomes)
+
+    def run_asgi(self, url, count, concurrency):
+        application = get_asgi_application()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [
+                (b"host", self.host.encode()),
+                (b"authorization", self.token.encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": (self.host, 80),
+        }
+
+        async def request(semaphore):
+            body_sent = False
+            statuses = []
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                # Never disconnect; the handler cancels this wait when done.
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.append(message["status"])
+
+            async with semaphore:
+                started = time.perf_counter()
+                await application(dict(scope), receive, send)
+                return time.perf_counter() - started, statuses[0] == 200
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(request(semaphore) for _ in range(count)))
+
+        return self._summarize(asyncio.run(main()))
+
+    def _summarize(self, outcomes):
+        latencies = [latency for latency, _ in outcomes]
+        errors = sum(1 for _, ok in outcomes if not ok)
+        return latencies, errors
@@ -0,0 +1,157 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the connection overhead of concurrent short requests when "
+        "each request opens its own connection, when threads keep persistent "
+        "connections and when they borrow from a connection pool."
+    )
+
+    scenarios = ["connect", "persistent", "pool"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--pool-size",
+            type=int,
+            help="max_size of the pool (default: the database's setting).",
+        )
+        parser.add_argument(
+            "--scenario",
+            dest="scenarios",
+            action="append",
+            choices=self.scenarios,
+            help="Run only this scenario. May be repeated.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON.")
+
+    def handle(self, *args, **options):
+        base = connections[options["database"]]
+        pooling = base.vendor == "postgresql" and base.features.is_psycopg3
+        scenarios = options["scenarios"] or [
+            name for name in self.scenarios if name != "pool" or pooling
+        ]
+        if "pool" in scenarios and not pooling:
+            raise CommandError("Pooling needs PostgreSQL with psycopg 3.")
+
+        results = []
+        for name in scenarios:
+            settings_dict = self.settings_for(name, base.settings_dict, options)
+            results.append(self.run(name, settings_dict, options))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{'scenario':<12} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} "
+            f"{'connect ms':>11} {'opened':>7}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['scenario']:<12} {row['throughput']:>9.1f} "
+                f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} "
+                f"{row['connect_ms']:>11.3f} {row['connections_opened']:>7}"
+            )
+
+    def settings_for(self, scenario, base_settings, options):
+        settings_dict = deepcopy(base_settings)
+        pool = settings_dict["OPTIONS"].pop("pool", None)
+        if scenario == "connect":
+            settings_dict["CONN_MAX_AGE"] = 0
+        elif scenario == "persistent":
+            settings_dict["CONN_MAX_AGE"] = None
+            settings_dict["CONN_HEALTH_CHECKS"] = True
+        else:
+            pool = dict(pool) if isinstance(pool, dict) else {}
+            if options["pool_size"]:
+                pool["max_size"] = options["pool_size"]
+                pool["min_size"] = min(pool.get("min_size", 4), pool["max_size"])
+            settings_dict["OPTIONS"]["pool"] = pool
+            settings_dict["CONN_MAX_AGE"] = 0
+            settings_dict["CONN_HEALTH_CHECKS"] = True
+        return settings_dict
+
+    def run(self, scenario, settings_dict, options):
+        """
+        Serve ``requests`` requests of one ``SELECT 1`` each from
+        ``concurrency`` threads, with the connection handling Django applies
+        around a request, and time them.
+        """
+        alias = f"benchmark_{scenario}"
+        backend = load_backend(settings_dict["ENGINE"])
+        local = threading.local()
+        wrappers = []
+        opened = []
+
+        def count_opened(sender, connection, **kwargs):
+            if connection.alias == alias:
+                opened.append(1)
+
+        def request(_):
+            if not hasattr(local, "wrapper"):
+                local.wrapper = backend.DatabaseWrapper(deepcopy(settings_dict), alias)
+                # Let the main thread close it when the run is over.
+                local.wrapper.inc_thread_sharing()
+                wrappers.append(local.wrapper)
+            wrapper = local.wrapper
+            started = time.perf_counter()
+            wrapper.close_if_unusable_or_obsolete()  # request_started
+            wrapper.ensure_connection()
+            connected = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            wrapper.close_if_unusable_or_obsolete()  # request_finished
+            finished = time.perf_counter()
+            return finished - started, connected - started
+
+        connection_created.connect(count_opened)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                outcomes = list(executor.map(request, range(options["requests"])))
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_opened)
+            for wrapper in wrappers:
+                wrapper.close()
+                wrapper.dec_thread_sharing()
+
+        connections_opened = len(opened)
+        if scenario == "pool":
+            # The signal fires on every checkout; the pool knows how many
+            # connections it really opened.
+            connections_opened = wrappers[0].pool.get_stats().get("connections_num", 0)
+            wrappers[0].close_pool()
+
+        latencies = [latency for latency, _ in outcomes]
+        return {
+            "scenario": scenario,
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "throughput": options["requests"] / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "connect_ms": sum(connect for _, connect in outcomes)
+            * 1000
+            / len(outcomes),
+            "connections_opened": connections_opened,
+        }
@@ -0,0 +1,55 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importers import FORMATS, PARSERS, TaskImporter, detect_format
+
+
+class Command(BaseCommand):
+    help = "Import tasks for a user from an NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--user", required=True, metavar="EMAIL")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format (default: from the file extension).",
+        )
+        parser.add_argument("--batch-size", type=int, default=TaskImporter.batch_size)
+        parser.add_argument(
+            "--errors",
+            type=int,
+            default=TaskImporter.max_errors,
+            help="Report at most this many row errors.",
+        )
+
+    def handle(self, *args, path, user, batch_size, errors, **options):
+        try:
+            owner = get_user_model().objects.get(email=user)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {user}")
+
+        file_format = options["format"] or detect_format(filename=path)
+        if file_format is None:
+            raise CommandError("Can't tell the format from the path; use --format.")
+
+        importer = TaskImporter(owner, batch_size=batch_size, max_errors=errors)
+        if path == "-":
+            report = importer.run(PARSERS[file_format](sys.stdin.buffer))
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    report = importer.run(PARSERS[file_format](stream))
+            except OSError as exc:
+                raise CommandError(f"Can't read {path}: {exc}")
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        if report["errors_truncated"]:
+            self.stderr.write("(more errors not shown)")
+        summary = f"Imported {report['created']} tasks, {report['failed']} rows failed."
+        style = self.style.WARNING if report["failed"] else self.style.SUCCESS
+        self.stdout.write(style(summary))
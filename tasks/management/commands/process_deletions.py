@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from tasks.deletion import batch_pause, batch_size, process_deletions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the users and categories queued for deletion, a batch of "
+        "dependent rows at a time. Resumes jobs interrupted by a crash; run "
+        "it periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows per transaction (default: DELETION_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            help="Seconds between batches (default: DELETION_BATCH_PAUSE_SECONDS).",
+        )
+        parser.add_argument("--max-jobs", type=int, help="Stop after this many jobs.")
+
+    def handle(self, *args, **options):
+        size = batch_size() if options["batch_size"] is None else options["batch_size"]
+        pause = batch_pause() if options["pause"] is None else options["pause"]
+        jobs = process_deletions(size=size, pause=pause, max_jobs=options["max_jobs"])
+        for job in jobs:
+            message = (
+                f"{job.kind} {job.object_id}: {job.status}, "
+                f"{job.processed}/{job.total} rows"
+            )
+            if job.status == "DONE":
+                self.stdout.write(self.style.SUCCESS(message))
+            else:
+                self.stdout.write(self.style.ERROR(f"{message} ({job.error})"))
+        self.stdout.write(f"Processed {len(jobs)} deletion jobs.")
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import Tombstone
+from tasks.sync import tombstone_retention
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than the retention period."
+
+    batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Keep tombstones this many days (default: SYNC_TOMBSTONE_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, days=None, **options):
+        retention = tombstone_retention() if days is None else timedelta(days=days)
+        cutoff = timezone.now() - retention
+        deleted = 0
+        while True:
+            ids = list(
+                Tombstone.objects.filter(deleted_at__lt=cutoff).values_list(
+                    "pk", flat=True
+                )[: self.batch_size]
+            )
+            if not ids:
+                break
+            deleted += Tombstone.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones."))
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks.models import TaskStatistics
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or, with --check, verify) the per-user TaskStatistics counters."
+
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report users whose counters differ; exit non-zero on drift.",
+        )
+        parser.add_argument(
+            "--user",
+            dest="emails",
+            action="append",
+            metavar="EMAIL",
+            help="Limit to the user with this email. May be repeated.",
+        )
+
+    def handle(self, *args, check=False, emails=None, **options):
+        users = get_user_model().objects.order_by("pk")
+        if emails:
+            users = users.filter(email__in=emails)
+        user_ids = list(users.values_list("pk", flat=True))
+
+        drifted = 0
+        for start in range(0, len(user_ids), self.batch_size):
+            end = start + self.batch_size
+            drifted += self.process_batch(user_ids[start:end], check)
+
+        summary = f"{drifted} of {len(user_ids)} users had drifted counters"
+        if check and drifted:
+            raise CommandError(summary)
+        if not check:
+            summary += " (rebuilt)" if drifted else ""
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def process_batch(self, user_ids, check):
+        drifted = 0
+        zero = dict.fromkeys(TaskStatistics.COUNTERS, 0)
+        with transaction.atomic():
+            # Lock the counter rows so that concurrent task writes apply their
+            # deltas after the rebuilt values, not before them.
+            stored = {
+                row.user_id: row
+                for row in TaskStatistics.objects.select_for_update().filter(
+                    user_id__in=user_ids
+                )
+            }
+            actual = TaskStatistics.compute(user_ids)
+            for user_id in user_ids:
+                expected = actual.get(user_id, zero)
+                row = stored.get(user_id)
+                current = row.as_dict() if row else zero
+                if current == expected:
+                    continue
+                drifted += 1
+                self.stdout.write(
+                    f"user {user_id}: stored {current}, actual {expected}"
+                )
+                if not check:
+                    TaskStatistics.objects.update_or_create(
+                        user_id=user_id, defaults=expected
+                    )
+        return drifted
@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.reminders import get_sink, send_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Send every user a digest of their overdue and due-soon open tasks. "
+        "Meant to run once a day from cron or another scheduler."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sink",
+            default="email",
+            help="'email', 'file' or the dotted path of a sink class.",
+        )
+        parser.add_argument("--output", help="Path for the file sink.")
+        parser.add_argument("--due-soon-days", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--max-items",
+            type=int,
+            default=20,
+            help="List at most this many tasks per section of a digest.",
+        )
+        parser.add_argument(
+            "--today",
+            type=date.fromisoformat,
+            help="Pretend today is this date (YYYY-MM-DD).",
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {}
+        if options["sink"] == "file":
+            if not options["output"]:
+                raise CommandError("The file sink needs --output.")
+            kwargs["path"] = options["output"]
+        try:
+            sink = get_sink(options["sink"], **kwargs)
+        except ImportError as exc:
+            raise CommandError(f"Unknown sink {options['sink']}: {exc}")
+
+        try:
+            sent = send_reminders(
+                sink,
+                today=options["today"],
+                due_soon_days=options["due_soon_days"],
+                batch_size=options["batch_size"],
+                max_items=options["max_items"],
+            )
+        finally:
+            sink.close()
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminder digests."))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_alter_category_options_alter_task_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                name="tasks_task_user_id_7e4d64_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from tasks.search import install_search_index, uninstall_search_index
+
+
+class Migration(migrations.Migration):
+    """
+    Create the full-text search index used by ``?search=``: a generated
+    tsvector column with a GIN index on PostgreSQL, an FTS5 table on SQLite.
+    """
+
+    dependencies = [
+        ("tasks", "0006_task_user_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_priority_rank(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    # MEDIUM rows already carry the column default.
+    for priority, rank in (("LOW", 1), ("HIGH", 3)):
+        Task.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_task_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(
+                default=2,
+                editable=False,
+                help_text="Numeric priority (LOW=1, MEDIUM=2, HIGH=3) used for ordering",
+                verbose_name="Priority Rank",
+            ),
+        ),
+        migrations.RunPython(populate_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "priority_rank", "created_at"],
+                name="tasks_task_user_id_9af9ce_idx",
+            ),
+        ),
+    ]
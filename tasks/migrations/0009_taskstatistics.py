@@ -0,0 +1,93 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUS_COUNTERS = {
+    "TODO": "todo_count",
+    "IN_PROGRESS": "in_progress_count",
+    "DONE": "done_count",
+}
+PRIORITY_COUNTERS = {
+    "LOW": "low_priority_count",
+    "MEDIUM": "medium_priority_count",
+    "HIGH": "high_priority_count",
+}
+
+
+def populate_statistics(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskStatistics = apps.get_model("tasks", "TaskStatistics")
+
+    statistics = {}
+    groups = (
+        Task.objects.order_by()
+        .values_list("user_id", "status", "priority")
+        .annotate(count=Count("id"))
+    )
+    for user_id, status, priority, count in groups:
+        row = statistics.setdefault(user_id, TaskStatistics(user_id=user_id))
+        row.total_tasks += count
+        if status in STATUS_COUNTERS:
+            field = STATUS_COUNTERS[status]
+            setattr(row, field, getattr(row, field) + count)
+        if priority in PRIORITY_COUNTERS:
+            field = PRIORITY_COUNTERS[priority]
+            setattr(row, field, getattr(row, field) + count)
+    TaskStatistics.objects.bulk_create(statistics.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_priority_rank"),
+        ("users", "0003_alter_customuser_email_alter_customuser_first_name_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskStatistics",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_statistics",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+                (
+                    "total_tasks",
+                    models.IntegerField(default=0, verbose_name="Total Tasks"),
+                ),
+                ("todo_count", models.IntegerField(default=0, verbose_name="To Do")),
+                (
+                    "in_progress_count",
+                    models.IntegerField(default=0, verbose_name="In Progress"),
+                ),
+                ("done_count", models.IntegerField(default=0, verbose_name="Done")),
+                (
+                    "low_priority_count",
+                    models.IntegerField(default=0, verbose_name="Low Priority"),
+                ),
+                (
+                    "medium_priority_count",
+                    models.IntegerField(default=0, verbose_name="Medium Priority"),
+                ),
+                (
+                    "high_priority_count",
+                    models.IntegerField(default=0, verbose_name="High Priority"),
+                ),
+            ],
+            options={
+                "verbose_name": "Task Statistics",
+                "verbose_name_plural": "Task Statistics",
+            },
+        ),
+        migrations.RunPython(populate_statistics, migrations.RunPython.noop),
+    ]
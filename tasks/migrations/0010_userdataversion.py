@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_taskstatistics"),
+        ("users", "0003_alter_customuser_email_alter_customuser_first_name_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserDataVersion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="data_version",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0, verbose_name="Version")),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Updated At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "User Data Version",
+                "verbose_name_plural": "User Data Versions",
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_category_updated_at_tombstone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("due_date__isnull", False), ("status__in", ["TODO", "IN_PROGRESS"])
+                ),
+                fields=["user", "due_date", "id"],
+                name="tasks_task_open_due_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from tasks.search import install_trigram_indexes, uninstall_trigram_indexes
+
+
+class Migration(migrations.Migration):
+    """
+    Create the trigram indexes used for substring matching of task titles
+    and category names: pg_trgm GIN indexes on PostgreSQL, FTS5 trigram
+    tables on SQLite.
+    """
+
+    dependencies = [
+        ("tasks", "0012_task_open_due_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_trigram_indexes, uninstall_trigram_indexes),
+    ]
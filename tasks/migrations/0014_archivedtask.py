@@ -0,0 +1,115 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0013_trigram_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTask",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(
+                        primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("title", models.CharField(max_length=200, verbose_name="Title")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Description"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("TODO", "To Do"),
+                            ("IN_PROGRESS", "In Progress"),
+                            ("DONE", "Done"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Low"),
+                            ("MEDIUM", "Medium"),
+                            ("HIGH", "High"),
+                        ],
+                        max_length=10,
+                        verbose_name="Priority",
+                    ),
+                ),
+                (
+                    "priority_rank",
+                    models.PositiveSmallIntegerField(verbose_name="Priority Rank"),
+                ),
+                (
+                    "due_date",
+                    models.DateField(blank=True, null=True, verbose_name="Due Date"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Created At")),
+                ("updated_at", models.DateTimeField(verbose_name="Updated At")),
+                (
+                    "archived_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Archived At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Task",
+                "verbose_name_plural": "Archived Tasks",
+                "ordering": ["-archived_at", "-id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status", "DONE")),
+                fields=["updated_at", "id"],
+                name="tasks_task_done_updated_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="archived_tasks",
+                to="tasks.category",
+                verbose_name="Category",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_tasks",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="User",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedtask",
+            index=models.Index(
+                fields=["user", "archived_at", "id"],
+                name="tasks_archi_user_id_9ba7f0_idx",
+            ),
+        ),
+    ]
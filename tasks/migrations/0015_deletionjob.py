@@ -0,0 +1,130 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0014_archivedtask"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletionJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("user", "User"), ("category", "Category")],
+                        max_length=20,
+                        verbose_name="Kind",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="Object ID")),
+                ("owner_id", models.BigIntegerField(verbose_name="Owner ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("RUNNING", "Running"),
+                            ("DONE", "Done"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(blank=True, max_length=30, verbose_name="Stage"),
+                ),
+                (
+                    "last_id",
+                    models.BigIntegerField(
+                        blank=True, null=True, verbose_name="Last ID"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Processed"),
+                ),
+                (
+                    "total",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Total"),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "lease_expires_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Lease Expires At"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Deletion Job",
+                "verbose_name_plural": "Deletion Jobs",
+                "ordering": ["-created_at", "-id"],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name="category",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="pending_deletion",
+            field=models.BooleanField(default=False, verbose_name="Pending Deletion"),
+        ),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("pending_deletion", False)),
+                fields=("name", "user"),
+                name="tasks_category_unique_name",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deletionjob",
+            index=models.Index(
+                fields=["status", "created_at"], name="tasks_delet_status_38ff1a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="deletionjob",
+            index=models.Index(
+                fields=["owner_id", "created_at"], name="tasks_delet_owner_i_007813_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:35
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def rename_case_duplicates(apps, schema_editor):
+    """
+    Rename categories whose name differs only in case from an older
+    category of the same user, which the new constraint would reject.
+    """
+    Category = apps.get_model("tasks", "Category")
+    seen = set()
+    categories = (
+        Category.objects.filter(pending_deletion=False)
+        .annotate(lower_name=Lower("name"))
+        .order_by("user_id", "lower_name", "id")
+    )
+    for category in categories.iterator():
+        key = (category.user_id, category.lower_name)
+        if key in seen:
+            suffix = f" ({category.pk})"
+            category.name = category.name[: 100 - len(suffix)] + suffix
+            category.save(update_fields=["name"])
+        seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0015_deletionjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="category",
+            name="tasks_category_unique_name",
+        ),
+        migrations.RunPython(rename_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(
+                models.F("user"),
+                django.db.models.functions.text.Lower("name"),
+                condition=models.Q(("pending_deletion", False)),
+                name="tasks_category_unique_name",
+            ),
+        ),
+    ]
@@ -1,5 +1,210 @@
+from collections import Counter, defaultdict
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+from django.utils import timezone
+
+# Statuses of tasks that can still become overdue.
+OPEN_STATUSES = ["TODO", "IN_PROGRESS"]
+
+# Case-insensitive unique index on the user's category names.
+UNIQUE_NAME_CONSTRAINT = "tasks_category_unique_name"
+
+PRIORITY_RANKS = {
+    "LOW": 1,
+    "MEDIUM": 2,
+    "HIGH": 3,
+}
+
+
+def priority_rank_for(priority):
+    """
+    Return the rank for a priority value, or an expression computing it when
+    ``priority`` is itself an expression (e.g. in a queryset ``update()``).
+    """
+    if isinstance(priority, str):
+        return PRIORITY_RANKS.get(priority, 0)
+    return Case(
+        *[
+            When(Exact(priority, name), then=Value(rank))
+            for name, rank in PRIORITY_RANKS.items()
+        ],
+        default=Value(0),
+        output_field=models.PositiveSmallIntegerField(),
+    )
+
+
+# Fields whose changes move a task between TaskStatistics counters.
+COUNTED_FIELDS = {"user", "user_id", "status", "priority"}
+
+
+def counter_deltas(removed=(), added=()):
+    """
+    Turn ``(pk, user_id, status, priority)`` rows that left or entered the
+    task table into per-user counter changes for TaskStatistics.
+    """
+    deltas = defaultdict(Counter)
+    for rows, sign in ((removed, -1), (added, 1)):
+        for _pk, user_id, status, priority in rows:
+            for field in TaskStatistics.counters_for(status, priority):
+                deltas[user_id][field] += sign
+    return deltas
+
+
+def record_task_writes(removed=(), added=()):
+    """
+    Bookkeeping for ``(pk, user_id, status, priority)`` rows that left or
+    entered the task table (an update is both): adjust the owners'
+    TaskStatistics counters and bump their UserDataVersion.
+    """
+    TaskStatistics.apply_deltas(counter_deltas(removed, added))
+    UserDataVersion.bump({row[1] for row in (*removed, *added)})
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Keeps derived data in step with bulk write paths: ``priority_rank``
+    follows ``priority``, and the owners' TaskStatistics counters and
+    UserDataVersion are updated in the same transaction as the write.
+    """
+
+    def with_owner(self):
+        """
+        Join the owner's email, which TaskSerializer renders for ``user``,
+        so that serializing a page doesn't run one user query per task.
+        """
+        fields = [field.name for field in self.model._meta.concrete_fields]
+        return self.select_related("user").only(*fields, "user__email")
+
+    def for_fields(self, fields=None, expand=()):
+        """
+        ``with_owner()`` narrowed to the columns TaskSerializer needs to
+        render ``fields`` (all of them when None), with the category joined
+        in when ``expand`` includes it.
+        """
+        if fields is None:
+            fields = [field.name for field in self.model._meta.concrete_fields]
+        columns = ["id", *fields]
+        related = []
+        if "user" in fields:
+            related.append("user")
+            columns.append("user__email")
+        if "category" in fields and "category" in expand:
+            related.append("category")
+            columns += ["category__name", "category__color"]
+        return self.select_related(*related).only(*columns)
+
+    def _write_db(self):
+        return self._db or router.db_for_write(self.model)
+
+    def _locked_counter_rows(self):
+        return list(
+            self.select_for_update(of=("self",)).values_list(
+                "pk", "user_id", "status", "priority"
+            )
+        )
+
+    def update(self, **kwargs):
+        if "priority" in kwargs:
+            kwargs.setdefault("priority_rank", priority_rank_for(kwargs["priority"]))
+        # auto_now isn't applied by update(); delta sync relies on it.
+        kwargs.setdefault("updated_at", timezone.now())
+
+        with transaction.atomic(using=self._write_db()):
+            before = self._locked_counter_rows()
+            rows = super().update(**kwargs)
+            after = before
+            if COUNTED_FIELDS.intersection(kwargs):
+                after = self._rows_after_update(before, kwargs)
+            record_task_writes(before, after)
+        return rows
+
+    def _rows_after_update(self, before, kwargs):
+        changes = {}
+        for field in COUNTED_FIELDS.intersection(kwargs):
+            value = kwargs[field]
+            if hasattr(value, "resolve_expression"):
+                # Can't evaluate expressions here; read the new values back.
+                return (
+                    self.model.objects.using(self._write_db())
+                    .filter(pk__in=[row[0] for row in before])
+                    ._locked_counter_rows()
+                )
+            if isinstance(value, models.Model):
+                value = value.pk
+            changes["user_id" if field == "user" else field] = value
+        return [
+            (
+                pk,
+                changes.get("user_id", user_id),
+                changes.get("status", status),
+                changes.get("priority", priority),
+            )
+            for pk, user_id, status, priority in before
+        ]
+
+    def delete(self):
+        with transaction.atomic(using=self._write_db()):
+            before = self._locked_counter_rows()
+            result = super().delete()
+            record_task_writes(removed=before)
+            Tombstone.record("task", [(pk, user_id) for pk, user_id, *_ in before])
+        return result
+
+    def clear_category(self):
+        """
+        Unset the category, bumping ``updated_at`` so that delta sync sees
+        the change; the SET_NULL cascade would leave ``updated_at`` alone.
+        Counters don't depend on the category and callers deleting the
+        category bump the owner's data version, so this is a plain UPDATE.
+        """
+        return super().update(category=None, updated_at=timezone.now())
+
+    def archive(self, skip_locked=False):
+        """
+        Move the rows to ArchivedTask and return the moved tasks. Statistics
+        keep counting archived tasks, so counters are left alone; delta sync
+        sees the tasks as deleted. With ``skip_locked``, rows locked by
+        another transaction are left where they are.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self._write_db()):
+            tasks = list(self.select_for_update(skip_locked=skip_locked, of=("self",)))
+            if not tasks:
+                return []
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask.from_task(task, archived_at=now) for task in tasks]
+            )
+            # A plain DELETE, without this class's bookkeeping.
+            models.QuerySet.delete(
+                self.model.objects.filter(pk__in=[task.pk for task in tasks])
+            )
+            Tombstone.record("task", [(task.pk, task.user_id) for task in tasks])
+            UserDataVersion.bump({task.user_id for task in tasks})
+        return tasks
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.priority_rank = priority_rank_for(obj.priority)
+        with transaction.atomic(using=self._write_db()):
+            created = super().bulk_create(objs, *args, **kwargs)
+            added = [(obj.pk, obj.user_id, obj.status, obj.priority) for obj in created]
+            record_task_writes(added=added)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        if "priority" in fields:
+            for obj in objs:
+                obj.priority_rank = priority_rank_for(obj.priority)
+            if "priority_rank" not in fields:
+                fields.append("priority_rank")
+        return super().bulk_update(objs, fields, *args, **kwargs)
 
 
 class Task(models.Model):
@@ -39,6 +244,12 @@ class Task(models.Model):
         verbose_name="Priority",
         db_index=True,
     )
+    priority_rank = models.PositiveSmallIntegerField(
+        default=PRIORITY_RANKS["MEDIUM"],
+        editable=False,
+        verbose_name="Priority Rank",
+        help_text="Numeric priority (LOW=1, MEDIUM=2, HIGH=3) used for ordering",
+    )
     due_date = models.DateField(
         null=True,
         blank=True,
@@ -71,6 +282,8 @@ class Task(models.Model):
         verbose_name="Updated At",
     )
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Task"
@@ -79,11 +292,157 @@ class Task(models.Model):
             models.Index(fields=["user", "status"]),
             models.Index(fields=["user", "priority"]),
             models.Index(fields=["user", "due_date"]),
+            models.Index(fields=["user", "created_at", "id"]),
+            models.Index(fields=["user", "priority_rank", "created_at"]),
+            models.Index(fields=["user", "updated_at", "id"]),
+            # Completed tasks by age, for the archival scan.
+            models.Index(
+                fields=["updated_at", "id"],
+                condition=Q(status="DONE"),
+                name="tasks_task_done_updated_idx",
+            ),
+            # Open tasks with a due date only: serves the overdue list and
+            # count per user, and the reminder scan across users.
+            models.Index(
+                fields=["user", "due_date", "id"],
+                condition=Q(status__in=OPEN_STATUSES, due_date__isnull=False),
+                name="tasks_task_open_due_idx",
+            ),
         ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.priority_rank = priority_rank_for(self.priority)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "priority" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "priority_rank"}
+
+        with transaction.atomic(using=router.db_for_write(Task, instance=self)):
+            before = []
+            if not self._state.adding:
+                before = Task.objects.filter(pk=self.pk)._locked_counter_rows()
+            super().save(*args, **kwargs)
+            after = (self.pk, self.user_id, self.status, self.priority)
+            if before and update_fields is not None:
+                # Fields left out of update_fields keep their stored values.
+                saved = {"user_id" if f == "user" else f for f in update_fields}
+                after = tuple(
+                    new if name in saved else old
+                    for name, new, old in zip(
+                        ("pk", "user_id", "status", "priority"), after, before[0]
+                    )
+                )
+            record_task_writes(before, [after])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(Task, instance=self)):
+            before = Task.objects.filter(pk=self.pk)._locked_counter_rows()
+            result = super().delete(*args, **kwargs)
+            record_task_writes(removed=before)
+            Tombstone.record("task", [(pk, user_id) for pk, user_id, *_ in before])
+        return result
+
+
+class CategoryQuerySet(models.QuerySet):
+    """Bumps the owners' UserDataVersion on bulk write paths."""
+
+    def _write_db(self):
+        return self._db or router.db_for_write(self.model)
+
+    def _owner_ids(self):
+        return set(self.order_by().values_list("user_id", flat=True).distinct())
+
+    def visible(self):
+        """Categories not scheduled for deletion (see ``tasks.deletion``)."""
+        return self.filter(pending_deletion=False)
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        with transaction.atomic(using=self._write_db()):
+            owners = self._owner_ids()
+            rows = super().update(**kwargs)
+            new_owner = kwargs.get("user_id", kwargs.get("user"))
+            if isinstance(new_owner, models.Model):
+                new_owner = new_owner.pk
+            if isinstance(new_owner, int):
+                owners.add(new_owner)
+            UserDataVersion.bump(owners)
+        return rows
+
+    def delete(self):
+        with transaction.atomic(using=self._write_db()):
+            rows = list(self.order_by().values_list("pk", "user_id"))
+            Task.objects.filter(category__in=[pk for pk, _ in rows]).clear_category()
+            result = super().delete()
+            UserDataVersion.bump({user_id for _, user_id in rows})
+            Tombstone.record("category", rows)
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self._write_db()):
+            created = super().bulk_create(objs, *args, **kwargs)
+            UserDataVersion.bump({obj.user_id for obj in objs})
+        return created
+
+    def upsert(self, user, items):
+        """
+        Create ``user``'s categories from ``items`` (dicts with a ``name``
+        and an optional ``color``) with one INSERT ... ON CONFLICT statement.
+        An item whose name matches an existing category, ignoring case,
+        updates that category's name and color instead. Returns the
+        categories in the order of ``items``.
+        """
+        if not items:
+            return []
+        db = self._write_db()
+        connection = connections[db]
+        quote = connection.ops.quote_name
+        now = timezone.now()
+        fields = [
+            self.model._meta.get_field(name)
+            for name in ("name", "color", "user", "updated_at", "pending_deletion")
+        ]
+        params = []
+        for item in items:
+            values = [item["name"], item.get("color", ""), user.pk, now, False]
+            params += [
+                field.get_db_prep_save(value, connection)
+                for field, value in zip(fields, values)
+            ]
+        name, color, user_id, updated_at, pending_deletion = [
+            quote(field.column) for field in fields
+        ]
+        placeholders = ", ".join(
+            ["(%s)" % ", ".join(["%s"] * len(fields))] * len(items)
+        )
+        # The conflict target is the UNIQUE_NAME_CONSTRAINT index.
+        sql = (
+            f"INSERT INTO {quote(self.model._meta.db_table)} "
+            f"({name}, {color}, {user_id}, {updated_at}, {pending_deletion}) "
+            f"VALUES {placeholders} "
+            f"ON CONFLICT ({user_id}, LOWER({name})) WHERE NOT {pending_deletion} "
+            f"DO UPDATE SET {name} = EXCLUDED.{name}, {color} = EXCLUDED.{color}, "
+            f"{updated_at} = EXCLUDED.{updated_at} "
+            f"RETURNING {quote('id')}, {name}, {color}"
+        )
+        with transaction.atomic(using=db):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                # Returned names are the names given.
+                rows = {row[1]: row for row in cursor.fetchall()}
+            UserDataVersion.bump({user.pk})
+        return [
+            self.model.from_db(
+                db,
+                ["id", "name", "color", "user_id", "updated_at", "pending_deletion"],
+                [*rows[item["name"]], user.pk, now, False],
+            )
+            for item in items
+        ]
+
 
 class Category(models.Model):
     name = models.CharField(
@@ -103,19 +462,67 @@ class Category(models.Model):
         related_name="categories",
         verbose_name="User",
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Updated At",
+    )
+    # Hidden from the API while a DeletionJob detaches its tasks.
+    pending_deletion = models.BooleanField(
+        default=False,
+        verbose_name="Pending Deletion",
+    )
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
-        unique_together = ("name", "user")
         ordering = ["name"]
         verbose_name = "Category"
         verbose_name_plural = "Categories"
         indexes = [
             models.Index(fields=["user", "name"]),
+            models.Index(fields=["user", "updated_at", "id"]),
+        ]
+        constraints = [
+            # Names are unique per user ignoring case. The name of a category
+            # being deleted can be reused at once.
+            models.UniqueConstraint(
+                "user",
+                Lower("name"),
+                condition=Q(pending_deletion=False),
+                name=UNIQUE_NAME_CONSTRAINT,
+            ),
         ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded owner so a reassignment bumps both users.
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(Category, instance=self)):
+            super().save(*args, **kwargs)
+            UserDataVersion.bump({self.user_id, getattr(self, "_loaded_user_id", None)})
+        self._loaded_user_id = self.user_id
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(Category, instance=self)):
+            pk = self.pk
+            Task.objects.filter(category=self).clear_category()
+            result = super().delete(*args, **kwargs)
+            UserDataVersion.bump({self.user_id})
+            Tombstone.record("category", [(pk, self.user_id)])
+        return result
+
+    @staticmethod
+    def is_duplicate_name(error):
+        """Whether an IntegrityError comes from the unique name constraint."""
+        return UNIQUE_NAME_CONSTRAINT in str(error)
+
     def clean(self):
         """Validate category data"""
         from django.core.exceptions import ValidationError
@@ -124,3 +531,351 @@ class Category(models.Model):
             self.name = self.name.strip()
             if len(self.name) < 1:
                 raise ValidationError({"name": "Category name cannot be empty."})
+
+
+class TaskStatistics(models.Model):
+    """
+    Per-user task counters, maintained incrementally by every Task write path
+    so that the statistics endpoint is a primary-key lookup. Archived tasks
+    stay counted. Overdue counts depend on the date and are computed
+    separately.
+    """
+
+    STATUS_COUNTERS = {
+        "TODO": "todo_count",
+        "IN_PROGRESS": "in_progress_count",
+        "DONE": "done_count",
+    }
+    PRIORITY_COUNTERS = {
+        "LOW": "low_priority_count",
+        "MEDIUM": "medium_priority_count",
+        "HIGH": "high_priority_count",
+    }
+    COUNTERS = ["total_tasks", *STATUS_COUNTERS.values(), *PRIORITY_COUNTERS.values()]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_statistics",
+        verbose_name="User",
+    )
+    total_tasks = models.IntegerField(default=0, verbose_name="Total Tasks")
+    todo_count = models.IntegerField(default=0, verbose_name="To Do")
+    in_progress_count = models.IntegerField(default=0, verbose_name="In Progress")
+    done_count = models.IntegerField(default=0, verbose_name="Done")
+    low_priority_count = models.IntegerField(default=0, verbose_name="Low Priority")
+    medium_priority_count = models.IntegerField(
+        default=0, verbose_name="Medium Priority"
+    )
+    high_priority_count = models.IntegerField(default=0, verbose_name="High Priority")
+
+    class Meta:
+        verbose_name = "Task Statistics"
+        verbose_name_plural = "Task Statistics"
+
+    def __str__(self):
+        return f"Task statistics for user {self.user_id}"
+
+    @classmethod
+    def counters_for(cls, status, priority):
+        """Names of the counters a task with this status and priority adds to."""
+        counters = ["total_tasks"]
+        if status in cls.STATUS_COUNTERS:
+            counters.append(cls.STATUS_COUNTERS[status])
+        if priority in cls.PRIORITY_COUNTERS:
+            counters.append(cls.PRIORITY_COUNTERS[priority])
+        return counters
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """Apply ``{user_id: {counter: change}}`` atomically with F() updates."""
+        for user_id, changes in deltas.items():
+            changes = {field: change for field, change in changes.items() if change}
+            if not changes:
+                continue
+            increments = {field: F(field) + change for field, change in changes.items()}
+            if cls.objects.filter(user_id=user_id).update(**increments):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(user_id=user_id, **changes)
+            except IntegrityError:
+                # Another transaction created the row first.
+                cls.objects.filter(user_id=user_id).update(**increments)
+
+    @classmethod
+    def compute(cls, user_ids=None):
+        """
+        Count tasks, archived ones included, from scratch:
+        ``{user_id: {counter: value}}``.
+        """
+        counts = defaultdict(lambda: dict.fromkeys(cls.COUNTERS, 0))
+        for model in (Task, ArchivedTask):
+            tasks = model.objects.all()
+            if user_ids is not None:
+                tasks = tasks.filter(user_id__in=user_ids)
+            groups = (
+                tasks.order_by()
+                .values_list("user_id", "status", "priority")
+                .annotate(count=models.Count("id"))
+            )
+            for user_id, status, priority, count in groups:
+                for field in cls.counters_for(status, priority):
+                    counts[user_id][field] += count
+        return counts
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.COUNTERS}
+
+
+class UserDataVersion(models.Model):
+    """
+    Per-user version of all task and category data, bumped in the same
+    transaction as any write to either. Conditional GET handling derives
+    ETags from it, so an unchanged response costs one primary-key lookup.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="data_version",
+        verbose_name="User",
+    )
+    version = models.BigIntegerField(default=0, verbose_name="Version")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="Updated At")
+
+    class Meta:
+        verbose_name = "User Data Version"
+        verbose_name_plural = "User Data Versions"
+
+    def __str__(self):
+        return f"Data version {self.version} for user {self.user_id}"
+
+    @classmethod
+    def bump(cls, user_ids):
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        increment = {"version": F("version") + 1, "updated_at": timezone.now()}
+        if cls.objects.filter(user_id__in=user_ids).update(**increment) == len(
+            user_ids
+        ):
+            return
+        existing = set(
+            cls.objects.filter(user_id__in=user_ids).values_list("user_id", flat=True)
+        )
+        missing = user_ids - existing
+        # Create missing rows at version 0 (a racing writer may create them
+        # too), then bump them like the others.
+        cls.objects.bulk_create(
+            [cls(user_id=user_id) for user_id in missing], ignore_conflicts=True
+        )
+        cls.objects.filter(user_id__in=missing).update(**increment)
+
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted task or category, so that delta sync can tell
+    clients what to remove. Old tombstones are removed by
+    ``prune_tombstones``; clients whose cursor predates the retention period
+    must sync from scratch.
+    """
+
+    KIND_CHOICES = [
+        ("task", "Task"),
+        ("category", "Category"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tombstones",
+        verbose_name="User",
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Kind")
+    object_id = models.BigIntegerField(verbose_name="Object ID")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Deleted At")
+
+    class Meta:
+        verbose_name = "Tombstone"
+        verbose_name_plural = "Tombstones"
+        indexes = [
+            models.Index(fields=["user", "deleted_at", "id"]),
+            models.Index(fields=["deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
+
+    @classmethod
+    def record(cls, kind, rows):
+        """Record the deletion of ``(pk, user_id)`` rows of ``kind``."""
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [
+                cls(user_id=user_id, kind=kind, object_id=pk, deleted_at=now)
+                for pk, user_id in rows
+            ]
+        )
+
+
+class ArchivedTaskQuerySet(models.QuerySet):
+    def restore(self):
+        """
+        Move the rows back to the task table, keeping their ids and creation
+        times, and return the restored tasks. Counters are left alone, as
+        archived tasks are still counted.
+        """
+        with transaction.atomic(using=self.db):
+            archived = list(self.select_for_update())
+            if not archived:
+                return []
+            now = timezone.now()
+            tasks = [row.to_task(updated_at=now) for row in archived]
+            ids = [task.pk for task in tasks]
+            models.QuerySet.bulk_create(Task.objects.all(), tasks)
+            # bulk_create() stamps created_at with the current time.
+            models.QuerySet.update(
+                Task.objects.filter(pk__in=ids),
+                created_at=Case(
+                    *[When(pk=row.pk, then=Value(row.created_at)) for row in archived],
+                    output_field=models.DateTimeField(),
+                ),
+            )
+            for task, row in zip(tasks, archived):
+                task.created_at = row.created_at
+            self.model.objects.filter(pk__in=ids).delete()
+            # Clients that synced before the archival never saw it happen;
+            # those that synced since get the task back as a change.
+            Tombstone.objects.filter(kind="task", object_id__in=ids).delete()
+            UserDataVersion.bump({task.user_id for task in tasks})
+        return tasks
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of the task table by ``archive_tasks``. Rows
+    keep the task's id, so a restored task comes back unchanged.
+    """
+
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    title = models.CharField(max_length=200, verbose_name="Title")
+    description = models.TextField(blank=True, verbose_name="Description")
+    status = models.CharField(
+        max_length=20, choices=Task.STATUS_CHOICES, verbose_name="Status"
+    )
+    priority = models.CharField(
+        max_length=10, choices=Task.PRIORITY_CHOICES, verbose_name="Priority"
+    )
+    priority_rank = models.PositiveSmallIntegerField(verbose_name="Priority Rank")
+    due_date = models.DateField(null=True, blank=True, verbose_name="Due Date")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+        verbose_name="User",
+    )
+    category = models.ForeignKey(
+        "tasks.Category",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_tasks",
+        verbose_name="Category",
+    )
+    created_at = models.DateTimeField(verbose_name="Created At")
+    updated_at = models.DateTimeField(verbose_name="Updated At")
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name="Archived At")
+
+    objects = ArchivedTaskQuerySet.as_manager()
+
+    # Fields copied as they are between Task and ArchivedTask.
+    COPIED_FIELDS = [
+        "id",
+        "title",
+        "description",
+        "status",
+        "priority",
+        "priority_rank",
+        "due_date",
+        "user_id",
+        "category_id",
+        "created_at",
+        "updated_at",
+    ]
+
+    class Meta:
+        ordering = ["-archived_at", "-id"]
+        verbose_name = "Archived Task"
+        verbose_name_plural = "Archived Tasks"
+        indexes = [
+            models.Index(fields=["user", "archived_at", "id"]),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    @classmethod
+    def from_task(cls, task, archived_at=None):
+        values = {field: getattr(task, field) for field in cls.COPIED_FIELDS}
+        return cls(archived_at=archived_at or timezone.now(), **values)
+
+    def to_task(self, **overrides):
+        values = {field: getattr(self, field) for field in self.COPIED_FIELDS}
+        return Task(**{**values, **overrides})
+
+
+class DeletionJob(models.Model):
+    """
+    A user or category being deleted in the background by
+    ``process_deletions`` (see ``tasks.deletion``). ``stage`` and
+    ``last_id`` record how far the job has got, so a job interrupted by a
+    crash carries on where it stopped.
+    """
+
+    KIND_CHOICES = [
+        ("user", "User"),
+        ("category", "Category"),
+    ]
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("RUNNING", "Running"),
+        ("DONE", "Done"),
+        ("FAILED", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Kind")
+    object_id = models.BigIntegerField(verbose_name="Object ID")
+    # A plain id rather than a foreign key: user jobs outlive their user.
+    owner_id = models.BigIntegerField(verbose_name="Owner ID")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="PENDING", verbose_name="Status"
+    )
+    stage = models.CharField(max_length=30, blank=True, verbose_name="Stage")
+    last_id = models.BigIntegerField(null=True, blank=True, verbose_name="Last ID")
+    processed = models.PositiveBigIntegerField(default=0, verbose_name="Processed")
+    total = models.PositiveBigIntegerField(default=0, verbose_name="Total")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    error = models.TextField(blank=True, verbose_name="Error")
+    lease_expires_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Lease Expires At"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Finished At"
+    )
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        verbose_name = "Deletion Job"
+        verbose_name_plural = "Deletion Jobs"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["owner_id", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Delete {self.kind} {self.object_id} ({self.status})"
@@ -1,7 +1,277 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class TaskPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset pagination for the task list.
+
+    Instead of COUNT(*) + OFFSET, each page continues from the sort key of the
+    last row seen, so page N costs the same index range scan as page 1. Only
+    the first ``ordering`` term is used; ``id`` is always appended as a
+    tie-breaker so that the key is unique.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    invalid_cursor_message = "Invalid cursor"
+
+    default_ordering = "-created_at"
+    # Ordering term -> key columns, not counting the trailing id.
+    key_columns = {
+        "created_at": ("created_at",),
+        "due_date": ("due_date",),
+        "priority": ("priority_rank", "created_at"),
+    }
+    # Columns that may hold NULL. NULL sorts as the largest value, which is
+    # what PostgreSQL does by default and what its btree indexes return.
+    nullable_columns = {"due_date"}
+    column_parsers = {
+        "created_at": parse_datetime,
+        "due_date": parse_date,
+    }
+
+    @classmethod
+    def is_requested(cls, request):
+        """Return True if the client asked for cursor mode."""
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == "cursor"
+            or cls.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_page_queryset(queryset, request)
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset``."""
+        queryset = self.prepare_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset.aiterator()])
+
+    def prepare_page_queryset(self, queryset, request):
+        """Return the queryset for one page, plus one row to detect more."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request)
+
+        descending = self.ordering.startswith("-")
+        self.columns = self.key_columns[self.ordering.lstrip("-")] + ("id",)
+
+        self.cursor = self.decode_cursor(request)
+        self.reverse = bool(self.cursor and self.cursor["reverse"])
+        # Walking backwards is the same scan with the direction flipped.
+        scan_descending = descending != self.reverse
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.build_filter(self.cursor["values"], scan_descending)
+            )
+        queryset = queryset.order_by(*self.build_ordering(scan_descending))
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        """Return the first supported ``ordering`` term, or the default."""
+        param = request.query_params.get("ordering", "")
+        term = param.split(",")[0].strip()
+        if term.lstrip("-") in self.key_columns:
+            return term
+        return self.default_ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def build_ordering(self, descending):
+        ordering = []
+        for column in self.columns:
+            if column in self.nullable_columns:
+                expression = F(column)
+                ordering.append(
+                    expression.desc(nulls_first=True)
+                    if descending
+                    else expression.asc(nulls_last=True)
+                )
+            else:
+                ordering.append(f"-{column}" if descending else column)
+        return ordering
+
+    def build_filter(self, values, descending):
+        """
+        Build the row-value comparison ``(c1, c2, ...) > (v1, v2, ...)`` (or
+        ``<`` when descending) as an OR of prefix-equality terms, so it can
+        be served by a range scan on the matching composite index.
+        """
+        branches = []
+        prefix = Q()
+        for column, value in zip(self.columns, values):
+            beyond = self._beyond(column, value, descending)
+            if beyond is not None:
+                branches.append(prefix & beyond)
+            if value is None:
+                prefix &= Q(**{f"{column}__isnull": True})
+            else:
+                prefix &= Q(**{column: value})
+        if not branches:
+            return Q(pk__in=[])
+        return reduce(or_, branches)
+
+    def _beyond(self, column, value, descending):
+        nullable = column in self.nullable_columns
+        if descending:
+            if value is None:
+                return Q(**{f"{column}__isnull": False})
+            return Q(**{f"{column}__lt": value})
+        if value is None:
+            return None
+        condition = Q(**{f"{column}__gt": value})
+        if nullable:
+            condition |= Q(**{f"{column}__isnull": True})
+        return condition
+
+    def encode_cursor(self, row, reverse):
+        values = []
+        for column in self.columns:
+            value = row[column] if isinstance(row, dict) else getattr(row, column)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            values.append(value)
+        payload = {"o": self.ordering, "r": reverse, "v": values}
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            ordering = payload["o"]
+            raw_values = payload["v"]
+            reverse = bool(payload["r"])
+            if ordering != self.ordering or len(raw_values) != len(self.columns):
+                raise ValueError
+            values = [
+                self._parse(column, value)
+                for column, value in zip(self.columns, raw_values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return {"values": values, "reverse": reverse}
+
+    def _parse(self, column, value):
+        if value is None:
+            if column not in self.nullable_columns:
+                raise ValueError
+            return None
+        parser = self.column_parsers.get(column)
+        if parser is None:
+            return int(value)
+        parsed = parser(value)
+        if parsed is None:
+            raise ValueError
+        return parsed
+
+
+async def apaginate_queryset(paginator, queryset, request, view=None):
+    """
+    Async counterpart of ``paginator.paginate_queryset()`` for the async
+    views. Supports TaskCursorPagination and DRF's PageNumberPagination.
+    """
+    if isinstance(paginator, TaskCursorPagination):
+        return await paginator.apaginate_queryset(queryset, request, view)
+
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Paginator.count is a cached_property; fill it in without a sync query.
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        msg = paginator.invalid_page_message.format(
+            page_number=page_number, message=str(exc)
+        )
+        raise NotFound(msg)
+    page.object_list = [row async for row in page.object_list.aiterator()]
+
+    if django_paginator.num_pages > 1 and paginator.template is not None:
+        paginator.display_page_controls = True
+    paginator.page = page
+    paginator.request = request
+    return page.object_list
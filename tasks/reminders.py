@@ -0,0 +1,173 @@
+"""
+Overdue and due-soon reminder digests.
+
+``scan_due_tasks`` walks the open tasks with a due date across all users in
+keyset batches over the ``tasks_task_open_due_idx`` partial index, ordered
+by ``(user, due_date, id)``. Each user's tasks are therefore contiguous and
+``build_digests`` can emit a user's digest as soon as the scan moves on, so
+only one batch and one digest are in memory at a time. Digests go to a sink:
+``EmailSink`` sends them with Django's mail framework and ``FileSink``
+writes them as JSON lines.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import OPEN_STATUSES, Task
+
+SCAN_FIELDS = ("id", "user_id", "user__email", "title", "due_date", "priority")
+
+
+def scan_due_tasks(today=None, due_soon_days=3, batch_size=1000):
+    """
+    Yield open tasks (as dicts of ``SCAN_FIELDS``) of active users that are
+    overdue or due within ``due_soon_days``, ordered by user, due date and id.
+    """
+    today = today or date.today()
+    horizon = today + timedelta(days=due_soon_days)
+    queryset = (
+        Task.objects.filter(
+            status__in=OPEN_STATUSES,
+            due_date__isnull=False,
+            due_date__lte=horizon,
+            user__is_active=True,
+        )
+        .order_by("user_id", "due_date", "id")
+        .values(*SCAN_FIELDS)
+    )
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            user_id, due_date, pk = last
+            batch = batch.filter(
+                Q(user_id__gt=user_id)
+                | Q(user_id=user_id, due_date__gt=due_date)
+                | Q(user_id=user_id, due_date=due_date, id__gt=pk)
+            )
+        rows = list(batch[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1]["user_id"], rows[-1]["due_date"], rows[-1]["id"])
+
+
+@dataclass
+class Digest:
+    user_id: int
+    email: str
+    today: date
+    overdue: list = field(default_factory=list)
+    due_soon: list = field(default_factory=list)
+    overdue_count: int = 0
+    due_soon_count: int = 0
+
+    def add(self, row, max_items):
+        item = {
+            "id": row["id"],
+            "title": row["title"],
+            "due_date": row["due_date"].isoformat(),
+            "priority": row["priority"],
+        }
+        if row["due_date"] < self.today:
+            self.overdue_count += 1
+            if len(self.overdue) < max_items:
+                self.overdue.append(item)
+        else:
+            self.due_soon_count += 1
+            if len(self.due_soon) < max_items:
+                self.due_soon.append(item)
+
+    def as_dict(self):
+        data = asdict(self)
+        data["today"] = self.today.isoformat()
+        return data
+
+    def subject(self):
+        parts = []
+        if self.overdue_count:
+            parts.append(f"{self.overdue_count} overdue")
+        if self.due_soon_count:
+            parts.append(f"{self.due_soon_count} due soon")
+        return f"Task reminder: {' and '.join(parts)}"
+
+    def body(self):
+        lines = []
+        for heading, items, total in (
+            ("Overdue", self.overdue, self.overdue_count),
+            ("Due soon", self.due_soon, self.due_soon_count),
+        ):
+            if not total:
+                continue
+            lines.append(f"{heading}:")
+            lines += [f"  - {item['title']} (due {item['due_date']})" for item in items]
+            if total > len(items):
+                lines.append(f"  ... and {total - len(items)} more")
+            lines.append("")
+        return "\n".join(lines)
+
+
+def build_digests(rows, today=None, max_items=20):
+    """Group scanned rows, which arrive ordered by user, into digests."""
+    today = today or date.today()
+    digest = None
+    for row in rows:
+        if digest is None or row["user_id"] != digest.user_id:
+            if digest is not None:
+                yield digest
+            digest = Digest(row["user_id"], row["user__email"], today)
+        digest.add(row, max_items)
+    if digest is not None:
+        yield digest
+
+
+class FileSink:
+    """Append each digest to a file as one JSON object per line."""
+
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def send(self, digest):
+        self.file.write(json.dumps(digest.as_dict()) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class EmailSink:
+    """Send each digest as an email through the configured EMAIL_BACKEND."""
+
+    def __init__(self, from_email=None):
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
+
+    def send(self, digest):
+        send_mail(digest.subject(), digest.body(), self.from_email, [digest.email])
+
+    def close(self):
+        pass
+
+
+SINKS = {"email": EmailSink, "file": FileSink}
+
+
+def get_sink(name, **kwargs):
+    """Return a sink by short name or dotted path to a sink class."""
+    sink_class = SINKS.get(name) or import_string(name)
+    return sink_class(**kwargs)
+
+
+def send_reminders(sink, today=None, due_soon_days=3, batch_size=1000, max_items=20):
+    """Scan, build and deliver all digests; return how many were sent."""
+    today = today or date.today()
+    rows = scan_due_tasks(today, due_soon_days, batch_size)
+    sent = 0
+    for digest in build_digests(rows, today, max_items):
+        sink.send(digest)
+        sent += 1
+    return sent
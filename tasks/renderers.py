@@ -0,0 +1,72 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer for row-oriented formats. ``stream()`` turns an iterable of
+    serialized rows into byte chunks for a StreamingHttpResponse, flushing
+    every ``flush_rows`` rows; ``render()`` covers ordinary responses such as
+    errors.
+    """
+
+    charset = "utf-8"
+    flush_rows = 200
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.stream(rows))
+
+    def stream(self, rows):
+        buffer = []
+        for line in self.lines(rows):
+            buffer.append(line)
+            if len(buffer) >= self.flush_rows:
+                yield "".join(buffer).encode(self.charset)
+                buffer = []
+        if buffer:
+            yield "".join(buffer).encode(self.charset)
+
+    def lines(self, rows):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def lines(self, rows):
+        for row in rows:
+            yield json.dumps(
+                row, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(",", ":")
+            ) + "\n"
+
+
+class _Line:
+    """File-like object whose ``write()`` returns what was written."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    """CSV with a header row taken from the keys of the first row."""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def lines(self, rows):
+        writer = csv.writer(_Line())
+        header = None
+        for row in rows:
+            if header is None:
+                header = list(row)
+                yield writer.writerow(header)
+            yield writer.writerow(
+                ["" if row.get(key) is None else row.get(key) for key in header]
+            )
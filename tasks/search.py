@@ -0,0 +1,406 @@
+"""
+Full-text search over task titles and descriptions, and indexed substring
+matching of task titles and category names.
+
+For full-text search, PostgreSQL keeps a generated ``search_vector``
+tsvector column on the task table with a GIN index. SQLite, used for tests
+and local development, keeps an FTS5 external-content table in sync with
+triggers. Other databases have no backend and fall back to DRF's
+``icontains`` search.
+
+Substring matching (``icontains``) is served by trigram indexes: pg_trgm GIN
+indexes on ``UPPER(column)``, which is the expression Django's ``icontains``
+compares on PostgreSQL, and FTS5 tables with the trigram tokenizer on SQLite.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+
+from django.db import OperationalError, connections, transaction
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+TASK_TABLE = "tasks_task"
+CATEGORY_TABLE = "tasks_category"
+# (table, column) pairs with a trigram index.
+TRIGRAM_COLUMNS = [(TASK_TABLE, "title"), (CATEGORY_TABLE, "name")]
+
+
+class QueryTimeout(Exception):
+    """A query ran past the limit set with ``query_time_limit``."""
+
+
+def build_query(terms):
+    """
+    An FTS5 query matching words that start with each term, as ``icontains``
+    matched partial words. Terms are quoted so that user input is never
+    parsed as syntax.
+    """
+    return " ".join('"{}"*'.format(term.replace('"', "")) for term in terms)
+
+
+def build_tsquery(terms):
+    """
+    A ``to_tsquery`` query matching words that start with each word of the
+    terms. Only word characters are kept, so user input is never parsed as
+    syntax.
+    """
+    words = [word for term in terms for word in re.findall(r"\w+", term)]
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class PostgresSearchBackend:
+    config = "english"
+    column = "search_vector"
+    index_name = "tasks_task_search_vector_gin"
+
+    def install(self, schema_editor):
+        schema_editor.execute(
+            f"ALTER TABLE {TASK_TABLE} ADD COLUMN IF NOT EXISTS {self.column} tsvector "
+            f"GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{self.config}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(description, '')), 'B')"
+            f") STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.index_name} "
+            f"ON {TASK_TABLE} USING GIN ({self.column})"
+        )
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f"DROP INDEX IF EXISTS {self.index_name}")
+        schema_editor.execute(
+            f"ALTER TABLE {TASK_TABLE} DROP COLUMN IF EXISTS {self.column}"
+        )
+
+    def ensure_installed(self, connection):
+        """The generated column survives ALTER TABLE, so nothing to repair."""
+
+    def _tsquery(self):
+        return f"to_tsquery('{self.config}', %s)"
+
+    def filter(self, queryset, terms):
+        match = RawSQL(
+            f"{TASK_TABLE}.{self.column} @@ {self._tsquery()}",
+            (build_tsquery(terms),),
+            output_field=BooleanField(),
+        )
+        return queryset.filter(match)
+
+    def annotate_rank(self, queryset, terms):
+        rank = RawSQL(
+            f"ts_rank({TASK_TABLE}.{self.column}, {self._tsquery()})",
+            (build_tsquery(terms),),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank)
+
+
+class SQLiteSearchBackend:
+    fts_table = "tasks_task_fts"
+    # Title matches weigh more than description matches, like the 'A' and
+    # 'B' weights used on PostgreSQL.
+    weights = (10.0, 1.0)
+    triggers = {
+        "tasks_task_fts_ai": (
+            f"AFTER INSERT ON {TASK_TABLE} BEGIN "
+            f"INSERT INTO tasks_task_fts(rowid, title, description) "
+            f"VALUES (new.id, new.title, new.description); END"
+        ),
+        "tasks_task_fts_ad": (
+            f"AFTER DELETE ON {TASK_TABLE} BEGIN "
+            f"INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+            f"VALUES ('delete', old.id, old.title, old.description); END"
+        ),
+        "tasks_task_fts_au": (
+            f"AFTER UPDATE OF title, description ON {TASK_TABLE} BEGIN "
+            f"INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description) "
+            f"VALUES ('delete', old.id, old.title, old.description); "
+            f"INSERT INTO tasks_task_fts(rowid, title, description) "
+            f"VALUES (new.id, new.title, new.description); END"
+        ),
+    }
+
+    def install(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+            f"title, description, content='{TASK_TABLE}', content_rowid='id', "
+            f"tokenize='porter unicode61')"
+        )
+        for name, body in self.triggers.items():
+            schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        schema_editor.execute(
+            f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')"
+        )
+
+    def uninstall(self, schema_editor):
+        for name in self.triggers:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.fts_table}")
+
+    def ensure_installed(self, connection):
+        """
+        Recreate triggers dropped by a table rebuild.
+
+        SQLite's ALTER TABLE support is limited, so Django applies many schema
+        changes by copying the task table into a new one, which silently
+        drops its triggers. This runs after every ``migrate``.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+                "AND name IN (%s)" % ", ".join(["%s"] * (len(self.triggers) + 1)),
+                [self.fts_table, *self.triggers],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+        if self.fts_table not in existing:
+            # The search migration has not been applied yet.
+            return
+        if existing.issuperset(self.triggers):
+            return
+        with connection.schema_editor() as schema_editor:
+            self.install(schema_editor)
+
+    def filter(self, queryset, terms):
+        matches = RawSQL(
+            f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s",
+            (build_query(terms),),
+        )
+        return queryset.filter(pk__in=matches)
+
+    def annotate_rank(self, queryset, terms):
+        # bm25() returns lower-is-better scores, so negate it.
+        weights = ", ".join(str(weight) for weight in self.weights)
+        rank = RawSQL(
+            f"SELECT -bm25({self.fts_table}, {weights}) FROM {self.fts_table} "
+            f"WHERE {self.fts_table} MATCH %s AND rowid = {TASK_TABLE}.id",
+            (build_query(terms),),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank)
+
+
+class PostgresTrigramBackend:
+    def index_name(self, table, column):
+        return f"{table}_{column}_trgm"
+
+    def install(self, schema_editor):
+        # Needs the CREATE privilege on the database, or an administrator
+        # who has already created the extension.
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for table, column in TRIGRAM_COLUMNS:
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index_name(table, column)} "
+                f"ON {table} USING GIN ((UPPER({column}::text)) gin_trgm_ops)"
+            )
+
+    def uninstall(self, schema_editor):
+        for table, column in TRIGRAM_COLUMNS:
+            schema_editor.execute(
+                f"DROP INDEX IF EXISTS {self.index_name(table, column)}"
+            )
+
+    def ensure_installed(self, connection):
+        """Expression indexes survive ALTER TABLE, so nothing to repair."""
+
+    def filter(self, queryset, field, value):
+        # UPPER(column) LIKE UPPER('%value%') is served by the index as is.
+        return queryset.filter(**{f"{field}__icontains": value})
+
+    @contextmanager
+    def time_limit(self, connection, milliseconds):
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    [str(max(int(milliseconds), 1))],
+                )
+            try:
+                yield
+            except OperationalError as exc:
+                cause = exc.__cause__
+                sqlstate = getattr(cause, "sqlstate", getattr(cause, "pgcode", None))
+                if sqlstate == "57014":  # query_canceled
+                    raise QueryTimeout() from exc
+                raise
+
+
+class SQLiteTrigramBackend:
+    # Rows are checked for a timeout every this many VM instructions.
+    progress_interval = 1000
+
+    def fts_table(self, table, column):
+        return f"{table}_{column}_trgm"
+
+    def triggers(self, table, column):
+        fts = self.fts_table(table, column)
+        return {
+            f"{fts}_ai": (
+                f"AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); "
+                f"END"
+            ),
+            f"{fts}_ad": (
+                f"AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); END"
+            ),
+            f"{fts}_au": (
+                f"AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                f"VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); "
+                f"END"
+            ),
+        }
+
+    def install(self, schema_editor):
+        for table, column in TRIGRAM_COLUMNS:
+            fts = self.fts_table(table, column)
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{column}, content='{table}', content_rowid='id', "
+                f"tokenize='trigram')"
+            )
+            for name, body in self.triggers(table, column).items():
+                schema_editor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+            schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def uninstall(self, schema_editor):
+        for table, column in TRIGRAM_COLUMNS:
+            for name in self.triggers(table, column):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            schema_editor.execute(
+                f"DROP TABLE IF EXISTS {self.fts_table(table, column)}"
+            )
+
+    def ensure_installed(self, connection):
+        """Recreate triggers dropped by a table rebuild; see SQLiteSearchBackend."""
+        names = [self.fts_table(table, column) for table, column in TRIGRAM_COLUMNS]
+        for table, column in TRIGRAM_COLUMNS:
+            names.extend(self.triggers(table, column))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+                "AND name IN (%s)" % ", ".join(["%s"] * len(names)),
+                names,
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+        if not existing:
+            # The trigram migration has not been applied yet.
+            return
+        if existing.issuperset(names):
+            return
+        with connection.schema_editor() as schema_editor:
+            self.install(schema_editor)
+
+    def filter(self, queryset, field, value):
+        opts = queryset.model._meta
+        column = opts.get_field(field).column
+        # The trigram index can't help with patterns shorter than a trigram,
+        # and user input containing LIKE wildcards would need escaping.
+        if (
+            (opts.db_table, column) not in TRIGRAM_COLUMNS
+            or len(value) < 3
+            or any(char in value for char in "%_\\")
+        ):
+            return queryset.filter(**{f"{field}__icontains": value})
+        fts = self.fts_table(opts.db_table, column)
+        matches = RawSQL(
+            f"SELECT rowid FROM {fts} WHERE {column} LIKE %s", (f"%{value}%",)
+        )
+        return queryset.filter(pk__in=matches)
+
+    @contextmanager
+    def time_limit(self, connection, milliseconds):
+        deadline = time.monotonic() + milliseconds / 1000
+        connection.ensure_connection()
+        connection.connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, self.progress_interval
+        )
+        try:
+            yield
+        except OperationalError as exc:
+            if "interrupted" in str(exc):
+                raise QueryTimeout() from exc
+            raise
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+TRIGRAM_BACKENDS = {
+    "postgresql": PostgresTrigramBackend,
+    "sqlite": SQLiteTrigramBackend,
+}
+
+
+def get_search_backend(using="default"):
+    """Return the search backend for a database alias, or None."""
+    backend_class = BACKENDS.get(connections[using].vendor)
+    return backend_class() if backend_class else None
+
+
+def install_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class().install(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    backend_class = BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class().uninstall(schema_editor)
+
+
+def get_trigram_backend(using="default"):
+    """Return the trigram backend for a database alias, or None."""
+    backend_class = TRIGRAM_BACKENDS.get(connections[using].vendor)
+    return backend_class() if backend_class else None
+
+
+def filter_substring(queryset, field, value):
+    """``field__icontains=value``, using the trigram index where there is one."""
+    backend = get_trigram_backend(queryset.db)
+    if backend is None:
+        return queryset.filter(**{f"{field}__icontains": value})
+    return backend.filter(queryset, field, value)
+
+
+@contextmanager
+def query_time_limit(using, milliseconds):
+    """
+    Abort queries on ``using`` that run past ``milliseconds`` in total (per
+    statement on PostgreSQL) with QueryTimeout. Without a backend for the
+    database, queries run without a limit.
+    """
+    backend = get_trigram_backend(using)
+    if backend is None:
+        yield
+        return
+    with backend.time_limit(connections[using], milliseconds):
+        yield
+
+
+def install_trigram_indexes(apps, schema_editor):
+    backend_class = TRIGRAM_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class().install(schema_editor)
+
+
+def uninstall_trigram_indexes(apps, schema_editor):
+    backend_class = TRIGRAM_BACKENDS.get(schema_editor.connection.vendor)
+    if backend_class:
+        backend_class().uninstall(schema_editor)
+
+
+def ensure_search_index(using, **kwargs):
+    """``post_migrate`` receiver that repairs the search indexes if needed."""
+    for backend in (get_search_backend(using), get_trigram_backend(using)):
+        if backend is not None:
+            backend.ensure_installed(connections[using])
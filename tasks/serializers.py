@@ -1,22 +1,79 @@
 from datetime import date
 
-from rest_framework import serializers
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 
-from .models import Category, Task
+from config.metrics import timed
 
+from .models import ArchivedTask, Category, DeletionJob, Task
+from .services import TaskService
 
-class TaskSerializer(serializers.ModelSerializer):
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Count the time spent producing ``.data`` towards the request's
+    ``serializer`` timing (see ``config.metrics``). Serializers using it
+    should also set ``list_serializer_class = TimedListSerializer``.
+    """
+
+    @property
+    def data(self):
+        with timed("serializer"):
+            return super().data
+
+
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category primary key field that resolves ids from a ``categories``
+    mapping in the serializer context when one is given, so that callers
+    validating many tasks can load all categories with a single query.
+    """
+
+    def to_internal_value(self, data):
+        categories = self.context.get("categories")
+        if categories is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in categories:
+            self.fail("does_not_exist", pk_value=data)
+        return categories[pk]
+
+
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
-    category = serializers.PrimaryKeyRelatedField(
+    category = UserCategoryField(
         queryset=Category.objects.none(), required=False, allow_null=True
     )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # ?fields= and ?expand= of task responses (see TaskFieldsMixin).
+        fields = self.context.get("fields")
+        if fields is not None:
+            for name in [name for name in self.fields if name not in fields]:
+                del self.fields[name]
+        if "category" in self.context.get("expand", ()) and "category" in self.fields:
+            self.fields["category"] = CategorySerializer(read_only=True)
+            return
         # Filter category queryset by user if request is available
         request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            self.fields["category"].queryset = Category.objects.filter(
+        if request and request.user.is_authenticated and "category" in self.fields:
+            self.fields["category"].queryset = Category.objects.visible().filter(
                 user=request.user
             )
 
@@ -35,6 +92,7 @@ class TaskSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["user", "created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
 
     def validate_title(self, value):
         if len(value) < 3:
@@ -64,15 +122,254 @@ class TaskSerializer(serializers.ModelSerializer):
         if value is None:
             return value
         request = self.context.get("request")
-        if request and value.user != request.user:
+        if request and value.user_id != request.user.pk:
             raise serializers.ValidationError("Invalid category for this user")
         return value
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class RowPlan:
+    """
+    Render ``values()`` rows exactly as ``serializer_class`` renders model
+    instances, without instantiating serializers or fields per row.
+
+    The plan is compiled from the serializer's fields on first use: each
+    field becomes a step reading one ``values()`` column (the field's source,
+    unless ``sources`` says otherwise) and converting it with the field's
+    own ``to_representation``, or not at all for values that are already
+    rendered. Field types the plan can't reproduce are rejected, so that the
+    two paths can't drift apart. ``extra_columns`` are fetched but not
+    rendered.
+
+    ``subset()`` returns a plan for some of the fields, with relations named
+    in ``expansions`` rendered by their own serializer from joined columns.
+    """
+
+    # Fields whose to_representation() returns these columns' values as is.
+    PASSTHROUGH_FIELDS = (
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+        serializers.PrimaryKeyRelatedField,
+        serializers.StringRelatedField,
+    )
+    CONVERTED_FIELDS = (serializers.DateField, serializers.DateTimeField)
+
+    def __init__(
+        self,
+        serializer_class,
+        sources=None,
+        extra_columns=(),
+        expansions=None,
+        fields=None,
+        expand=(),
+    ):
+        self.serializer_class = serializer_class
+        self.sources = sources or {}
+        self.extra_columns = list(extra_columns)
+        self.expansions = expansions or {}
+        self.fields = fields
+        self.expand = expand
+        self._subsets = {}
+
+    def subset(self, fields=None, expand=()):
+        """
+        The plan for ``fields`` (all when None), in the serializer's order,
+        with the relations in ``expand`` expanded.
+        """
+        key = (None if fields is None else frozenset(fields), frozenset(expand))
+        if key not in self._subsets:
+            self._subsets[key] = RowPlan(
+                self.serializer_class,
+                self.sources,
+                self.extra_columns,
+                self.expansions,
+                fields=key[0],
+                expand=key[1],
+            )
+        return self._subsets[key]
+
+    @cached_property
+    def field_names(self):
+        return [
+            name
+            for name, field in self.serializer_class().fields.items()
+            if not field.write_only
+        ]
+
+    @cached_property
+    def steps(self):
+        """
+        ``(key, column, field, nested)`` per field: ``field`` converts the
+        value (None to pass it through), ``nested`` is the plan of an
+        expanded relation, whose columns are joined through ``column``.
+        """
+        steps = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only or (
+                self.fields is not None and name not in self.fields
+            ):
+                continue
+            column = self.sources.get(name, field.source)
+            if name in self.expand and name in self.expansions:
+                steps.append((name, column, None, RowPlan(self.expansions[name])))
+                continue
+            if isinstance(field, serializers.StringRelatedField) and (
+                name not in self.sources
+            ):
+                raise ImproperlyConfigured(
+                    f"RowPlan needs the column that str() of {name!r} returns."
+                )
+            if isinstance(field, self.PASSTHROUGH_FIELDS):
+                field = None
+            elif not isinstance(field, self.CONVERTED_FIELDS):
+                raise ImproperlyConfigured(
+                    f"RowPlan can't render {type(field).__name__} {name!r}."
+                )
+            steps.append((name, column, field, None))
+        return steps
+
+    @cached_property
+    def columns(self):
+        columns = []
+        for _, column, _, nested in self.steps:
+            columns.append(column)
+            if nested is not None:
+                columns += [f"{column}__{name}" for name in nested.columns]
+        columns += self.extra_columns
+        return list(dict.fromkeys(columns))
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def converters(self, prefix=""):
+        """
+        ``(key, column, convert, nested)`` per field for the current time
+        zone, with ``nested`` the converters of an expanded relation.
+        DateTimeField looks the time zone up for every value; ISO 8601
+        datetimes here look it up once.
+        """
+        converters = []
+        for key, column, field, nested in self.steps:
+            convert = field and field.to_representation
+            if (
+                isinstance(field, serializers.DateTimeField)
+                and not hasattr(field, "timezone")
+                and getattr(field, "format", api_settings.DATETIME_FORMAT).lower()
+                == ISO_8601
+            ):
+                convert = iso_datetime(field.default_timezone(), convert)
+            if nested is not None:
+                nested = nested.converters(prefix=f"{prefix}{column}__")
+            converters.append((key, f"{prefix}{column}", convert, nested))
+        return converters
+
+    @staticmethod
+    def render_row(row, converters):
+        data = {}
+        for key, column, convert, nested in converters:
+            value = row[column]
+            if value is None:
+                data[key] = None
+            elif nested is not None:
+                data[key] = RowPlan.render_row(row, nested)
+            elif convert is None:
+                data[key] = value
+            else:
+                data[key] = convert(value)
+        return data
+
+    def iter_render(self, rows):
+        converters = self.converters()
+        for row in rows:
+            yield self.render_row(row, converters)
+
+    def render(self, rows):
+        with timed("serializer"):
+            return list(self.iter_render(rows))
+
+
+def iso_datetime(tz, fallback):
+    """DateTimeField's ISO 8601 output for aware datetimes, in ``tz``."""
+    if tz is None:
+        return fallback
+
+    def convert(value):
+        if value.utcoffset() is None:
+            return fallback(value)
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class ArchivedTaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    user = serializers.StringRelatedField(read_only=True)
+
+    class Meta:
+        model = ArchivedTask
+        fields = [*TaskSerializer.Meta.fields, "archived_at"]
+        read_only_fields = fields
+        list_serializer_class = TimedListSerializer
+
+
+class TaskBatchOperationSerializer(serializers.Serializer):
+    OPERATIONS = ["create", "update", "delete"]
+
+    op = serializers.ChoiceField(choices=OPERATIONS)
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, data):
+        if data["op"] in ("update", "delete") and "id" not in data:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if data["op"] in ("create", "update") and "data" not in data:
+            raise serializers.ValidationError({"data": "This field is required."})
+        return data
+
+
+class TaskBatchSerializer(serializers.Serializer):
+    max_operations = 500
+
+    operations = serializers.ListField(
+        child=TaskBatchOperationSerializer(),
+        allow_empty=False,
+        max_length=max_operations,
+    )
+
+    def validate_operations(self, value):
+        seen = set()
+        for operation in value:
+            task_id = operation.get("id")
+            if task_id is None:
+                continue
+            if task_id in seen:
+                raise serializers.ValidationError(
+                    f"Task {task_id} appears in more than one operation."
+                )
+            seen.add(task_id)
+        return value
+
+
+DUPLICATE_NAME_MESSAGE = "You already have a category with this name."
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ["id", "name", "color"]
+        list_serializer_class = TimedListSerializer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Per-category task counts, when the view has loaded them.
+        task_counts = self.context.get("task_counts")
+        if task_counts is not None:
+            data["task_counts"] = task_counts.get(
+                instance.pk, TaskService.empty_category_task_counts()
+            )
+        return data
 
     def validate_name(self, value):
         """Validate category name"""
@@ -89,19 +386,74 @@ class CategorySerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, data):
-        """Validate category uniqueness per user"""
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            name = data.get("name", "").strip()
-            if name:
-                # Check for duplicate category name for this user
-                existing = Category.objects.filter(user=request.user, name__iexact=name)
-                # Exclude current instance if updating
-                if self.instance:
-                    existing = existing.exclude(pk=self.instance.pk)
-                if existing.exists():
+    def save(self, **kwargs):
+        # Names are unique per user ignoring case; the database enforces it.
+        try:
+            return super().save(**kwargs)
+        except IntegrityError as exc:
+            if not Category.is_duplicate_name(exc):
+                raise
+            raise serializers.ValidationError({"name": [DUPLICATE_NAME_MESSAGE]})
+
+
+class CategoryUpsertItemSerializer(CategorySerializer):
+    """A category to create or update by name, or to rename by ``id``."""
+
+    id = serializers.IntegerField(required=False)
+
+
+class CategoryUpsertSerializer(serializers.Serializer):
+    max_categories = 500
+
+    categories = serializers.ListField(
+        child=CategoryUpsertItemSerializer(),
+        allow_empty=False,
+        max_length=max_categories,
+    )
+
+    def validate_categories(self, value):
+        names, ids = set(), set()
+        for item in value:
+            name = item["name"].lower()
+            if name in names:
+                raise serializers.ValidationError(
+                    f"Category {item['name']!r} appears more than once."
+                )
+            names.add(name)
+            if "id" in item:
+                if item["id"] in ids:
                     raise serializers.ValidationError(
-                        {"name": "You already have a category with this name."}
+                        f"Category {item['id']} appears more than once."
                     )
-        return data
+                ids.add(item["id"])
+        return value
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        fields = [
+            "id",
+            "kind",
+            "object_id",
+            "status",
+            "stage",
+            "processed",
+            "total",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+# TaskSerializer's output for task list rows. ``user`` renders str(user),
+# which is the email; the extra columns are the cursor pagination's sort
+# keys, which ``?fields=`` may leave out.
+TASK_ROWS = RowPlan(
+    TaskSerializer,
+    sources={"user": "user__email"},
+    extra_columns=["id", "created_at", "due_date", "priority_rank"],
+    expansions={"category": CategorySerializer},
+)
@@ -1,33 +1,45 @@
 from datetime import date
 
+from django.db import transaction
 from django.db.models import Count, Q
+from django.utils import timezone
 
-from .models import Task
+from .models import OPEN_STATUSES, Task, TaskStatistics
 
 
 class TaskService:
+    STATISTICS_FIELDS = [
+        "total_tasks",
+        "todo_count",
+        "in_progress_count",
+        "done_count",
+        "high_priority_count",
+    ]
+
     @staticmethod
     def get_user_task_statistics(user):
-        """Calculate task statistics for a user"""
-        tasks = Task.objects.filter(user=user)
-
-        # Use aggregation for better performance (single query instead of multiple)
-        stats = tasks.aggregate(
-            total_tasks=Count("id"),
-            todo_count=Count("id", filter=Q(status="TODO")),
-            in_progress_count=Count("id", filter=Q(status="IN_PROGRESS")),
-            done_count=Count("id", filter=Q(status="DONE")),
-            high_priority_count=Count("id", filter=Q(priority="HIGH")),
-            overdue_count=Count(
-                "id",
-                filter=Q(
-                    due_date__lt=date.today(),
-                    status__in=["TODO", "IN_PROGRESS"],
-                    due_date__isnull=False,
-                ),
-            ),
-        )
+        """Return task statistics for a user"""
+        # Counters are maintained on every write, so this is a key lookup;
+        # only the date-dependent overdue count needs a (indexed) count query.
+        counters = TaskStatistics.objects.filter(user=user).first()
+        if counters is None:
+            counters = TaskStatistics(user=user)
+        stats = {
+            field: getattr(counters, field) for field in TaskService.STATISTICS_FIELDS
+        }
+        stats["overdue_count"] = TaskService.get_overdue_tasks(user).count()
+        return stats
 
+    @staticmethod
+    async def aget_user_task_statistics(user):
+        """Async version of ``get_user_task_statistics``."""
+        counters = await TaskStatistics.objects.filter(user=user).afirst()
+        if counters is None:
+            counters = TaskStatistics(user=user)
+        stats = {
+            field: getattr(counters, field) for field in TaskService.STATISTICS_FIELDS
+        }
+        stats["overdue_count"] = await TaskService.get_overdue_tasks(user).acount()
         return stats
 
     @staticmethod
@@ -36,13 +48,96 @@ class TaskService:
         return Task.objects.filter(
             user=user,
             due_date__lt=date.today(),
-            status__in=["TODO", "IN_PROGRESS"],
+            status__in=OPEN_STATUSES,
             due_date__isnull=False,
         )
 
+    @staticmethod
+    def _category_counts_queryset(user):
+        counts = {"total": Count("id")}
+        for value, _ in Task.STATUS_CHOICES:
+            counts[f"status_{value}"] = Count("id", filter=Q(status=value))
+        for value, _ in Task.PRIORITY_CHOICES:
+            counts[f"priority_{value}"] = Count("id", filter=Q(priority=value))
+        counts["overdue"] = Count(
+            "id", filter=Q(status__in=OPEN_STATUSES, due_date__lt=date.today())
+        )
+        return (
+            Task.objects.filter(user=user)
+            .order_by()
+            .values("category_id")
+            .annotate(**counts)
+        )
+
+    @staticmethod
+    def _category_counts(row=None):
+        row = row or {}
+        return {
+            "total": row.get("total", 0),
+            "by_status": {
+                value: row.get(f"status_{value}", 0) for value, _ in Task.STATUS_CHOICES
+            },
+            "by_priority": {
+                value: row.get(f"priority_{value}", 0)
+                for value, _ in Task.PRIORITY_CHOICES
+            },
+            "overdue": row.get("overdue", 0),
+        }
+
+    @staticmethod
+    def get_category_task_counts(user):
+        """
+        Count the user's tasks per category with one grouped query:
+        ``{category_id: counts}``, with uncategorized tasks under ``None``.
+        Archived tasks are not counted.
+        """
+        rows = TaskService._category_counts_queryset(user)
+        return {row["category_id"]: TaskService._category_counts(row) for row in rows}
+
+    @staticmethod
+    async def aget_category_task_counts(user):
+        """Async version of ``get_category_task_counts``."""
+        rows = TaskService._category_counts_queryset(user)
+        return {
+            row["category_id"]: TaskService._category_counts(row) async for row in rows
+        }
+
+    @staticmethod
+    def empty_category_task_counts():
+        return TaskService._category_counts()
+
     @staticmethod
     def bulk_update_status(user, task_ids, new_status):
         """Bulk update status for multiple tasks"""
         tasks = Task.objects.filter(user=user, id__in=task_ids)
-        tasks.update(status=new_status)
-        return tasks.count()
+        # Counters are adjusted inside update(), in the same transaction.
+        return tasks.update(status=new_status)
+
+    @staticmethod
+    def apply_batch(user, creates, updates, deletes):
+        """
+        Apply validated batch operations for a user in one transaction.
+
+        ``creates`` is a list of validated data dicts, ``updates`` a list of
+        ``(task, validated_data)`` pairs and ``deletes`` a list of task ids.
+        Returns the created and the updated tasks.
+        """
+        updated = [task for task, _ in updates]
+        update_fields = set()
+        now = timezone.now()
+        for task, data in updates:
+            for field, value in data.items():
+                setattr(task, field, value)
+            update_fields.update(data)
+            # bulk_update() skips auto_now fields.
+            task.updated_at = now
+
+        with transaction.atomic():
+            created = Task.objects.bulk_create(
+                [Task(user=user, **data) for data in creates]
+            )
+            if updated:
+                Task.objects.bulk_update(updated, [*update_fields, "updated_at"])
+            if deletes:
+                Task.objects.filter(user=user, id__in=deletes).delete()
+        return created, updated
@@ -0,0 +1,127 @@
+"""
+Delta sync: what changed in a user's tasks and categories since a cursor.
+
+Changed rows are read from three keyset streams, each ordered by a
+``(timestamp, id)`` pair with a matching ``(user, timestamp, id)`` index:
+tasks and categories by ``updated_at`` and tombstones by ``deleted_at``. The
+cursor records the position reached in each stream, so a sync reads only
+the rows after it.
+
+A transaction can commit after a later one and still carry the earlier
+timestamp. Streams therefore stop ``SYNC_SETTLE_SECONDS`` before the current
+time, so no in-flight write ends up behind a cursor that has moved past it.
+"""
+
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Task, Tombstone
+
+DEFAULT_SETTLE_SECONDS = 5
+DEFAULT_TOMBSTONE_RETENTION_DAYS = 30
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ExpiredCursor(ValueError):
+    """The cursor predates the oldest tombstones that are still kept."""
+
+
+def settle_seconds():
+    return getattr(settings, "SYNC_SETTLE_SECONDS", DEFAULT_SETTLE_SECONDS)
+
+
+def tombstone_retention():
+    days = getattr(
+        settings, "SYNC_TOMBSTONE_RETENTION_DAYS", DEFAULT_TOMBSTONE_RETENTION_DAYS
+    )
+    return timedelta(days=days)
+
+
+def encode_cursor(positions):
+    payload = {
+        stream: [moment.isoformat(), pk] for stream, (moment, pk) in positions.items()
+    }
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(token):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        positions = {}
+        for stream in SyncStreams.streams:
+            moment, pk = payload[stream]
+            moment = parse_datetime(moment)
+            if moment is None:
+                raise ValueError
+            positions[stream] = (moment, int(pk))
+    except (TypeError, ValueError, KeyError, binascii.Error):
+        raise InvalidCursor("Invalid cursor")
+    return positions
+
+
+def after(field, position):
+    """Rows strictly after ``position`` in ``(field, id)`` order."""
+    moment, pk = position
+    return Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk})
+
+
+class SyncStreams:
+    # Stream name -> timestamp field it is ordered by.
+    streams = {
+        "tasks": "updated_at",
+        "categories": "updated_at",
+        "deleted": "deleted_at",
+    }
+
+    def __init__(self, user, limit):
+        self.user = user
+        self.limit = limit
+
+    def queryset(self, stream):
+        if stream == "tasks":
+            return Task.objects.filter(user=self.user).with_owner()
+        if stream == "categories":
+            return Category.objects.visible().filter(user=self.user)
+        return Tombstone.objects.filter(user=self.user)
+
+    def changes(self, token=None):
+        """
+        Return ``(rows, cursor, has_more)``, where ``rows`` maps each stream
+        to at most ``limit`` rows changed after the cursor's position.
+        """
+        until = timezone.now() - timedelta(seconds=settle_seconds())
+        if token:
+            positions = decode_cursor(token)
+            if positions["deleted"][0] < timezone.now() - tombstone_retention():
+                raise ExpiredCursor("Cursor expired; sync from scratch")
+        else:
+            # A new client downloads every row and needs no tombstones for
+            # rows deleted before it started.
+            positions = {"tasks": None, "categories": None, "deleted": (until, 0)}
+
+        rows, has_more = {}, False
+        for stream, field in self.streams.items():
+            queryset = self.queryset(stream).filter(**{f"{field}__lt": until})
+            if positions[stream] is not None:
+                queryset = queryset.filter(after(field, positions[stream]))
+            page = list(queryset.order_by(field, "id")[: self.limit + 1])
+            if len(page) > self.limit:
+                page = page[: self.limit]
+                has_more = True
+                positions[stream] = (getattr(page[-1], field), page[-1].pk)
+            elif positions[stream] is None or positions[stream] < (until, 0):
+                # Everything before ``until`` has been seen.
+                positions[stream] = (until, 0)
+            rows[stream] = page
+        return rows, encode_cursor(positions), has_more
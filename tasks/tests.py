@@ -1,12 +1,50 @@
+import csv
+import json
+import os
+import tempfile
 from datetime import date, timedelta
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import ANY, patch
 
-from django.test import TestCase
-from rest_framework import status
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from config import metrics, routers
 from users.models import CustomUser
 
-from .models import Task
+from .archive import archive_done_tasks
+from .benchmarks import data as benchmark_data
+from .benchmarks import runner as benchmark_runner
+from .deletion import claim_job, process_deletions, run_batch, run_job
+from .importers import TaskImporter, parse_ndjson
+from .models import (
+    OPEN_STATUSES,
+    ArchivedTask,
+    Category,
+    DeletionJob,
+    Task,
+    TaskStatistics,
+    Tombstone,
+    UserDataVersion,
+)
+from .reminders import build_digests, scan_due_tasks
+from .search import QueryTimeout, query_time_limit
+from .serializers import TASK_ROWS, RowPlan, TaskSerializer
+from .services import TaskService
 
 
 class TaskAPITestCase(TestCase):
@@ -167,3 +205,2206 @@ class TaskCRUDTests(TestCase):
 
         response = self.client.get("/api/tasks/?priority=HIGH")
         self.assertEqual(len(response.data["results"]), 1)
+
+
+class TaskCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="cursor@test.com",
+            password="TestPass123!",
+            first_name="Cursor",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _walk(self, url):
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            titles.extend(task["title"] for task in response.data["results"])
+            url = response.data["next"]
+        return titles
+
+    def test_cursor_mode_walks_all_tasks_in_order(self):
+        for i in range(25):
+            Task.objects.create(title=f"Task {i}", user=self.user)
+
+        titles = self._walk("/api/tasks/?pagination=cursor")
+        self.assertEqual(titles, [f"Task {i}" for i in reversed(range(25))])
+
+    def test_previous_link_returns_previous_page(self):
+        for i in range(25):
+            Task.objects.create(title=f"Task {i}", user=self.user)
+
+        first = self.client.get("/api/tasks/?pagination=cursor")
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_cursor_ordering_by_due_date_places_nulls_last(self):
+        today = date.today()
+        Task.objects.create(title="No date", user=self.user)
+        for i in range(5):
+            Task.objects.create(
+                title=f"Due {i}", due_date=today + timedelta(days=i), user=self.user
+            )
+        Task.objects.create(title="Also due 0", due_date=today, user=self.user)
+
+        titles = self._walk(
+            "/api/tasks/?pagination=cursor&ordering=due_date&page_size=2"
+        )
+        self.assertEqual(
+            titles,
+            ["Due 0", "Also due 0", "Due 1", "Due 2", "Due 3", "Due 4", "No date"],
+        )
+
+        titles = self._walk(
+            "/api/tasks/?pagination=cursor&ordering=-due_date&page_size=2"
+        )
+        self.assertEqual(
+            titles,
+            ["No date", "Due 4", "Due 3", "Due 2", "Due 1", "Also due 0", "Due 0"],
+        )
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get("/api/tasks/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_is_default(self):
+        Task.objects.create(title="Task", user=self.user)
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.data["count"], 1)
+
+
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="search@test.com",
+            password="TestPass123!",
+            first_name="Search",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task["title"] for task in response.data["results"]]
+
+    def test_search_matches_title_and_description(self):
+        Task.objects.create(title="Quarterly report", user=self.user)
+        Task.objects.create(
+            title="Prepare slides",
+            description="For the quarterly meeting",
+            user=self.user,
+        )
+        Task.objects.create(title="Buy groceries", user=self.user)
+
+        titles = self._titles("/api/tasks/?search=quarterly")
+        self.assertCountEqual(titles, ["Quarterly report", "Prepare slides"])
+
+    def test_partial_words_match(self):
+        Task.objects.create(title="Quarterly report", user=self.user)
+        Task.objects.create(title="Buy groceries", user=self.user)
+
+        self.assertEqual(self._titles("/api/tasks/?search=quart"), ["Quarterly report"])
+        self.assertEqual(
+            self._titles("/api/tasks/?search=quart rep"), ["Quarterly report"]
+        )
+        # Not the start of a word: found with icontains, as before.
+        self.assertEqual(self._titles("/api/tasks/?search=rocer"), ["Buy groceries"])
+
+    def test_search_requires_every_term(self):
+        Task.objects.create(title="Review budget draft", user=self.user)
+        Task.objects.create(title="Review code", user=self.user)
+
+        self.assertEqual(
+            self._titles("/api/tasks/?search=review budget"), ["Review budget draft"]
+        )
+
+    def test_search_index_follows_updates_and_deletes(self):
+        task = Task.objects.create(title="Call plumber", user=self.user)
+        task.title = "Call electrician"
+        task.save()
+
+        self.assertEqual(self._titles("/api/tasks/?search=plumber"), [])
+        self.assertEqual(
+            self._titles("/api/tasks/?search=electrician"), ["Call electrician"]
+        )
+
+        task.delete()
+        self.assertEqual(self._titles("/api/tasks/?search=electrician"), [])
+
+    def test_rank_orders_by_relevance(self):
+        Task.objects.create(title="Deploy release", user=self.user)
+        Task.objects.create(
+            title="Write notes", description="deploy checklist", user=self.user
+        )
+
+        titles = self._titles("/api/tasks/?search=deploy&rank=true")
+        self.assertEqual(titles, ["Deploy release", "Write notes"])
+
+    def test_search_is_scoped_to_user(self):
+        other = CustomUser.objects.create_user(
+            email="other@test.com", password="Pass123!"
+        )
+        Task.objects.create(title="Secret plan", user=other)
+
+        self.assertEqual(self._titles("/api/tasks/?search=secret"), [])
+
+
+class TaskPriorityRankTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="rank@test.com",
+            password="TestPass123!",
+            first_name="Rank",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_rank_follows_priority_on_every_write_path(self):
+        task = Task.objects.create(title="Task", priority="HIGH", user=self.user)
+        self.assertEqual(task.priority_rank, 3)
+
+        Task.objects.filter(pk=task.pk).update(priority="LOW")
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 1)
+
+        task.priority = "MEDIUM"
+        Task.objects.bulk_update([task], ["priority"])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 2)
+
+        [created] = Task.objects.bulk_create(
+            [Task(title="Bulk", priority="HIGH", user=self.user)]
+        )
+        self.assertEqual(Task.objects.get(pk=created.pk).priority_rank, 3)
+
+    def test_rank_updated_through_api(self):
+        task = Task.objects.create(title="Task", priority="LOW", user=self.user)
+        response = self.client.patch(f"/api/tasks/{task.id}/", {"priority": "HIGH"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("priority_rank", response.data)
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 3)
+
+    def test_ordering_by_priority_uses_rank(self):
+        for priority in ["MEDIUM", "HIGH", "LOW"]:
+            Task.objects.create(title=priority, priority=priority, user=self.user)
+
+        response = self.client.get("/api/tasks/?ordering=priority")
+        titles = [task["title"] for task in response.data["results"]]
+        self.assertEqual(titles, ["LOW", "MEDIUM", "HIGH"])
+
+        response = self.client.get("/api/tasks/?ordering=-priority,due_date")
+        titles = [task["title"] for task in response.data["results"]]
+        self.assertEqual(titles, ["HIGH", "MEDIUM", "LOW"])
+
+    def test_cursor_pagination_by_priority(self):
+        for i, priority in enumerate(["LOW", "HIGH", "MEDIUM"] * 3):
+            Task.objects.create(
+                title=f"{priority} {i}", priority=priority, user=self.user
+            )
+
+        url = "/api/tasks/?pagination=cursor&ordering=-priority&page_size=2"
+        priorities = []
+        while url:
+            response = self.client.get(url)
+            priorities.extend(task["priority"] for task in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(priorities, ["HIGH"] * 3 + ["MEDIUM"] * 3 + ["LOW"] * 3)
+
+
+class TaskStatisticsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="stats@test.com",
+            password="TestPass123!",
+            first_name="Stats",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _stats(self):
+        response = self.client.get("/api/tasks/statistics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_statistics_follow_api_writes(self):
+        response = self.client.post(
+            "/api/tasks/", {"title": "Write report", "priority": "HIGH"}
+        )
+        task_id = response.data["id"]
+        self.client.post("/api/tasks/", {"title": "Read book", "status": "IN_PROGRESS"})
+        self.client.patch(
+            f"/api/tasks/{task_id}/", {"status": "DONE", "priority": "LOW"}
+        )
+
+        stats = self._stats()
+        self.assertEqual(stats["total_tasks"], 2)
+        self.assertEqual(stats["done_count"], 1)
+        self.assertEqual(stats["in_progress_count"], 1)
+        self.assertEqual(stats["todo_count"], 0)
+        self.assertEqual(stats["high_priority_count"], 0)
+
+        self.client.delete(f"/api/tasks/{task_id}/")
+        stats = self._stats()
+        self.assertEqual(stats["total_tasks"], 1)
+        self.assertEqual(stats["done_count"], 0)
+
+    def test_statistics_follow_bulk_paths(self):
+        tasks = Task.objects.bulk_create(
+            [Task(title=f"Task {i}", priority="HIGH", user=self.user) for i in range(4)]
+        )
+        TaskService.bulk_update_status(self.user, [t.pk for t in tasks[:3]], "DONE")
+        tasks[3].priority = "LOW"
+        Task.objects.bulk_update([tasks[3]], ["priority"])
+        Task.objects.filter(pk=tasks[0].pk).delete()
+
+        stats = self._stats()
+        self.assertEqual(stats["total_tasks"], 3)
+        self.assertEqual(stats["done_count"], 2)
+        self.assertEqual(stats["todo_count"], 1)
+        self.assertEqual(stats["high_priority_count"], 2)
+        self.assertEqual(
+            TaskStatistics.compute([self.user.pk])[self.user.pk],
+            TaskStatistics.objects.get(user=self.user).as_dict(),
+        )
+
+    def test_overdue_count_is_computed_from_tasks(self):
+        task = Task.objects.create(title="Late task", user=self.user)
+        Task.objects.filter(pk=task.pk).update(
+            due_date=date.today() - timedelta(days=1)
+        )
+        Task.objects.create(
+            title="Done late", status="DONE", due_date=date.today(), user=self.user
+        )
+
+        self.assertEqual(self._stats()["overdue_count"], 1)
+
+    def test_statistics_for_user_without_tasks(self):
+        stats = self._stats()
+        self.assertEqual(stats["total_tasks"], 0)
+        self.assertEqual(stats["overdue_count"], 0)
+
+    def test_rebuild_command_repairs_drift(self):
+        Task.objects.create(title="Task", user=self.user)
+        TaskStatistics.objects.filter(user=self.user).update(total_tasks=7)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_task_statistics", "--check", stdout=StringIO())
+        call_command("rebuild_task_statistics", stdout=StringIO())
+        call_command("rebuild_task_statistics", "--check", stdout=StringIO())
+        self.assertEqual(self._stats()["total_tasks"], 1)
+
+
+class TaskBatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="batch@test.com",
+            password="TestPass123!",
+            first_name="Batch",
+            last_name="User",
+        )
+        self.other = CustomUser.objects.create_user(
+            email="batch-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Work", user=self.user)
+
+    def _post(self, operations):
+        return self.client.post(
+            "/api/tasks/batch/", {"operations": operations}, format="json"
+        )
+
+    def test_batch_applies_all_operations(self):
+        to_update = Task.objects.create(title="Old title", user=self.user)
+        to_delete = Task.objects.create(title="Remove me", user=self.user)
+
+        response = self._post(
+            [
+                {
+                    "op": "create",
+                    "data": {"title": "New one", "category": self.category.pk},
+                },
+                {"op": "create", "data": {"title": "New two", "priority": "HIGH"}},
+                {"op": "update", "id": to_update.pk, "data": {"status": "DONE"}},
+                {"op": "delete", "id": to_delete.pk},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([r["status"] for r in results], [201, 201, 200, 204])
+        self.assertEqual(results[0]["data"]["category"], self.category.pk)
+        self.assertEqual(results[2]["data"]["status"], "DONE")
+        self.assertEqual(
+            sorted(Task.objects.values_list("title", flat=True)),
+            ["New one", "New two", "Old title"],
+        )
+        self.assertEqual(TaskStatistics.objects.get(user=self.user).total_tasks, 3)
+
+    def test_results_match_interleaved_operations(self):
+        first = Task.objects.create(title="First", user=self.user)
+        second = Task.objects.create(title="Second", user=self.user)
+
+        response = self._post(
+            [
+                {"op": "update", "id": second.pk, "data": {"status": "DONE"}},
+                {"op": "create", "data": {"title": "Created"}},
+                {"op": "update", "id": first.pk, "data": {"priority": "HIGH"}},
+            ]
+        )
+
+        results = response.data["results"]
+        self.assertEqual(results[0]["id"], second.pk)
+        self.assertEqual(results[0]["data"]["title"], "Second")
+        self.assertEqual(results[1]["id"], Task.objects.get(title="Created").pk)
+        self.assertEqual(results[1]["data"]["title"], "Created")
+        self.assertEqual(results[2]["id"], first.pk)
+        self.assertEqual(results[2]["data"]["priority"], "HIGH")
+
+    def test_invalid_operation_rolls_back_whole_batch(self):
+        task = Task.objects.create(title="Keep me", user=self.user)
+        foreign_category = Category.objects.create(name="Theirs", user=self.other)
+        foreign_task = Task.objects.create(title="Not yours", user=self.other)
+
+        response = self._post(
+            [
+                {"op": "create", "data": {"title": "Valid task"}},
+                {"op": "create", "data": {"title": "No"}},
+                {
+                    "op": "create",
+                    "data": {"title": "Bad category", "category": foreign_category.pk},
+                },
+                {"op": "update", "id": foreign_task.pk, "data": {"title": "Mine now"}},
+                {"op": "delete", "id": task.pk},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data["results"]
+        self.assertEqual([r["status"] for r in results], [201, 400, 400, 404, 204])
+        self.assertIn("title", results[1]["errors"])
+        self.assertIn("category", results[2]["errors"])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 1)
+        foreign_task.refresh_from_db()
+        self.assertEqual(foreign_task.title, "Not yours")
+
+    def test_malformed_batch_is_rejected(self):
+        task = Task.objects.create(title="Task", user=self.user)
+        for operations in (
+            [],
+            [{"op": "rename", "id": task.pk}],
+            [{"op": "update", "id": task.pk}],
+            [
+                {"op": "delete", "id": task.pk},
+                {"op": "update", "id": task.pk, "data": {}},
+            ],
+        ):
+            response = self._post(operations)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_uses_constant_number_of_queries(self):
+        def run(size):
+            tasks = [
+                Task.objects.create(title=f"Task {i}", user=self.user)
+                for i in range(size)
+            ]
+            operations = [
+                {"op": "update", "id": task.pk, "data": {"category": self.category.pk}}
+                for task in tasks
+            ] + [
+                {
+                    "op": "create",
+                    "data": {"title": f"New {i}", "category": self.category.pk},
+                }
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self._post(operations)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries.captured_queries)
+
+        self.assertEqual(run(5), run(30))
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint in tasks/urls.py runs a fixed number of queries, however
+    many rows it returns. Raise a budget only together with the code change
+    that needs it.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="budget@test.com",
+            password="TestPass123!",
+            first_name="Budget",
+            last_name="User",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Work", user=self.user)
+        # Budgets are for the steady state, where the per-user rows exist.
+        TaskStatistics.objects.create(user=self.user)
+        UserDataVersion.objects.get_or_create(user=self.user)
+
+    def _create_tasks(self, count):
+        yesterday = date.today() - timedelta(days=1)
+        tasks = Task.objects.bulk_create(
+            [
+                Task(title=f"Task {i}", category=self.category, user=self.user)
+                for i in range(count)
+            ]
+        )
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            due_date=yesterday
+        )
+        return tasks
+
+    def assertQueryBudget(self, budget, method, url, data=None, **kwargs):
+        if "content_type" not in kwargs:
+            kwargs["format"] = "json"
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, **kwargs)
+            if response.streaming:
+                # Streamed bodies run their queries as they are read.
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 400, getattr(response, "data", None))
+        self.assertEqual(
+            len(queries.captured_queries),
+            budget,
+            "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        return response
+
+    def test_task_list_budget_does_not_grow_with_page_size(self):
+        self._create_tasks(100)
+        for page_size in (1, 10, 100):
+            url = f"/api/tasks/?page_size={page_size}"
+            self.assertQueryBudget(3, "get", url)
+            self.assertQueryBudget(2, "get", url + "&pagination=cursor")
+            self.assertQueryBudget(3, "get", url + "&search=task&ordering=-priority")
+
+    def test_overdue_budget_does_not_grow_with_page_size(self):
+        self._create_tasks(30)
+        self.assertQueryBudget(3, "get", "/api/tasks/overdue/")
+
+    def test_statistics_budget(self):
+        self._create_tasks(30)
+        self.assertQueryBudget(3, "get", "/api/tasks/statistics/")
+
+    def test_task_write_budgets(self):
+        response = self.assertQueryBudget(
+            6,
+            "post",
+            "/api/tasks/",
+            {"title": "Budgeted", "category": self.category.pk},
+        )
+        url = f"/api/tasks/{response.data['id']}/"
+        self.assertQueryBudget(2, "get", url)
+        self.assertQueryBudget(
+            7, "put", url, {"title": "Renamed", "category": self.category.pk}
+        )
+        self.assertQueryBudget(7, "patch", url, {"status": "DONE"})
+        self.assertQueryBudget(8, "delete", url)
+
+    def test_export_budget_does_not_grow_with_rows(self):
+        for count in (10, 100):
+            self._create_tasks(count // 2)
+            self.assertQueryBudget(1, "get", "/api/tasks/export/")
+            self.assertQueryBudget(1, "get", "/api/tasks/export/?format=csv")
+
+    def test_import_budget_does_not_grow_with_rows(self):
+        # More rows than this split bulk_create into several INSERTs on
+        # SQLite, which caps the number of query parameters.
+        for count in (5, 50):
+            rows = [
+                {
+                    "title": f"Imported {i}",
+                    "category": ["Work", self.category.pk][i % 2],
+                }
+                for i in range(count)
+            ]
+            body = "".join(json.dumps(row) + "\n" for row in rows).encode()
+            self.assertQueryBudget(
+                9,
+                "post",
+                "/api/tasks/import/",
+                body,
+                content_type="application/x-ndjson",
+            )
+
+    @override_settings(SYNC_SETTLE_SECONDS=0)
+    def test_sync_budget_does_not_grow_with_changes(self):
+        cursor = None
+        for count in (10, 100):
+            self._create_tasks(count)
+            params = {"cursor": cursor} if cursor else {}
+            response = self.assertQueryBudget(3, "get", "/api/sync/", params)
+            self.assertEqual(len(response.data["tasks"]), count)
+            cursor = response.data["cursor"]
+
+    def test_autocomplete_budget_does_not_grow_with_matches(self):
+        for count in (10, 100):
+            self._create_tasks(count // 2)
+            self.assertQueryBudget(2, "get", "/api/autocomplete/", {"q": "tas"})
+
+    def test_archive_budgets(self):
+        for count in (10, 100):
+            tasks = self._create_tasks(count // 2)
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).archive()
+            self.assertQueryBudget(3, "get", "/api/tasks/archive/")
+        self.assertQueryBudget(8, "post", f"/api/tasks/archive/{tasks[0].pk}/restore/")
+
+    def test_deletion_job_budgets(self):
+        for count in (10, 100):
+            for i in range(count // 2):
+                DeletionJob.objects.create(
+                    kind="category", object_id=i, owner_id=self.user.pk
+                )
+            self.assertQueryBudget(2, "get", "/api/deletions/")
+        job = DeletionJob.objects.first()
+        self.assertQueryBudget(1, "get", f"/api/deletions/{job.pk}/")
+
+    def test_multi_get_budget_does_not_grow_with_ids(self):
+        tasks = self._create_tasks(100)
+        for count in (1, 10, 100):
+            ids = ",".join(str(task.pk) for task in tasks[:count])
+            self.assertQueryBudget(2, "get", f"/api/tasks/many/?ids={ids}")
+            self.assertQueryBudget(
+                2, "get", f"/api/tasks/many/?ids={ids}&expand=category"
+            )
+
+    def test_batch_budget(self):
+        tasks = self._create_tasks(20)
+        operations = [
+            {"op": "update", "id": task.pk, "data": {"category": self.category.pk}}
+            for task in tasks[:10]
+        ]
+        operations += [{"op": "delete", "id": task.pk} for task in tasks[10:]]
+        operations += [{"op": "create", "data": {"title": "New task"}}] * 10
+        self.assertQueryBudget(
+            21, "post", "/api/tasks/batch/", {"operations": operations}
+        )
+
+    def test_category_budgets(self):
+        for i in range(30):
+            Category.objects.create(name=f"Category {i}", user=self.user)
+        self.assertQueryBudget(3, "get", "/api/categories/")
+        response = self.assertQueryBudget(
+            4, "post", "/api/categories/", {"name": "Home"}
+        )
+        url = f"/api/categories/{response.data['id']}/"
+        self.assertQueryBudget(2, "get", url)
+        self.assertQueryBudget(5, "put", url, {"name": "House"})
+        # Schedules a deletion job; tasks are detached by process_deletions.
+        self.assertQueryBudget(9, "delete", url)
+
+    def test_category_upsert_budget_does_not_grow_with_size(self):
+        categories = [
+            Category.objects.create(name=f"Category {i}", user=self.user)
+            for i in range(10)
+        ]
+        for count in (1, 10):
+            items = [
+                {"id": category.pk, "name": f"Renamed {count} {i}"}
+                for i, category in enumerate(categories[:count])
+            ]
+            items += [{"name": f"New {count} {i}"} for i in range(count)]
+            self.assertQueryBudget(
+                12, "post", "/api/categories/bulk/", {"categories": items}
+            )
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="etag@test.com",
+            password="TestPass123!",
+            first_name="Etag",
+            last_name="User",
+        )
+        self.other = CustomUser.objects.create_user(
+            email="etag-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.task = Task.objects.create(title="Polled task", user=self.user)
+
+    def _etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("Authorization", response.headers["Vary"])
+        return response.headers["ETag"]
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_data_returns_304_after_one_query(self):
+        for url in ("/api/tasks/", "/api/tasks/statistics/", "/api/categories/"):
+            etag = self._etag(url)
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.headers["ETag"], etag)
+
+    def test_query_parameters_change_the_etag(self):
+        self.assertNotEqual(
+            self._etag("/api/tasks/"), self._etag("/api/tasks/?status=DONE")
+        )
+
+    def test_task_and_category_writes_invalidate(self):
+        url = "/api/tasks/"
+        writes = [
+            lambda: self.client.post(url, {"title": "Another task"}),
+            lambda: TaskService.bulk_update_status(self.user, [self.task.pk], "DONE"),
+            lambda: Task.objects.filter(pk=self.task.pk).update(title="Renamed"),
+            lambda: Category.objects.create(name="Home", user=self.user),
+            lambda: Category.objects.filter(user=self.user).delete(),
+            lambda: self.task.delete(),
+        ]
+        for write in writes:
+            etag = self._etag(url)
+            write()
+            self.assertEqual(self._revalidate(url, etag), status.HTTP_200_OK)
+
+    def test_other_users_writes_do_not_invalidate(self):
+        etag = self._etag("/api/tasks/")
+        Task.objects.create(title="Someone else's", user=self.other)
+        self.assertEqual(
+            self._revalidate("/api/tasks/", etag), status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_error_responses_have_no_etag(self):
+        response = self.client.get("/api/tasks/?cursor=broken")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", response.headers)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="async@test.com", password="TestPass123!"
+        )
+        self.other = CustomUser.objects.create_user(
+            email="async-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Work", user=self.user)
+        today = date.today()
+        for i in range(15):
+            Task.objects.create(
+                title=f"Async task {i}",
+                description="report" if i % 3 == 0 else "",
+                status=["TODO", "IN_PROGRESS", "DONE"][i % 3],
+                priority=["LOW", "MEDIUM", "HIGH"][i % 3],
+                due_date=today + timedelta(days=i - 5),
+                category=self.category if i % 2 else None,
+                user=self.user,
+            )
+        self.foreign = Task.objects.create(title="Not yours", user=self.other)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def _aget(self, path, **headers):
+        return async_to_sync(self.async_client.get)(
+            f"/api/async{path}", headers={**self.headers, **headers}
+        )
+
+    def test_reads_match_sync_views(self):
+        paths = [
+            "/tasks/",
+            "/tasks/?page=2",
+            "/tasks/?status=TODO&ordering=priority",
+            "/tasks/?search=report&ordering=-due_date",
+            "/tasks/?pagination=cursor&ordering=due_date&page_size=4",
+            f"/tasks/{Task.objects.filter(user=self.user).first().pk}/",
+            "/tasks/statistics/",
+            "/tasks/overdue/",
+            "/categories/",
+            "/categories/?counts=true",
+            f"/categories/{self.category.pk}/",
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                expected = self.client.get(f"/api{path}")
+                response = self._aget(path)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                # Pagination links differ only in the URL prefix.
+                self.assertEqual(
+                    response.content.decode().replace("/api/async/", "/api/"),
+                    expected.content.decode(),
+                )
+
+    def test_cursor_links_can_be_followed(self):
+        response = self._aget("/tasks/?pagination=cursor&page_size=6")
+        seen = [task["id"] for task in response.json()["results"]]
+        next_url = response.json()["next"]
+        while next_url:
+            path = next_url.split("/api/async", 1)[1]
+            page = self._aget(path).json()
+            seen += [task["id"] for task in page["results"]]
+            next_url = page["next"]
+        self.assertEqual(len(seen), 15)
+        self.assertEqual(len(set(seen)), 15)
+
+    def test_other_users_task_is_not_found(self):
+        response = self._aget(f"/tasks/{self.foreign.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_page_is_not_found(self):
+        response = self._aget("/tasks/?page=9")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_authentication_required(self):
+        response = async_to_sync(self.async_client.get)("/api/async/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_run_through_sync_implementation(self):
+        post = async_to_sync(self.async_client.post)
+        response = post(
+            "/api/async/tasks/",
+            {"title": "Created async", "priority": "HIGH"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task_id = response.json()["id"]
+
+        response = async_to_sync(self.async_client.delete)(
+            f"/api/async/tasks/{task_id}/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            TaskService.get_user_task_statistics(self.user)["total_tasks"], 15
+        )
+
+    def test_conditional_get(self):
+        response = self._aget("/tasks/statistics/")
+        etag = response.headers["ETag"]
+
+        response = self._aget("/tasks/statistics/", **{"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class BenchmarkTests(TestCase):
+    def _dataset(self, seed=0):
+        benchmark_data.generate(users=4, tasks=120, seed=seed, batch_size=50)
+        return list(
+            Task.objects.filter(user__in=benchmark_data.benchmark_users())
+            .order_by("user__email", "title", "description", "due_date")
+            .values_list("user__email", "title", "status", "priority", "due_date")
+        )
+
+    def test_dataset_is_deterministic(self):
+        first = self._dataset()
+        self.assertEqual(len(first), 120)
+        self.assertEqual(self._dataset(), first)
+        self.assertNotEqual(self._dataset(seed=1), first)
+        self.assertEqual(benchmark_data.benchmark_users().count(), 4)
+
+    def test_command_emits_json_for_selected_cases(self):
+        self._dataset()
+        out = StringIO()
+        call_command("benchmark", "--case", "service.*", "--repeat", "2", stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(
+            set(report["results"]), {"service.statistics", "service.overdue"}
+        )
+        self.assertEqual(report["meta"]["dataset"]["tasks"], 120)
+        self.assertEqual(report["results"]["service.overdue"]["runs"], 2)
+
+    def test_all_cases_run(self):
+        self._dataset()
+        user = benchmark_data.benchmark_users().first()
+        names = benchmark_runner.select_cases()
+        report = benchmark_runner.run(user, names, repeat=1)
+        self.assertEqual(list(report["results"]), names)
+
+    def test_baseline_comparison_flags_regressions(self):
+        self._dataset()
+        baseline = {
+            "results": {
+                "service.statistics": {"median_ms": 0.0001},
+                "service.overdue": {"median_ms": 10_000.0},
+            }
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(baseline, f)
+        self.addCleanup(os.remove, f.name)
+
+        with self.assertRaisesMessage(CommandError, "service.statistics"):
+            call_command(
+                "benchmark",
+                "--case",
+                "service.*",
+                "--repeat",
+                "1",
+                "--baseline",
+                f.name,
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
+
+    def test_connection_benchmark(self):
+        out = StringIO()
+        call_command(
+            "benchmark_connections",
+            "--scenario",
+            "connect",
+            "--scenario",
+            "persistent",
+            "--requests",
+            "20",
+            "--concurrency",
+            "2",
+            "--json",
+            stdout=out,
+        )
+
+        connect, persistent = json.loads(out.getvalue())
+        self.assertEqual(connect["requests"], 20)
+        self.assertLessEqual(persistent["connections_opened"], 2)
+        if connection.vendor != "sqlite" or not connection.is_in_memory_db():
+            # SQLite never closes connections to in-memory databases.
+            self.assertEqual(connect["connections_opened"], 20)
+
+        if connection.vendor != "postgresql":
+            with self.assertRaises(CommandError):
+                call_command("benchmark_connections", "--scenario", "pool")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="metrics@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Task.objects.create(title=f"Measured {i}", user=self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/tasks/")
+
+        timing = response.headers["Server-Timing"]
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn("serializer;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    def test_metrics_endpoint_exposes_histograms_per_url_name(self):
+        self.client.get("/api/tasks/")
+        self.client.get("/api/tasks/")
+        self.client.get("/api/tasks/overdue/")
+
+        with self.settings(METRICS_TOKEN="s3cret"):
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        body = response.content.decode()
+
+        labels = 'view="task-list-create",method="GET"'
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 2", body)
+        self.assertIn(f"http_request_db_queries_sum{{{labels}}} 6", body)
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="3"}} 2', body)
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn(
+            'http_request_serializer_duration_seconds_count{view="overdue-tasks"',
+            body,
+        )
+        self.assertIn(f"http_response_size_bytes_count{{{labels}}} 2", body)
+        self.assertIn("auth_token_cache_hits_total", body)
+        self.assertIn("# TYPE db_pool_checkouts_total counter", body)
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        with self.settings(METRICS_TOKEN="s3cret"):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+            self.assertEqual(response.status_code, 403)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+
+
+class TaskExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="export@test.com", password="TestPass123!"
+        )
+        other = CustomUser.objects.create_user(
+            email="export-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Work", user=self.user)
+        for i in range(25):
+            Task.objects.create(
+                title=f"Export {i}",
+                description='Has "quotes", commas\nand newlines' if i == 0 else "",
+                status="DONE" if i % 5 == 0 else "TODO",
+                priority="HIGH" if i % 2 else "LOW",
+                category=category if i % 3 == 0 else None,
+                user=self.user,
+            )
+        Task.objects.create(title="Someone else's", user=other)
+
+    def _content(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_task_serializer(self):
+        response = self.client.get("/api/tasks/export/")
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+
+        listed = self.client.get("/api/tasks/?page_size=100").json()["results"]
+        self.assertEqual(rows, listed)
+
+    def test_filters_search_and_ordering_apply(self):
+        response = self.client.get(
+            "/api/tasks/export/?status=TODO&priority=HIGH&ordering=created_at"
+        )
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+
+        expected = Task.objects.filter(
+            user=self.user, status="TODO", priority="HIGH"
+        ).order_by("created_at")
+        self.assertEqual([row["id"] for row in rows], [t.pk for t in expected])
+
+        response = self.client.get("/api/tasks/export/?search=quotes")
+        self.assertEqual(len(self._content(response).splitlines()), 1)
+
+    def test_csv(self):
+        response = self.client.get("/api/tasks/export/?format=csv&ordering=created_at")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("tasks.csv", response["Content-Disposition"])
+
+        rows = list(csv.DictReader(StringIO(self._content(response))))
+
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]["description"], 'Has "quotes", commas\nand newlines')
+        self.assertEqual(rows[0]["user"], "export@test.com")
+        self.assertEqual(rows[1]["category"], "")
+        self.assertEqual(rows[1]["due_date"], "")
+
+    def test_accept_header_selects_format(self):
+        response = self.client.get("/api/tasks/export/", HTTP_ACCEPT="text/csv")
+        self.assertTrue(self._content(response).startswith("id,title,"))
+
+    def test_rows_are_read_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/export/")
+            self.assertEqual(queries.captured_queries, [])
+            self._content(response)
+        self.assertEqual(len(queries), 1)
+
+    def test_authentication_required(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get("/api/tasks/export/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="import@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Category.objects.create(name="Work", user=self.user)
+
+    def _ndjson(self, rows):
+        return "".join(
+            (row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows
+        ).encode()
+
+    def test_ndjson_body_with_per_row_errors(self):
+        body = self._ndjson(
+            [
+                {"title": "Imported one", "priority": "HIGH", "category": "work"},
+                {"title": "no"},
+                "not json",
+                {"title": "Imported two", "category": "Home"},
+                {"title": "Past", "due_date": "2000-01-01"},
+            ]
+        )
+        response = self.client.generic(
+            "POST", "/api/tasks/import/", body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 3)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3, 5])
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertIn("due_date", response.data["errors"][2]["errors"])
+
+        one = Task.objects.get(title="Imported one")
+        self.assertEqual(one.category, self.work)
+        self.assertEqual(one.priority_rank, 3)
+        home = Task.objects.get(title="Imported two").category
+        self.assertEqual((home.name, home.user), ("Home", self.user))
+        self.assertEqual(TaskStatistics.objects.get(user=self.user).total_tasks, 2)
+
+    def test_csv_upload(self):
+        content = (
+            "title,description,status,priority,due_date,category\n"
+            "From CSV,,TODO,LOW,,Work\n"
+            'Second,"multi, part",DONE,MEDIUM,,\n'
+        ).encode()
+        upload = SimpleUploadedFile("tasks.csv", content, content_type="text/csv")
+
+        response = self.client.post(
+            "/api/tasks/import/", {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.data["created"], 2, response.data)
+        second = Task.objects.get(title="Second")
+        self.assertEqual((second.description, second.category), ("multi, part", None))
+
+    def test_export_round_trip(self):
+        Task.objects.create(title="Round trip", priority="HIGH", user=self.user)
+        exported = b"".join(
+            self.client.get("/api/tasks/export/?format=csv").streaming_content
+        )
+        upload = SimpleUploadedFile("tasks.csv", exported, content_type="text/csv")
+
+        response = self.client.post(
+            "/api/tasks/import/", {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            Task.objects.filter(title="Round trip", priority="HIGH").count(), 2
+        )
+
+    def test_export_round_trip_keeps_categories(self):
+        Task.objects.create(title="Filed", category=self.work, user=self.user)
+        for format, content_type in [
+            ("ndjson", "application/x-ndjson"),
+            ("csv", "text/csv"),
+        ]:
+            response = self.client.get(f"/api/tasks/export/?format={format}")
+            exported = b"".join(response.streaming_content)
+            upload = SimpleUploadedFile(
+                f"tasks.{format}", exported, content_type=content_type
+            )
+
+            response = self.client.post(
+                "/api/tasks/import/", {"file": upload}, format="multipart"
+            )
+
+            self.assertEqual(response.data["failed"], 0, response.data)
+        # The task, its NDJSON copy, and CSV copies of both.
+        self.assertEqual(
+            list(Task.objects.filter(title="Filed").values_list("category", flat=True)),
+            [self.work.pk] * 4,
+        )
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 1)
+
+    def test_numeric_category_names(self):
+        year = Category.objects.create(name="2024", user=self.user)
+        rows = [
+            {"title": "By name", "category": "2024"},
+            {"title": "By id", "category": str(self.work.pk)},
+            {"title": "Neither", "category": "999999"},
+        ]
+
+        report = TaskImporter(self.user).run(
+            parse_ndjson(self._ndjson(rows).splitlines())
+        )
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["errors"][0]["row"], 3)
+        self.assertEqual(Task.objects.get(title="By name").category, year)
+        self.assertEqual(Task.objects.get(title="By id").category, self.work)
+        self.assertFalse(Category.objects.filter(name="999999").exists())
+
+    def test_category_ids_of_other_users_are_rejected(self):
+        other = CustomUser.objects.create_user(
+            email="import-other@test.com", password="TestPass123!"
+        )
+        theirs = Category.objects.create(name="Theirs", user=other)
+        rows = [{"title": "Sneaky", "category": theirs.pk}]
+
+        report = TaskImporter(self.user).run(
+            parse_ndjson(self._ndjson(rows).splitlines())
+        )
+
+        self.assertEqual(report["failed"], 1)
+        self.assertIn("category", report["errors"][0]["errors"])
+
+    def test_unknown_format_rejected(self):
+        response = self.client.generic(
+            "POST", "/api/tasks/import/", b"<xml/>", content_type="application/xml"
+        )
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        def import_rows(count):
+            rows = [
+                {"title": f"Row {i}", "category": f"Cat {i % 3}"} for i in range(count)
+            ]
+            stream = self._ndjson(rows).splitlines(keepends=True)
+            with CaptureQueriesContext(connection) as queries:
+                TaskImporter(self.user, batch_size=500).run(parse_ndjson(stream))
+            return len(queries)
+
+        import_rows(5)  # Creates the categories.
+        self.assertEqual(import_rows(10), import_rows(50))
+
+    def test_error_report_is_capped(self):
+        rows = [{"title": "x"}] * 20
+        importer = TaskImporter(self.user, batch_size=7, max_errors=5)
+
+        report = importer.run(parse_ndjson(self._ndjson(rows).splitlines()))
+
+        self.assertEqual(report["failed"], 20)
+        self.assertEqual(len(report["errors"]), 5)
+        self.assertTrue(report["errors_truncated"])
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".ndjson", delete=False) as f:
+            f.write(self._ndjson([{"title": "From the shell"}, {"title": ""}]))
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            "import_tasks", f.name, user=self.user.email, stdout=out, stderr=err
+        )
+
+        self.assertIn("Imported 1 tasks, 1 rows failed.", out.getvalue())
+        self.assertIn("Row 2:", err.getvalue())
+        self.assertTrue(Task.objects.filter(title="From the shell").exists())
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="sync@test.com", password="TestPass123!"
+        )
+        self.other = CustomUser.objects.create_user(
+            email="sync-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Work", user=self.user)
+        self.tasks = [
+            Task.objects.create(
+                title=f"Sync {i}", category=self.category, user=self.user
+            )
+            for i in range(3)
+        ]
+        Task.objects.create(title="Not mine", user=self.other)
+
+    def _sync(self, cursor=None, **params):
+        if cursor:
+            params["cursor"] = cursor
+        response = self.client.get("/api/sync/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        data = self._sync()
+
+        self.assertEqual(
+            sorted(task["id"] for task in data["tasks"]),
+            sorted(task.pk for task in self.tasks),
+        )
+        self.assertEqual([c["name"] for c in data["categories"]], ["Work"])
+        self.assertEqual(data["deleted"], {"tasks": [], "categories": []})
+        self.assertFalse(data["has_more"])
+
+    def test_only_changes_since_cursor_are_returned(self):
+        cursor = self._sync()["cursor"]
+        self.assertEqual(self._sync(cursor)["tasks"], [])
+
+        first, second, third = self.tasks
+        self.client.patch(f"/api/tasks/{first.pk}/", {"status": "DONE"})
+        self.client.delete(f"/api/tasks/{second.pk}/")
+        TaskService.bulk_update_status(self.user, [third.pk], "IN_PROGRESS")
+        Task.objects.create(title="Someone else's change", user=self.other)
+
+        data = self._sync(cursor)
+
+        self.assertEqual(
+            sorted(task["id"] for task in data["tasks"]), sorted([first.pk, third.pk])
+        )
+        self.assertEqual(data["deleted"]["tasks"], [second.pk])
+        self.assertEqual(data["categories"], [])
+        self.assertEqual(self._sync(data["cursor"])["tasks"], [])
+
+    def test_category_deletion_reports_detached_tasks(self):
+        cursor = self._sync()["cursor"]
+
+        self.client.delete(f"/api/categories/{self.category.pk}/")
+        process_deletions(pause=0)
+        data = self._sync(cursor)
+
+        self.assertEqual(data["deleted"]["categories"], [self.category.pk])
+        self.assertEqual(len(data["tasks"]), 3)
+        self.assertTrue(all(task["category"] is None for task in data["tasks"]))
+        self.assertEqual(
+            Tombstone.objects.filter(user=self.user, kind="category").count(), 1
+        )
+
+    def test_paging_with_limit(self):
+        for i in range(4):
+            Category.objects.create(name=f"Extra {i}", user=self.user)
+        seen_tasks, seen_categories, cursor, calls = [], [], None, 0
+        while True:
+            data = self._sync(cursor, limit=2)
+            calls += 1
+            seen_tasks += [task["id"] for task in data["tasks"]]
+            seen_categories += [category["id"] for category in data["categories"]]
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+        self.assertEqual(calls, 3)
+        self.assertEqual(len(set(seen_tasks)), 3)
+        self.assertEqual(len(set(seen_categories)), 5)
+
+    def test_recent_writes_wait_for_the_settle_window(self):
+        cursor = self._sync()["cursor"]
+        with self.settings(SYNC_SETTLE_SECONDS=60):
+            self.client.patch(f"/api/tasks/{self.tasks[0].pk}/", {"status": "DONE"})
+            self.assertEqual(self._sync(cursor)["tasks"], [])
+        self.assertEqual(len(self._sync(cursor)["tasks"]), 1)
+
+    def test_query_count_does_not_depend_on_account_size(self):
+        Task.objects.bulk_create(
+            [Task(title=f"Bulk {i}", user=self.user) for i in range(50)]
+        )
+        cursor = self._sync()["cursor"]
+        with self.assertNumQueries(3):
+            self._sync(cursor)
+
+    def test_invalid_and_expired_cursors(self):
+        response = self.client.get("/api/sync/", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        cursor = self._sync()["cursor"]
+        with self.settings(SYNC_TOMBSTONE_RETENTION_DAYS=0):
+            response = self.client.get("/api/sync/", {"cursor": cursor})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_prune_tombstones(self):
+        old, recent = self.tasks[0], self.tasks[1]
+        recent_id = recent.pk
+        old.delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        recent.delete()
+
+        call_command("prune_tombstones", stdout=StringIO())
+
+        self.assertEqual(
+            list(Tombstone.objects.values_list("object_id", flat=True)), [recent_id]
+        )
+
+
+class TaskReminderTests(TestCase):
+    def setUp(self):
+        self.today = date(2025, 6, 10)
+        self.alice = CustomUser.objects.create_user(
+            email="alice@test.com", password="TestPass123!"
+        )
+        self.bob = CustomUser.objects.create_user(
+            email="bob@test.com", password="TestPass123!"
+        )
+        self.inactive = CustomUser.objects.create_user(
+            email="inactive@test.com", password="TestPass123!", is_active=False
+        )
+
+        def task(user, title, days, status="TODO"):
+            return Task.objects.create(
+                title=title,
+                user=user,
+                status=status,
+                due_date=self.today + timedelta(days=days),
+            )
+
+        task(self.alice, "Late", -2)
+        task(self.alice, "Today", 0, status="IN_PROGRESS")
+        task(self.alice, "Soon", 3)
+        task(self.alice, "Later", 4)
+        task(self.alice, "Finished", -1, status="DONE")
+        Task.objects.create(title="Undated", user=self.alice)
+        task(self.bob, "Bob late", -1)
+        task(self.inactive, "Ignored", -1)
+
+    def _digests(self, **kwargs):
+        rows = scan_due_tasks(self.today, **kwargs)
+        return list(build_digests(rows, self.today))
+
+    def test_digests_group_open_tasks_by_user(self):
+        alice, bob = self._digests()
+
+        self.assertEqual(alice.email, "alice@test.com")
+        self.assertEqual([item["title"] for item in alice.overdue], ["Late"])
+        self.assertEqual([item["title"] for item in alice.due_soon], ["Today", "Soon"])
+        self.assertEqual(bob.email, "bob@test.com")
+        self.assertEqual(bob.overdue_count, 1)
+        self.assertEqual(bob.due_soon_count, 0)
+
+    def test_scan_is_batched(self):
+        expected = list(scan_due_tasks(self.today, batch_size=1000))
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(scan_due_tasks(self.today, batch_size=2))
+
+        self.assertEqual(rows, expected)
+        self.assertEqual(len(queries), 3)
+        for query in queries:
+            self.assertIn("LIMIT 2", query["sql"])
+
+    def test_digest_lists_are_capped(self):
+        for i in range(5):
+            Task.objects.create(
+                title=f"Extra {i}",
+                user=self.bob,
+                due_date=self.today - timedelta(days=1),
+            )
+        rows = scan_due_tasks(self.today)
+        bob = list(build_digests(rows, self.today, max_items=3))[1]
+
+        self.assertEqual(len(bob.overdue), 3)
+        self.assertEqual(bob.overdue_count, 6)
+        self.assertIn("... and 3 more", bob.body())
+
+    def test_command_sends_emails(self):
+        out = StringIO()
+        call_command("send_task_reminders", today=self.today, stdout=out)
+
+        self.assertIn("Sent 2 reminder digests", out.getvalue())
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ["alice@test.com", "bob@test.com"],
+        )
+        alice = next(m for m in mail.outbox if m.to == ["alice@test.com"])
+        self.assertEqual(alice.subject, "Task reminder: 1 overdue and 2 due soon")
+        self.assertIn("Late (due 2025-06-08)", alice.body)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "reminders.jsonl")
+            call_command(
+                "send_task_reminders",
+                sink="file",
+                output=path,
+                due_soon_days=4,
+                today=self.today,
+                stdout=StringIO(),
+            )
+            with open(path) as f:
+                digests = [json.loads(line) for line in f]
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            [digest["email"] for digest in digests],
+            ["alice@test.com", "bob@test.com"],
+        )
+        self.assertEqual(digests[0]["due_soon_count"], 3)
+        self.assertEqual(digests[0]["overdue"][0]["due_date"], "2025-06-08")
+
+    def test_file_sink_needs_output(self):
+        with self.assertRaises(CommandError):
+            call_command("send_task_reminders", sink="file", stdout=StringIO())
+
+
+class TaskAutocompleteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="complete@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        for title in ["Write report", "Report expenses", "Reply to Repo", "Lunch"]:
+            Task.objects.create(title=title, user=self.user)
+        Category.objects.create(name="Reports", user=self.user)
+        Category.objects.create(name="Home", user=self.user)
+        other = CustomUser.objects.create_user(
+            email="complete-other@test.com", password="TestPass123!"
+        )
+        Task.objects.create(title="Secret report", user=other)
+
+    def _complete(self, **params):
+        response = self.client.get("/api/autocomplete/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_title_filter_uses_trigram_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/tasks/", {"title": "EPOR"})
+
+        titles = [task["title"] for task in response.data["results"]]
+        self.assertCountEqual(titles, ["Write report", "Report expenses"])
+        self.assertTrue(any("_trgm" in query["sql"] for query in queries))
+
+    def test_title_filter_short_and_wildcard_values(self):
+        Task.objects.create(title="100% done", user=self.user)
+
+        response = self.client.get("/api/tasks/", {"title": "0%"})
+        self.assertEqual(
+            [task["title"] for task in response.data["results"]], ["100% done"]
+        )
+        response = self.client.get("/api/tasks/", {"title": "re"})
+        self.assertEqual(response.data["count"], 3)
+
+    def test_trigram_index_follows_updates(self):
+        task = Task.objects.get(title="Lunch")
+        task.title = "Dinner booking"
+        task.save()
+
+        response = self.client.get("/api/tasks/", {"title": "lunch"})
+        self.assertEqual(response.data["count"], 0)
+        response = self.client.get("/api/tasks/", {"title": "booking"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_prefix_matches_come_first(self):
+        data = self._complete(q="rep")
+
+        self.assertEqual(
+            [task["title"] for task in data["tasks"]],
+            ["Reply to Repo", "Report expenses", "Write report"],
+        )
+        self.assertEqual(data["categories"], [{"id": ANY, "name": "Reports"}])
+        self.assertFalse(data["timed_out"])
+        self.assertEqual(set(data["tasks"][0]), {"id", "title"})
+
+    def test_limit_and_short_queries(self):
+        self.assertEqual(len(self._complete(q="rep", limit=1)["tasks"]), 1)
+        with self.assertNumQueries(0):
+            data = self._complete(q="r")
+        self.assertEqual(data["tasks"], [])
+
+    @override_settings(AUTOCOMPLETE_TIME_BUDGET_MS=0)
+    def test_time_budget(self):
+        data = self._complete(q="rep")
+
+        self.assertTrue(data["timed_out"])
+        self.assertEqual(data["tasks"], [])
+
+    def test_query_time_limit_interrupts_slow_queries(self):
+        with self.assertRaises(QueryTimeout):
+            with query_time_limit("default", 1):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL "
+                        "SELECT i + 1 FROM n) SELECT count(*) FROM n"
+                    )
+
+        # The connection is usable afterwards and the limit is gone.
+        self.assertEqual(self._complete(q="lunch")["tasks"][0]["title"], "Lunch")
+
+
+@skipUnless("replica" in settings.DATABASES, "needs a 'replica' database alias")
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    """
+    Run with a second, separately migrated database aliased "replica", which
+    config.test_settings adds: it receives no writes, so reads routed there
+    see none of the test's data.
+    """
+
+    # Skipped classes' databases are still set up, so only ask for the
+    # replica when it exists.
+    databases = (
+        {"default", "replica"} if "replica" in settings.DATABASES else {"default"}
+    )
+
+    def setUp(self):
+        caches["default"].clear()
+        routers.health.reset()
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="replica@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        Task.objects.create(title="Existing", user=self.user)
+
+    def _count(self):
+        response = self.client.get("/api/tasks/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["count"]
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self._count(), 0)
+
+    def test_queries_outside_requests_use_primary(self):
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_writer_sticks_to_primary(self):
+        response = self.client.post("/api/tasks/", {"title": "New"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(self._count(), 2)
+        # Other users still read from the replica.
+        other = CustomUser.objects.create_user(
+            email="replica-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=other)
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            self._count()
+        self.assertTrue(queries)
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_can_be_disabled(self):
+        self.client.post("/api/tasks/", {"title": "New"}, format="json")
+
+        self.assertEqual(self._count(), 0)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        self.assertTrue(routers.health.is_healthy("replica"))
+        self.assertFalse(routers.health.is_healthy("missing"))
+
+        with override_settings(DATABASE_REPLICAS=["missing"]):
+            self.assertEqual(self._count(), 1)
+
+    def test_token_user_id(self):
+        token = AccessToken.for_user(self.user)
+        factory = RequestFactory()
+
+        request = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(routers.token_user_id(request), str(self.user.pk))
+        request = factory.get("/", HTTP_AUTHORIZATION="Bearer not-a-token")
+        self.assertIsNone(routers.token_user_id(request))
+
+
+class TaskArchiveTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="archive@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.old = timezone.now() - timedelta(days=120)
+        self.done = [
+            Task.objects.create(
+                title=f"Finished {i}",
+                description="quarterly" if i == 0 else "",
+                status="DONE",
+                priority="HIGH" if i == 0 else "LOW",
+                user=self.user,
+            )
+            for i in range(3)
+        ]
+        self.recent = Task.objects.create(
+            title="Just finished", status="DONE", user=self.user
+        )
+        self.open = Task.objects.create(title="Still open", user=self.user)
+        Task.objects.filter(pk__in=[t.pk for t in [*self.done, self.open]]).update(
+            updated_at=self.old
+        )
+
+    def test_archives_old_done_tasks_in_batches(self):
+        archived = archive_done_tasks(days=90, batch_size=2)
+
+        self.assertEqual(archived, 3)
+        self.assertCountEqual(
+            Task.objects.values_list("pk", flat=True), [self.recent.pk, self.open.pk]
+        )
+        archived = ArchivedTask.objects.get(pk=self.done[0].pk)
+        self.assertEqual(archived.title, "Finished 0")
+        self.assertEqual(archived.created_at, self.done[0].created_at)
+        self.assertEqual(archived.updated_at, self.old)
+        self.assertEqual(
+            Tombstone.objects.filter(kind="task", user=self.user).count(), 3
+        )
+
+    def test_batches_of_locked_rows_do_not_end_the_run(self):
+        archive = type(Task.objects.all()).archive
+        calls = []
+
+        def first_batch_locked(queryset, skip_locked=False):
+            calls.append(skip_locked)
+            return [] if len(calls) == 1 else archive(queryset, skip_locked)
+
+        with patch.object(type(Task.objects.all()), "archive", first_batch_locked):
+            archived = archive_done_tasks(days=90, batch_size=2)
+
+        self.assertEqual(archived, 1)
+        self.assertEqual(calls, [True, True])
+        self.assertEqual(
+            Task.objects.filter(pk__in=[t.pk for t in self.done]).count(), 2
+        )
+
+    def test_statistics_count_archived_tasks(self):
+        before = self.client.get("/api/tasks/statistics/").data
+
+        call_command("archive_tasks", stdout=StringIO())
+
+        self.assertEqual(self.client.get("/api/tasks/statistics/").data, before)
+        self.assertEqual(before["done_count"], 4)
+        call_command("rebuild_task_statistics", "--check", stdout=StringIO())
+
+    def test_list_and_search_archive(self):
+        archive_done_tasks(days=90)
+
+        response = self.client.get("/api/tasks/archive/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(response.data["results"][0]["user"], "archive@test.com")
+        self.assertIn("archived_at", response.data["results"][0])
+        self.assertEqual(self.client.get("/api/tasks/").data["count"], 2)
+
+        response = self.client.get("/api/tasks/archive/", {"search": "quarterly"})
+        self.assertEqual(
+            [task["id"] for task in response.data["results"]], [self.done[0].pk]
+        )
+
+    def test_restore(self):
+        archive_done_tasks(days=90)
+        task = self.done[0]
+        stats = self.client.get("/api/tasks/statistics/").data
+
+        response = self.client.post(f"/api/tasks/archive/{task.pk}/restore/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], task.pk)
+        self.assertEqual(response.data["user"], "archive@test.com")
+        restored = Task.objects.get(pk=task.pk)
+        self.assertEqual(restored.created_at, task.created_at)
+        self.assertEqual(restored.priority_rank, 3)
+        self.assertGreater(restored.updated_at, self.old)
+        self.assertFalse(ArchivedTask.objects.filter(pk=task.pk).exists())
+        self.assertFalse(Tombstone.objects.filter(object_id=task.pk).exists())
+        self.assertEqual(self.client.get("/api/tasks/statistics/").data, stats)
+
+        response = self.client.post(f"/api/tasks/archive/{task.pk}/restore/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cannot_restore_other_users_tasks(self):
+        archive_done_tasks(days=90)
+        other = CustomUser.objects.create_user(
+            email="archive-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=other)
+
+        response = self.client.post(f"/api/tasks/archive/{self.done[0].pk}/restore/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get("/api/tasks/archive/").data["count"], 0)
+
+
+class CategoryTaskCountsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="counts@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Category.objects.create(name="Work", user=self.user)
+        self.home = Category.objects.create(name="Home", user=self.user)
+        Category.objects.create(name="Empty", user=self.user)
+        yesterday = date.today() - timedelta(days=1)
+        for status_, priority, category, due in [
+            ("TODO", "HIGH", self.work, yesterday),
+            ("IN_PROGRESS", "LOW", self.work, None),
+            ("DONE", "HIGH", self.work, yesterday),
+            ("TODO", "MEDIUM", self.home, None),
+            ("TODO", "LOW", None, yesterday),
+        ]:
+            Task.objects.create(
+                title="Counted",
+                status=status_,
+                priority=priority,
+                category=category,
+                due_date=due,
+                user=self.user,
+            )
+        other = CustomUser.objects.create_user(
+            email="counts-other@test.com", password="TestPass123!"
+        )
+        Task.objects.create(title="Not mine", user=other)
+
+    def _categories(self):
+        response = self.client.get("/api/categories/", {"counts": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_per_category(self):
+        data = self._categories()
+        counts = {c["name"]: c["task_counts"] for c in data["results"]}
+
+        self.assertEqual(
+            counts["Work"],
+            {
+                "total": 3,
+                "by_status": {"TODO": 1, "IN_PROGRESS": 1, "DONE": 1},
+                "by_priority": {"LOW": 1, "MEDIUM": 0, "HIGH": 2},
+                "overdue": 1,
+            },
+        )
+        self.assertEqual(counts["Home"]["by_status"]["TODO"], 1)
+        self.assertEqual(counts["Empty"]["total"], 0)
+        self.assertEqual(data["uncategorized"]["total"], 1)
+        self.assertEqual(data["uncategorized"]["overdue"], 1)
+
+    def test_counts_are_optional(self):
+        data = self.client.get("/api/categories/").data
+
+        self.assertNotIn("uncategorized", data)
+        self.assertNotIn("task_counts", data["results"][0])
+
+    def test_query_count_does_not_depend_on_categories(self):
+        with CaptureQueriesContext(connection) as few:
+            self._categories()
+        for i in range(20):
+            category = Category.objects.create(name=f"Extra {i}", user=self.user)
+            Task.objects.create(title="Counted", category=category, user=self.user)
+        with CaptureQueriesContext(connection) as many:
+            self._categories()
+
+        self.assertEqual(len(many), len(few))
+
+
+class DeletionPipelineTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="deletion@test.com", password="TestPass123!"
+        )
+        self.other = CustomUser.objects.create_user(
+            email="bystander@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name="Work", user=self.user)
+        self.tasks = Task.objects.bulk_create(
+            [
+                Task(title=f"Task {i}", category=self.category, user=self.user)
+                for i in range(5)
+            ]
+        )
+        archived = Task.objects.create(
+            title="Old", status="DONE", category=self.category, user=self.user
+        )
+        Task.objects.filter(pk=archived.pk).archive()
+        self.others_task = Task.objects.create(title="Unrelated", user=self.other)
+
+    def _delete_category(self):
+        response = self.client.delete(f"/api/categories/{self.category.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        job = DeletionJob.objects.get(kind="category", object_id=self.category.pk)
+        response = self.client.get("/api/deletions/")
+        self.assertEqual(response.data["results"][0]["id"], job.pk)
+        return job
+
+    def test_category_is_hidden_at_once_and_detached_later(self):
+        job = self._delete_category()
+
+        self.assertEqual(job.kind, "category")
+        self.assertEqual(job.status, "PENDING")
+        self.assertEqual(job.total, 6)
+        self.assertEqual(self.client.get("/api/categories/").data["count"], 0)
+        response = self.client.get(f"/api/categories/{self.category.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(
+            "/api/tasks/", {"title": "New", "category": self.category.pk}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # The name is free again straight away.
+        response = self.client.post("/api/categories/", {"name": "Work"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.filter(category=self.category).count(), 5)
+
+        sleeps = []
+        process_deletions(size=2, pause=0.5, sleep=sleeps.append)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.processed, 6)
+        self.assertEqual(sleeps, [0.5] * 4)
+        self.assertFalse(Category.objects.filter(pk=self.category.pk).exists())
+        self.assertFalse(Task.objects.filter(category__isnull=False).exists())
+        self.assertFalse(ArchivedTask.objects.filter(category__isnull=False).exists())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 5)
+
+    def test_user_deletion_needs_the_password(self):
+        for data in [{}, {"password": "wrong"}]:
+            response = self.client.delete("/api/account/", data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("password", response.data["details"])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        self.assertFalse(DeletionJob.objects.exists())
+
+    def test_user_deletion_locks_out_and_deletes_everything(self):
+        response = self.client.delete(
+            "/api/account/", {"password": "TestPass123!"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(self.user.has_usable_password())
+        response = self.client.post(
+            "/api/login/", {"email": "deletion@test.com", "password": "TestPass123!"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(
+            "/api/register/",
+            {
+                "email": "deletion@test.com",
+                "password": "TestPass123!",
+                "password2": "TestPass123!",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        jobs = process_deletions(size=2, pause=0)
+
+        self.assertEqual([job.status for job in jobs], ["DONE"])
+        self.assertFalse(CustomUser.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Task.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(ArchivedTask.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(Category.objects.filter(user_id=self.user.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=self.others_task.pk).exists())
+
+    def test_interrupted_job_resumes_after_its_lease_expires(self):
+        job = self._delete_category()
+        claimed = claim_job()
+        claimed.stage = "tasks"
+        self.assertTrue(run_batch(claimed, Task, "category_id", "detach", 3))
+        # The worker dies here; nobody else takes the job while it is leased.
+        self.assertIsNone(claim_job())
+
+        resumed = claim_job(now=claimed.lease_expires_at + timedelta(seconds=1))
+        self.assertEqual(resumed.pk, job.pk)
+        self.assertEqual((resumed.stage, resumed.processed), ("tasks", 3))
+        self.assertEqual(resumed.last_id, self.tasks[2].pk)
+        run_job(resumed, size=3, pause=0)
+
+        resumed.refresh_from_db()
+        self.assertEqual(resumed.status, "DONE")
+        self.assertEqual(resumed.processed, 6)
+        self.assertEqual(resumed.attempts, 2)
+        self.assertFalse(Category.objects.filter(pk=self.category.pk).exists())
+
+    def test_progress_is_reported(self):
+        job = self._delete_category()
+
+        response = self.client.get(f"/api/deletions/{job.pk}/")
+        self.assertEqual(response.data["status"], "PENDING")
+        self.assertEqual((response.data["processed"], response.data["total"]), (0, 6))
+
+        out = StringIO()
+        call_command("process_deletions", "--pause=0", stdout=out)
+        self.assertIn("category", out.getvalue())
+        response = self.client.get("/api/deletions/")
+        self.assertEqual(response.data["results"][0]["status"], "DONE")
+        self.assertEqual(response.data["results"][0]["processed"], 6)
+
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(f"/api/deletions/{job.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CategoryUpsertTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="upsert@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.work = Category.objects.create(name="Work", color="#111", user=self.user)
+        self.home = Category.objects.create(name="Home", user=self.user)
+
+    def _upsert(self, items):
+        return self.client.post(
+            "/api/categories/bulk/", {"categories": items}, format="json"
+        )
+
+    def test_names_are_unique_ignoring_case(self):
+        response = self.client.post("/api/categories/", {"name": "WORK"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["details"]["name"],
+            ["You already have a category with this name."],
+        )
+        response = self.client.patch(
+            f"/api/categories/{self.home.pk}/", {"name": "work"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(
+            f"/api/categories/{self.work.pk}/", {"name": "WORK"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        other = CustomUser.objects.create_user(
+            email="other@test.com", password="TestPass123!"
+        )
+        Category.objects.create(name="work", user=other)
+
+    def test_upsert_creates_updates_and_renames(self):
+        response = self._upsert(
+            [
+                {"name": "work", "color": "#222"},
+                {"name": "Errands"},
+                {"id": self.home.pk, "name": "House", "color": "#333"},
+            ]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        created = Category.objects.get(user=self.user, name="Errands")
+        self.assertEqual(
+            response.data["categories"],
+            [
+                {"id": self.work.pk, "name": "work", "color": "#222"},
+                {"id": created.pk, "name": "Errands", "color": ""},
+                {"id": self.home.pk, "name": "House", "color": "#333"},
+            ],
+        )
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 3)
+        self.home.refresh_from_db()
+        self.assertEqual((self.home.name, self.home.color), ("House", "#333"))
+
+    def test_upsert_compares_names_like_the_database(self):
+        # LOWER() keeps "ß", so these names don't clash in the unique index.
+        response = self._upsert([{"name": "Straße"}, {"name": "STRASSE"}])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 4)
+
+    def test_upsert_writes_nothing_on_error(self):
+        response = self._upsert([{"name": "Errands"}, {"name": "ERRANDS"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._upsert([{"name": "Errands"}, {"id": 999999, "name": "X"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._upsert(
+            [{"name": "Errands"}, {"id": self.home.pk, "name": "WORK"}]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["details"]["name"],
+            ["You already have a category with this name."],
+        )
+        self.assertFalse(Category.objects.filter(name="Errands").exists())
+        self.home.refresh_from_db()
+        self.assertEqual(self.home.name, "Home")
+
+
+class TaskRowPlanTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="rows@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name="Café", user=self.user)
+        Task.objects.create(
+            title="Überfällig ✓",
+            description='Quotes " and \\ backslashes',
+            priority="HIGH",
+            due_date=date.today() - timedelta(days=3),
+            category=category,
+            user=self.user,
+        )
+        Task.objects.create(title="No due date", status="DONE", user=self.user)
+        Task.objects.create(
+            title="Report", priority="LOW", due_date=date.today(), user=self.user
+        )
+
+    def _serialized(self, queryset):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        data = TaskSerializer(
+            queryset.with_owner(), many=True, context={"request": request}
+        ).data
+        return JSONRenderer().render(data)
+
+    def test_rows_render_like_task_serializer(self):
+        queryset = Task.objects.filter(user=self.user).order_by("id")
+        rows = TASK_ROWS.render(TASK_ROWS.values(queryset))
+
+        self.assertEqual(JSONRenderer().render(rows), self._serialized(queryset))
+
+    def test_list_responses_are_unchanged(self):
+        expected = self._serialized(Task.objects.order_by("-created_at"))
+        response = self.client.get("/api/tasks/?page_size=100")
+        self.assertIn(expected[1:-1], response.content)
+
+        expected = self._serialized(
+            Task.objects.filter(due_date__lt=date.today(), status__in=OPEN_STATUSES)
+        )
+        response = self.client.get("/api/tasks/overdue/")
+        self.assertIn(expected[1:-1], response.content)
+
+        response = self.client.get("/api/tasks/?search=report&rank=true")
+        self.assertEqual(
+            [task["title"] for task in response.data["results"]], ["Report"]
+        )
+
+        response = self.client.get(
+            "/api/tasks/?pagination=cursor&ordering=-priority&page_size=2"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [task["title"] for task in response.data["results"]], ["Report"]
+        )
+
+    def test_rejects_fields_it_cannot_render(self):
+        class Unsupported(TaskSerializer):
+            extra = serializers.SerializerMethodField()
+
+            class Meta(TaskSerializer.Meta):
+                fields = [*TaskSerializer.Meta.fields, "extra"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            RowPlan(Unsupported, sources={"user": "user__email"}).steps
+
+
+class TaskFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="fields@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(
+            name="Work", color="#112233", user=self.user
+        )
+        self.task = Task.objects.create(
+            title="Filed", category=self.category, user=self.user
+        )
+        Task.objects.create(title="Loose", user=self.user)
+
+    def test_fields_limit_rendered_fields_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/tasks/?fields=title,id&ordering=created_at"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [{"id": self.task.pk, "title": "Filed"}, {"id": ANY, "title": "Loose"}],
+        )
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertNotIn("description", sql)
+        self.assertNotIn("users_customuser", sql)
+
+        response = self.client.get(f"/api/tasks/{self.task.pk}/?fields=id,title")
+        self.assertEqual(response.data, {"id": self.task.pk, "title": "Filed"})
+
+    def test_cursor_pages_without_sort_key_fields(self):
+        response = self.client.get(
+            "/api/tasks/?pagination=cursor&page_size=1&fields=title"
+        )
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.data["results"], [{"title": "Filed"}])
+
+    def test_expand_category(self):
+        expanded = {"id": self.category.pk, "name": "Work", "color": "#112233"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/tasks/?fields=title,category&expand=category&ordering=created_at"
+            )
+
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"title": "Filed", "category": expanded},
+                {"title": "Loose", "category": None},
+            ],
+        )
+        self.assertEqual(queries.captured_queries[-1]["sql"].count("JOIN"), 1)
+
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(f"/api/tasks/{self.task.pk}/")
+        with self.assertNumQueries(len(plain)):
+            response = self.client.get(f"/api/tasks/{self.task.pk}/?expand=category")
+        self.assertEqual(response.data["category"], expanded)
+        self.assertEqual(response.data["title"], "Filed")
+
+        response = self.client.patch(
+            f"/api/tasks/{self.task.pk}/?expand=category",
+            {"title": "Refiled"},
+            format="json",
+        )
+        self.assertEqual(response.data["category"], self.category.pk)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/tasks/?fields=title,secret")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", response.data["details"]["fields"][0])
+
+        response = self.client.get(f"/api/tasks/{self.task.pk}/?expand=user")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_fields(self):
+        response = self.client.get(
+            "/api/tasks/export/?format=csv&fields=title,status&ordering=created_at"
+        )
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+
+        self.assertEqual(
+            rows, [["title", "status"], ["Filed", "TODO"], ["Loose", "TODO"]]
+        )
+
+
+class TaskMultiGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="many@test.com", password="TestPass123!"
+        )
+        other = CustomUser.objects.create_user(
+            email="many-other@test.com", password="TestPass123!"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.tasks = [
+            Task.objects.create(title=f"Task {n}", user=self.user) for n in range(3)
+        ]
+        self.foreign = Task.objects.create(title="Theirs", user=other)
+
+    def test_returns_tasks_in_requested_order(self):
+        first, second, third = self.tasks
+        ids = f"{third.pk},{self.foreign.pk},{first.pk},999999,{third.pk}"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/tasks/many/?ids={ids}")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [task["title"] for task in response.data["results"]],
+            ["Task 2", "Task 0"],
+        )
+        self.assertEqual(response.data["not_found"], [self.foreign.pk, 999999])
+        task_queries = [
+            query for query in queries if 'FROM "tasks_task"' in query["sql"]
+        ]
+        self.assertEqual(len(task_queries), 1)
+
+        listed = self.client.get("/api/tasks/").data["results"]
+        self.assertEqual(response.data["results"][1], listed[-1])
+
+    def test_fields(self):
+        response = self.client.get(
+            f"/api/tasks/many/?ids={self.tasks[0].pk}&fields=title"
+        )
+        self.assertEqual(response.data["results"], [{"title": "Task 0"}])
+
+    def test_ids_are_validated(self):
+        for query in ["", "?ids=1,x", "?ids=" + ",".join(map(str, range(1, 102)))]:
+            response = self.client.get(f"/api/tasks/many/{query}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("ids", response.data["details"])
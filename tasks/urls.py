@@ -1,14 +1,37 @@
 from django.urls import path
 
-from .views import (CategoryDetailView, CategoryListCreateView,
-                    OverdueTasksView, TaskDetailView, TaskListCreateView,
-                    TaskStatisticsView)
+from .views import (ArchivedTaskListView, ArchivedTaskRestoreView,
+                    AutocompleteView, CategoryDetailView,
+                    CategoryListCreateView, CategoryUpsertView,
+                    DeletionJobDetailView, DeletionJobListView,
+                    OverdueTasksView, SyncView, TaskBatchView, TaskDetailView,
+                    TaskExportView, TaskImportView, TaskListCreateView,
+                    TaskMultiGetView, TaskStatisticsView)
 
 urlpatterns = [
     path("tasks/", TaskListCreateView.as_view(), name="task-list-create"),
     path("tasks/<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
+    path("tasks/many/", TaskMultiGetView.as_view(), name="task-multi-get"),
+    path("tasks/export/", TaskExportView.as_view(), name="task-export"),
+    path("tasks/import/", TaskImportView.as_view(), name="task-import"),
+    path("tasks/batch/", TaskBatchView.as_view(), name="task-batch"),
     path("tasks/statistics/", TaskStatisticsView.as_view(), name="task-statistics"),
     path("tasks/overdue/", OverdueTasksView.as_view(), name="overdue-tasks"),
+    path("tasks/archive/", ArchivedTaskListView.as_view(), name="archived-task-list"),
+    path(
+        "tasks/archive/<int:pk>/restore/",
+        ArchivedTaskRestoreView.as_view(),
+        name="archived-task-restore",
+    ),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("autocomplete/", AutocompleteView.as_view(), name="autocomplete"),
     path("categories/", CategoryListCreateView.as_view(), name="category-list-create"),
     path("categories/<int:pk>/", CategoryDetailView.as_view(), name="category-detail"),
+    path("categories/bulk/", CategoryUpsertView.as_view(), name="category-upsert"),
+    path("deletions/", DeletionJobListView.as_view(), name="deletion-job-list"),
+    path(
+        "deletions/<int:pk>/",
+        DeletionJobDetailView.as_view(),
+        name="deletion-job-detail",
+    ),
 ]
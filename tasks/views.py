@@ -1,101 +1,367 @@
-from django.db.models import Case, IntegerField, When
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status
+from rest_framework.exceptions import (
+    APIException,
+    NotFound,
+    UnsupportedMediaType,
+    ValidationError,
+)
 from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .filters import TaskFilter
-from .models import Category, Task
-from .pagination import TaskPagination
-from .serializers import CategorySerializer, TaskSerializer
+from .autocomplete import suggest
+from .conditional import conditional_on_user_data
+from .deletion import schedule_category_deletion
+from .filters import TaskFilter, TaskOrderingFilter, TaskSearchFilter
+from .importers import PARSERS, TaskImporter, detect_format
+from .models import ArchivedTask, Category, DeletionJob, Task
+from .pagination import TaskCursorPagination, TaskPagination
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import (
+    DUPLICATE_NAME_MESSAGE,
+    TASK_ROWS,
+    ArchivedTaskSerializer,
+    CategorySerializer,
+    CategoryUpsertSerializer,
+    DeletionJobSerializer,
+    TaskBatchSerializer,
+    TaskSerializer,
+)
 from .services import TaskService
+from .sync import ExpiredCursor, InvalidCursor, SyncStreams
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
-    serializer_class = TaskSerializer
-    permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+class TaskQueryMixin:
+    """The user's tasks with the task list's filtering, search and ordering."""
+
+    filter_backends = [DjangoFilterBackend, TaskOrderingFilter, TaskSearchFilter]
     filterset_class = TaskFilter
     ordering_fields = ["priority", "due_date", "created_at"]
     search_fields = ["title", "description"]
-    pagination_class = TaskPagination
     ordering = ["-created_at"]
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        return Task.objects.filter(user=self.request.user).with_owner()
+
+
+class TaskFieldsMixin:
+    """
+    ``?fields=id,title,...`` limits task responses, and the columns loaded
+    for them, to the given fields. ``?expand=category`` renders the category
+    as an object with its id, name and color, loaded with a join, instead of
+    its id.
+    """
+
+    row_plan = TASK_ROWS
+    fields_query_param = "fields"
+    # None for views that can't render expanded relations.
+    expand_query_param = "expand"
+
+    def _list_param(self, name, allowed):
+        if name is None or not self.request.query_params.get(name):
+            return None
+        values = [
+            value.strip()
+            for value in self.request.query_params[name].split(",")
+            if value.strip()
+        ]
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            raise ValidationError(
+                {
+                    name: [
+                        f"Unknown {name}: {', '.join(unknown)}. "
+                        f"Choose from: {', '.join(allowed)}."
+                    ]
+                }
+            )
+        return list(dict.fromkeys(values))
+
+    def get_fieldset(self):
+        """``(fields, expand)`` of the request; fields is None for all."""
+        if not hasattr(self, "_fieldset"):
+            fields = self._list_param(self.fields_query_param, TASK_ROWS.field_names)
+            expand = self._list_param(
+                self.expand_query_param, list(TASK_ROWS.expansions)
+            )
+            self._fieldset = (fields, expand or [])
+        return self._fieldset
+
+    def get_row_plan(self):
+        return self.row_plan.subset(*self.get_fieldset())
+
+
+class TaskRowsMixin(TaskFieldsMixin):
+    """
+    List responses rendered from ``values()`` rows by ``row_plan`` rather
+    than by TaskSerializer, which spends most of a page's CPU time in field
+    machinery. The output is the same, byte for byte.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if self.row_plan is None:
+            return super().list(request, *args, **kwargs)
+        plan = self.get_row_plan()
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(queryset))
+
 
-    def filter_queryset(self, queryset):
+@conditional_on_user_data()
+class TaskListCreateView(TaskRowsMixin, TaskQueryMixin, generics.ListCreateAPIView):
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TaskPagination
+
+    @property
+    def paginator(self):
         """
-        Apply filtering and custom priority ordering.
+        Page-number pagination by default; keyset pagination when the client
+        sends ``?pagination=cursor`` or follows a ``cursor`` link.
         """
-        # Check if priority ordering is requested
-        ordering_param = self.request.query_params.get("ordering", "")
-        priority_in_ordering = "priority" in ordering_param
-
-        if priority_in_ordering:
-            # Remove priority from ordering_fields temporarily to prevent OrderingFilter from handling it
-            original_ordering_fields = self.ordering_fields
-            self.ordering_fields = [f for f in self.ordering_fields if f != "priority"]
-
-            # Apply filters (excluding OrderingFilter's priority handling)
-            queryset = super().filter_queryset(queryset)
-
-            # Restore ordering_fields
-            self.ordering_fields = original_ordering_fields
-
-            # Handle custom priority ordering
-            ordering_fields = [field.strip() for field in ordering_param.split(",")]
-
-            # Map priority values to integers for proper ordering
-            # HIGH=3, MEDIUM=2, LOW=1
-            priority_order = Case(
-                When(priority="HIGH", then=3),
-                When(priority="MEDIUM", then=2),
-                When(priority="LOW", then=1),
-                default=0,
-                output_field=IntegerField(),
-            )
-            queryset = queryset.annotate(priority_order=priority_order)
-
-            # Build ordering list
-            ordering_list = []
-            for field in ordering_fields:
-                if field == "-priority":
-                    ordering_list.append("-priority_order")
-                elif field == "priority":
-                    ordering_list.append("priority_order")
-                else:
-                    ordering_list.append(field)
-
-            # Apply default ordering if no other ordering specified
-            if not ordering_list:
-                ordering_list = self.ordering
-
-            queryset = queryset.order_by(*ordering_list)
-        else:
-            # Use standard filtering
-            queryset = super().filter_queryset(queryset)
-
-        return queryset
+        if not hasattr(self, "_paginator"):
+            if TaskCursorPagination.is_requested(self.request):
+                self._paginator = TaskCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+@conditional_on_user_data()
+class TaskDetailView(TaskFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        queryset = Task.objects.filter(user=self.request.user)
+        if self.request.method in ("GET", "HEAD"):
+            return queryset.for_fields(*self.get_fieldset())
+        return queryset.with_owner()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Writes validate and return the whole task.
+        if self.request.method in ("GET", "HEAD"):
+            context["fields"], context["expand"] = self.get_fieldset()
+        return context
 
     # Note: handle_exception won't catch DoesNotExist because DRF's
     # get_object() raises Http404, not DoesNotExist. The queryset filtering
     # by user already ensures users can only access their own tasks.
 
 
+@conditional_on_user_data()
+class TaskMultiGetView(TaskFieldsMixin, generics.GenericAPIView):
+    """
+    The user's tasks with the ids in ``?ids=3,1,2``, in that order, from
+    one query. Ids that don't exist or belong to someone else are listed in
+    ``not_found``. Takes ``?fields=`` and ``?expand=`` like the task list.
+    """
+
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    max_ids = 100
+
+    def get_ids(self):
+        ids = []
+        for value in self.request.query_params.get("ids", "").split(","):
+            value = value.strip()
+            if not value:
+                continue
+            try:
+                ids.append(int(value))
+            except ValueError:
+                raise ValidationError({"ids": [f"Invalid id: {value!r}."]})
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError({"ids": ["Give at least one id."]})
+        if len(ids) > self.max_ids:
+            raise ValidationError(
+                {"ids": [f"Give at most {self.max_ids} ids per request."]}
+            )
+        return ids
+
+    def get(self, request):
+        ids = self.get_ids()
+        plan = self.get_row_plan()
+        rows = plan.values(Task.objects.filter(user=request.user, pk__in=ids))
+        rows = {row["id"]: row for row in rows}
+        return Response(
+            {
+                "results": plan.render(rows[pk] for pk in ids if pk in rows),
+                "not_found": [pk for pk in ids if pk not in rows],
+            }
+        )
+
+
+class TaskExportView(TaskFieldsMixin, TaskQueryMixin, generics.GenericAPIView):
+    """
+    Stream every task matching the list filters as NDJSON (default) or CSV,
+    chosen with ``?format=ndjson|csv`` or the Accept header. ``?fields=``
+    selects the columns; CSV cells can't hold expanded objects.
+
+    Rows are read with a server-side cursor in chunks and written as they
+    arrive, so memory stays flat and the first bytes go out before the
+    query has finished.
+    """
+
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    pagination_class = None
+    expand_query_param = None
+    chunk_size = 2000
+
+    def get(self, request):
+        plan = self.get_row_plan()
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        rows = plan.iter_render(queryset.iterator(chunk_size=self.chunk_size))
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{renderer.format}"'
+        )
+        return response
+
+
+class TaskImportView(APIView):
+    """
+    Import tasks from NDJSON or CSV, sent either as a multipart ``file``
+    field or as the raw request body with a ``text/csv`` or
+    ``application/x-ndjson`` Content-Type.
+
+    The input is parsed incrementally and imported in batches (see
+    ``tasks.importers``). Valid rows are created even when others fail; the
+    response counts both and lists the errors by row number.
+    """
+
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        if request.content_type.startswith("multipart/"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                raise ValidationError({"file": ["No file was submitted."]})
+            stream = upload
+            file_format = detect_format(upload.content_type or "", upload.name)
+        else:
+            stream = request.stream or ()
+            file_format = detect_format(request.content_type)
+        if file_format is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        report = TaskImporter(request.user).run(PARSERS[file_format](stream))
+        return Response(report)
+
+
+class TaskBatchView(APIView):
+    """
+    Apply many create/update/delete operations in one request.
+
+    Every operation is validated with TaskSerializer rules first. If any of
+    them fails, nothing is written and the per-operation errors are returned
+    with a 400; otherwise all writes happen in a single transaction.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        batch = TaskBatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        operations = batch.validated_data["operations"]
+
+        # One query for the targeted tasks and one for referenced categories.
+        task_ids = [operation["id"] for operation in operations if "id" in operation]
+        tasks = (
+            Task.objects.filter(user=request.user, id__in=task_ids)
+            .with_owner()
+            .in_bulk()
+        )
+        categories = (
+            Category.objects.visible()
+            .filter(user=request.user, pk__in=self._category_ids(operations))
+            .in_bulk()
+        )
+        context = {"request": request, "view": self, "categories": categories}
+
+        results = []
+        creates, updates, deletes = [], [], []
+        # Index in ``results`` of each create, in the order of ``creates``.
+        create_indexes = []
+        for index, operation in enumerate(operations):
+            op, task_id = operation["op"], operation.get("id")
+            result = {"op": op} if task_id is None else {"op": op, "id": task_id}
+            results.append(result)
+
+            if op != "create" and task_id not in tasks:
+                result.update(status=404, errors={"id": ["Not found."]})
+                continue
+            if op == "delete":
+                result["status"] = 204
+                deletes.append(task_id)
+                continue
+
+            serializer = TaskSerializer(
+                tasks.get(task_id),
+                data=operation["data"],
+                partial=op == "update",
+                context=context,
+            )
+            if not serializer.is_valid():
+                result.update(status=400, errors=serializer.errors)
+            elif op == "create":
+                result["status"] = 201
+                creates.append(serializer.validated_data)
+                create_indexes.append(index)
+            else:
+                result["status"] = 200
+                updates.append((serializer.instance, serializer.validated_data))
+
+        if any("errors" in result for result in results):
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        created, updated = TaskService.apply_batch(
+            request.user, creates, updates, deletes
+        )
+        # Creates come back in order and updates by task; results are in
+        # operation order, which interleaves them.
+        written = dict(zip(create_indexes, created))
+        updated = {task.pk: task for task in updated}
+        for index, result in enumerate(results):
+            if result["op"] == "delete":
+                continue
+            task = written[index] if result["op"] == "create" else updated[result["id"]]
+            result["id"] = task.pk
+            result["data"] = TaskSerializer(task, context=context).data
+        return Response({"results": results})
+
+    @staticmethod
+    def _category_ids(operations):
+        ids = set()
+        for operation in operations:
+            value = operation.get("data", {}).get("category")
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        return ids
+
+
+@conditional_on_user_data(date_dependent=True)
 class TaskStatisticsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -104,28 +370,252 @@ class TaskStatisticsView(APIView):
         return Response(stats)
 
 
-class OverdueTasksView(generics.ListAPIView):
+@conditional_on_user_data(date_dependent=True)
+class OverdueTasksView(TaskRowsMixin, generics.ListAPIView):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return TaskService.get_overdue_tasks(self.request.user)
+        return TaskService.get_overdue_tasks(self.request.user).with_owner()
 
 
+@conditional_on_user_data()
+class ArchivedTaskListView(generics.ListAPIView):
+    """
+    The user's archived tasks, most recently archived first. ``?search=``
+    matches titles and descriptions with a substring scan of the user's
+    archive, which isn't in the full-text index.
+    """
+
+    serializer_class = ArchivedTaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TaskPagination
+    filter_backends = [SearchFilter, OrderingFilter]
+    search_fields = ["title", "description"]
+    ordering_fields = ["archived_at", "created_at", "due_date"]
+    ordering = ["-archived_at", "-id"]
+
+    def get_queryset(self):
+        return ArchivedTask.objects.filter(user=self.request.user).select_related(
+            "user"
+        )
+
+
+class ArchivedTaskRestoreView(APIView):
+    """Move an archived task back to the task list."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        restored = ArchivedTask.objects.filter(user=request.user, pk=pk).restore()
+        if not restored:
+            raise NotFound()
+        task = restored[0]
+        task.user = request.user
+        context = {"request": request, "view": self}
+        return Response(TaskSerializer(task, context=context).data)
+
+
+# Date dependent because of the overdue counts in ``?counts=true``.
+@conditional_on_user_data(date_dependent=True)
 class CategoryListCreateView(generics.ListCreateAPIView):
+    """
+    The user's categories. With ``?counts=true`` each category carries its
+    ``task_counts`` (total, by status, by priority and overdue) and the
+    response adds the counts of ``uncategorized`` tasks, all loaded with one
+    grouped query.
+    """
+
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    counts_query_param = "counts"
+    task_counts = None
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user)
+        return Category.objects.visible().filter(user=self.request.user)
+
+    def counts_requested(self, request):
+        value = request.query_params.get(self.counts_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.task_counts is not None:
+            context["task_counts"] = self.task_counts
+        return context
+
+    def list(self, request, *args, **kwargs):
+        if self.counts_requested(request):
+            self.task_counts = TaskService.get_category_task_counts(request.user)
+        return self.add_uncategorized(super().list(request, *args, **kwargs))
+
+    def add_uncategorized(self, response):
+        if self.task_counts is not None and isinstance(response.data, dict):
+            response.data["uncategorized"] = self.task_counts.get(
+                None, TaskService.empty_category_task_counts()
+            )
+        return response
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
+@conditional_on_user_data()
 class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    A category. DELETE hides it at once and answers 204 as before; a
+    DeletionJob, listed under ``deletions/``, detaches its tasks in the
+    background (see ``tasks.deletion``).
+    """
+
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user)
+        return Category.objects.visible().filter(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        schedule_category_deletion(instance)
+
+
+class CategoryUpsertView(APIView):
+    """
+    Create or update many categories in one request. Items with an ``id``
+    rename (and recolor) that category, with one UPDATE; the others create a
+    category, or update the one with the same name ignoring case, with one
+    INSERT ... ON CONFLICT. Either everything is written or nothing is.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CategoryUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["categories"]
+        renames = {item["id"]: item for item in items if "id" in item}
+        upserts = [item for item in items if "id" not in item]
+
+        try:
+            with transaction.atomic():
+                categories = (
+                    Category.objects.visible()
+                    .filter(user=request.user, pk__in=list(renames))
+                    .in_bulk()
+                )
+                missing = sorted(set(renames) - set(categories))
+                if missing:
+                    raise ValidationError(
+                        {"categories": [f"Category {pk} not found." for pk in missing]}
+                    )
+                for pk, item in renames.items():
+                    categories[pk].name = item["name"]
+                    categories[pk].color = item.get("color", categories[pk].color)
+                Category.objects.bulk_update(categories.values(), ["name", "color"])
+                upserted = Category.objects.upsert(request.user, upserts)
+        except IntegrityError as exc:
+            if not Category.is_duplicate_name(exc):
+                raise
+            raise ValidationError({"name": [DUPLICATE_NAME_MESSAGE]})
+
+        results = iter(upserted)
+        ordered = [
+            categories[item["id"]] if "id" in item else next(results) for item in items
+        ]
+        return Response({"categories": CategorySerializer(ordered, many=True).data})
+
+
+class DeletionJobListView(generics.ListAPIView):
+    """The user's deletion jobs and their progress, newest first."""
+
+    serializer_class = DeletionJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return DeletionJob.objects.filter(owner_id=self.request.user.pk)
+
+
+class DeletionJobDetailView(generics.RetrieveAPIView):
+    serializer_class = DeletionJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return DeletionJob.objects.filter(owner_id=self.request.user.pk)
+
+
+class SyncCursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Sync cursor has expired; sync again without a cursor."
+    default_code = "cursor_expired"
+
+
+class SyncView(APIView):
+    """
+    Tasks and categories changed since ``?cursor=``, and the ids of those
+    deleted, with the cursor to send next time. Without a cursor everything
+    is returned. While ``has_more`` is true, call again with the new cursor.
+    """
+
+    permission_classes = [IsAuthenticated]
+    limit_query_param = "limit"
+    default_limit = 500
+    max_limit = 1000
+    deleted_keys = {"task": "tasks", "category": "categories"}
+
+    def get(self, request):
+        try:
+            rows, cursor, has_more = SyncStreams(
+                request.user, self.get_limit(request)
+            ).changes(request.query_params.get("cursor"))
+        except ExpiredCursor:
+            raise SyncCursorExpired()
+        except InvalidCursor as exc:
+            raise ValidationError({"cursor": [str(exc)]})
+
+        context = {"request": request, "view": self}
+        deleted = {key: [] for key in self.deleted_keys.values()}
+        for tombstone in rows["deleted"]:
+            deleted[self.deleted_keys[tombstone.kind]].append(tombstone.object_id)
+        return Response(
+            {
+                "tasks": TaskSerializer(rows["tasks"], many=True, context=context).data,
+                "categories": CategorySerializer(
+                    rows["categories"], many=True, context=context
+                ).data,
+                "deleted": deleted,
+                "cursor": cursor,
+                "has_more": has_more,
+            }
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+
+class AutocompleteView(APIView):
+    """
+    Up to ``?limit=`` task titles and category names containing ``?q=``,
+    prefix matches first. Queries shorter than two characters match nothing.
+    """
+
+    permission_classes = [IsAuthenticated]
+    limit_query_param = "limit"
+    default_limit = 10
+    max_limit = 20
+
+    def get(self, request):
+        return Response(
+            suggest(
+                request.user, request.query_params.get("q", ""), self.get_limit(request)
+            )
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
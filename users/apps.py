@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from config.metrics import register_collector
+
+        from . import signals  # noqa: F401
+        from .authentication import token_cache_metrics
+
+        register_collector(token_cache_metrics)
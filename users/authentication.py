@@ -0,0 +1,149 @@
+import copy
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class TokenCache:
+    """
+    Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Entries are indexed by user id so that everything cached for a user can
+    be dropped when that user changes.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, user_id, value, expires_at=None):
+        """
+        Cache ``value`` for ``key``. ``expires_at`` is an optional wall-clock
+        timestamp (such as a token's ``exp`` claim) that shortens the TTL.
+        """
+        lifetime = self.ttl
+        if expires_at is not None:
+            lifetime = min(lifetime, expires_at - time.time())
+        if lifetime <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + lifetime, user_id, value)
+            self._keys_by_user[user_id].add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key):
+        _expires, user_id, _value = self._entries.pop(key)
+        keys = self._keys_by_user[user_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[user_id]
+
+
+def _build_token_cache():
+    options = getattr(settings, "AUTH_TOKEN_CACHE", {})
+    return TokenCache(
+        max_size=options.get("MAX_SIZE", 10000), ttl=options.get("TTL", 60)
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers verified tokens and the users they
+    resolve to, so repeated requests with the same access token skip both
+    signature verification and the user query.
+
+    Entries are dropped when the user is saved or deleted (see
+    ``users.signals``). That only reaches this process; in other workers an
+    entry lives at most ``AUTH_TOKEN_CACHE["TTL"]`` seconds, and never past
+    the token's own expiry.
+    """
+
+    cache = _build_token_cache()
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        cached = self.cache.get(raw_token)
+        if cached is None:
+            validated_token = self.get_validated_token(raw_token)
+            user = self.get_user(validated_token)
+            cached = (user, validated_token)
+            self.cache.set(
+                raw_token, user.pk, cached, expires_at=validated_token.get("exp")
+            )
+
+        user, validated_token = cached
+        # Hand each request its own instance so that nothing it does to
+        # request.user leaks into other requests.
+        return copy.copy(user), validated_token
+
+
+def token_cache_metrics():
+    """Exposition lines for ``config.metrics`` describing the token cache."""
+    stats = CachedJWTAuthentication.cache.stats()
+    metrics = [
+        ("auth_token_cache_hits_total", "counter", "hits"),
+        ("auth_token_cache_misses_total", "counter", "misses"),
+        ("auth_token_cache_evictions_total", "counter", "evictions"),
+        ("auth_token_cache_size", "gauge", "size"),
+    ]
+    lines = []
+    for name, kind, key in metrics:
+        lines += [f"# TYPE {name} {kind}", f"{name} {stats[key]}"]
+    return lines
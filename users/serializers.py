@@ -29,6 +29,17 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
+class AccountDeletionSerializer(serializers.Serializer):
+    """The current password, which deleting the account asks for again."""
+
+    password = serializers.CharField(write_only=True, style={"input_type": "password"})
+
+    def validate_password(self, value):
+        if not self.context["request"].user.check_password(value):
+            raise serializers.ValidationError("Password is incorrect.")
+        return value
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import CachedJWTAuthentication
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    """Drop cached authentications when a user changes or is removed."""
+    CachedJWTAuthentication.cache.invalidate_user(instance.pk)
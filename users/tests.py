@@ -1,8 +1,11 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from .authentication import CachedJWTAuthentication, TokenCache
 from .models import CustomUser
 
 
@@ -143,3 +146,110 @@ class UserAuthenticationTests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertNotIn("access", response.data)
+
+
+class TokenCacheTests(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", 1, "A")
+        cache.set("b", 1, "B")
+        cache.get("a")
+        cache.set("c", 2, "C")
+
+        self.assertEqual(cache.get("a"), "A")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set("expired", 1, "value", expires_at=0)
+        self.assertIsNone(cache.get("expired"))
+
+        cache = TokenCache(max_size=10, ttl=0)
+        cache.set("key", 1, "value")
+        self.assertIsNone(cache.get("key"))
+
+    def test_invalidate_user(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set("a", 1, "A")
+        cache.set("b", 1, "B")
+        cache.set("c", 2, "C")
+
+        cache.invalidate_user(1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_hit_rate(self):
+        cache = TokenCache(max_size=10, ttl=60)
+        cache.set("a", 1, "A")
+        cache.get("a")
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+        self.assertEqual(stats["hit_rate"], 0.75)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        CachedJWTAuthentication.cache.clear()
+        self.password = "SecurePass123!@#"
+        self.user = CustomUser.objects.create_user(
+            email="cached@example.com", password=self.password
+        )
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": self.user.email, "password": self.password},
+            format="json",
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = "/api/tasks/statistics/"
+
+    def test_repeated_requests_skip_user_query(self):
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.assertEqual(len(second), len(first) - 1)
+        stats = CachedJWTAuthentication.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_password_change_reloads_user(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.user.set_password("AnotherPass456!@#")
+        self.user.save()
+
+        self.assertEqual(CachedJWTAuthentication.cache.stats()["size"], 0)
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.user.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_stats_endpoint_requires_admin(self):
+        url = reverse("token-cache-stats")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hit_rate", response.data)
@@ -1,7 +1,14 @@
 from django.urls import path
 
-from .views import UserRegistrationView
+from .views import (AccountDeletionView, TokenCacheStatsView,
+                    UserRegistrationView)
 
 urlpatterns = [
     path("register/", UserRegistrationView.as_view(), name="user-register"),
+    path("account/", AccountDeletionView.as_view(), name="account-delete"),
+    path(
+        "auth/token-cache/",
+        TokenCacheStatsView.as_view(),
+        name="token-cache-stats",
+    ),
 ]
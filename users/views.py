@@ -1,9 +1,14 @@
 from rest_framework import generics, status
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from tasks.deletion import schedule_user_deletion
+from tasks.serializers import DeletionJobSerializer
+
+from .authentication import CachedJWTAuthentication
 from .models import CustomUser
-from .serializers import UserRegistrationSerializer
+from .serializers import AccountDeletionSerializer, UserRegistrationSerializer
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -27,3 +32,35 @@ class UserRegistrationView(generics.CreateAPIView):
             {"message": f"User {user.email} created successfully. Please log in"},
             status=status.HTTP_201_CREATED,
         )
+
+
+class TokenCacheStatsView(APIView):
+    """
+    Report the size and hit rate of this process's token cache (admins only).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(CachedJWTAuthentication.cache.stats())
+
+
+class AccountDeletionView(APIView):
+    """
+    Delete the authenticated user's account, once the current ``password``
+    in the request body confirms it: an access token alone isn't enough. The
+    account is deactivated at once; its tasks and categories are deleted in
+    the background, tracked by the returned deletion job.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request):
+        serializer = AccountDeletionSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        job = schedule_user_deletion(request.user)
+        return Response(
+            DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED
+        )